@@ -0,0 +1,79 @@
+from argparse import ArgumentParser, Namespace, ArgumentDefaultsHelpFormatter
+from json import dump
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Dict, List
+import subprocess
+import sys
+
+# code run in a new interpreter for each measure
+SCENARIOS = {
+    "version": "import scrapdynamics; scrapdynamics.__version__",
+    "crawler": "import scrapdynamics; scrapdynamics.Crawler",
+    "http_crawler": "import scrapdynamics as sd; sd.Crawler('http://127.0.0.1:9/', sd.Settings(progress_bar=False))",
+}
+
+def measure(code: str, repeat: int) -> List[float]:
+    """Time new interpreters running code, the startup of python itself is included
+
+    Args:
+        code (str): python code
+        repeat (int): number of interpreters started
+
+    Returns:
+        List[float]: time in seconds of each run
+    """
+    
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        times.append(perf_counter() - start)
+    return times
+
+def run(repeat: int) -> Dict[str, float]:
+    """Median time of each scenario, compared to an interpreter that imports nothing
+
+    Args:
+        repeat (int): number of interpreters started for each scenario
+
+    Returns:
+        Dict[str, float]: median time in seconds of each scenario minus the startup of python
+    """
+    
+    startup = median(measure("pass", repeat))
+    return {name: max(median(measure(code, repeat)) - startup, 0) for name, code in SCENARIOS.items()}
+
+def parse_argument() -> Namespace:
+    """parse command line arguments
+
+    Returns:
+        Namespace: command parsing results
+    """
+    
+    parser = ArgumentParser("ScrapDynamics import benchmark", formatter_class=ArgumentDefaultsHelpFormatter)
+    
+    parser.add_argument("-r", "--repeat", type=int, default=10, help="number of interpreters started for each scenario")
+    parser.add_argument("-m", "--max-ms", type=float, help="fail if importing scrapdynamics takes longer than this, in milliseconds")
+    parser.add_argument("-o", "--output", type=Path, help="path of the JSON results")
+    
+    return parser.parse_args()
+
+def main():
+    """command line entrypoint: python -m benchmarks.imports
+    """
+    
+    args = parse_argument()
+    results = run(args.repeat)
+    for name, seconds in results.items(): print(f"{name:<14} {seconds * 1000:.1f} ms")
+    
+    if args.output:
+        with open(args.output, "w") as f: dump(results, f, indent=2)
+    
+    if args.max_ms is not None and results["version"] * 1000 > args.max_ms:
+        print(f"regression: import scrapdynamics takes {results['version'] * 1000:.1f} ms, more than {args.max_ms} ms")
+        sys.exit(1)
+    
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+from argparse import ArgumentParser, Namespace, ArgumentDefaultsHelpFormatter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from io import StringIO
+from json import dump, load
+from multiprocessing import get_context
+from pathlib import Path
+from time import perf_counter, process_time
+from typing import Any, Dict, List
+import sys
+
+import scrapdynamics as sd
+from benchmarks.site import SyntheticSite
+
+# settings of each crawl mode benchmarked
+MODES: Dict[str, Dict[str, Any]] = {
+    "requests": {},
+    "single_request": {"single_request": True},
+    "concurrent": {"max_concurrency": 8},
+    "parse_html": {"parse_html": True},
+    "normalize_urls": {"normalize_urls": True},
+    "compact_storage": {"compact_storage": True},
+}
+
+# metrics compared to the baseline, True if higher is better
+METRICS = {
+    "pages_per_sec": True,
+    "fetch_p50": False,
+    "fetch_p99": False,
+    "cpu_time": False,
+    "peak_rss": False,
+}
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest rank percentile
+
+    Args:
+        values (List[float]): measures
+        p (float): percentile between 0 and 100
+
+    Returns:
+        float: value of the percentile, 0 if there is no measure
+    """
+    
+    if not values: return 0
+    values = sorted(values)
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+def peak_rss() -> int:
+    """Peak resident memory of the process in bytes
+
+    Returns:
+        int: peak resident memory or None if it can't be measured on this platform
+    """
+    
+    try: import resource
+    except ImportError: return None
+    # ru_maxrss is in kilobytes on linux and in bytes on macos
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+def run_mode(url: str, depth: int, settings: Dict[str, Any]) -> Dict[str, float]:
+    """Crawl the synthetic website once and measure it, run in its own process so peak memory is not shared between modes
+
+    Args:
+        url (str): url of the synthetic website
+        depth (int): depth of the crawl
+        settings (Dict[str, Any]): settings of the crawl mode
+
+    Returns:
+        Dict[str, float]: measures of the crawl
+    """
+    
+    crawler = sd.Crawler(url + "/", sd.Settings(progress_bar=False, depth=depth, **settings))
+    
+    # time each fetch, pages can be fetched by several threads
+    latencies: List[float] = []
+    fetch_url = crawler._fetch_url
+    def timed_fetch_url(link: str) -> str:
+        start = perf_counter()
+        try: return fetch_url(link)
+        finally: latencies.append(perf_counter() - start)
+    crawler._fetch_url = timed_fetch_url
+    
+    cpu, wall = process_time(), perf_counter()
+    with redirect_stdout(StringIO()): crawler.start()
+    cpu, wall = process_time() - cpu, perf_counter() - wall
+    
+    return {
+        "pages": len(crawler._url_book),
+        "fetches": len(latencies),
+        "wall_time": wall,
+        "pages_per_sec": len(crawler._url_book) / wall,
+        "fetch_p50": percentile(latencies, 50),
+        "fetch_p99": percentile(latencies, 99),
+        "cpu_time": cpu,
+        "peak_rss": peak_rss(),
+    }
+
+def run(site: SyntheticSite, depth: int, modes: List[str]) -> Dict[str, Dict[str, float]]:
+    """Benchmark crawl modes against a synthetic website
+
+    Args:
+        site (SyntheticSite): synthetic website already started
+        depth (int): depth of the crawls
+        modes (List[str]): names of the modes in MODES
+
+    Returns:
+        Dict[str, Dict[str, float]]: measures of each mode
+    """
+    
+    results = {}
+    for mode in modes:
+        # a fresh process for each mode, the website is served by this one
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+            results[mode] = executor.submit(run_mode, site.url, depth, MODES[mode]).result()
+    return results
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Find the measures worse than the baseline
+
+    Args:
+        results (Dict[str, Dict[str, float]]): measures of each mode
+        baseline (Dict[str, Dict[str, float]]): measures of each mode of the baseline
+        tolerance (float): relative difference allowed before a measure is a regression
+
+    Returns:
+        List[str]: description of each regression
+    """
+    
+    regressions = []
+    for mode, measures in results.items():
+        for metric, higher_is_better in METRICS.items():
+            value, reference = measures.get(metric), baseline.get(mode, {}).get(metric)
+            if not value or not reference: continue
+            ratio = value / reference
+            if (higher_is_better and ratio < 1 - tolerance) or (not higher_is_better and ratio > 1 + tolerance):
+                regressions.append(f"{mode} {metric}: {value:.4g} vs {reference:.4g} in baseline ({ratio - 1:+.0%})")
+    return regressions
+
+def parse_argument() -> Namespace:
+    """parse command line arguments
+
+    Returns:
+        Namespace: command parsing results
+    """
+    
+    parser = ArgumentParser("ScrapDynamics benchmarks", formatter_class=ArgumentDefaultsHelpFormatter)
+    
+    parser.add_argument("--pages", type=int, default=1000, help="number of pages of the synthetic website")
+    parser.add_argument("--fan-out", type=int, default=10, help="number of links of each page")
+    parser.add_argument("--page-size", type=int, default=20000, help="size in bytes of each page")
+    parser.add_argument("--latency", type=float, default=0.005, help="time in seconds the server waits before answering")
+    parser.add_argument("--redirect-ratio", type=float, default=0.05, help="share of the pages answered with a redirection")
+    parser.add_argument("--non-html-ratio", type=float, default=0.05, help="share of the pages that are not html")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic website")
+    parser.add_argument("--depth", type=int, default=3, help="depth of the crawls")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES), help="crawl modes to benchmark")
+    parser.add_argument("-o", "--output", type=Path, help="path of the JSON results")
+    parser.add_argument("-b", "--baseline", type=Path, help="path of JSON results to compare with")
+    parser.add_argument("-t", "--tolerance", type=float, default=0.2, help="relative difference with the baseline allowed")
+    
+    return parser.parse_args()
+
+def main():
+    """command line entrypoint: python -m benchmarks.run
+    """
+    
+    args = parse_argument()
+    config = {
+        "pages": args.pages, "fan_out": args.fan_out, "page_size": args.page_size, "latency": args.latency,
+        "redirect_ratio": args.redirect_ratio, "non_html_ratio": args.non_html_ratio, "seed": args.seed,
+    }
+    
+    with SyntheticSite(**config) as site: results = run(site, args.depth, args.modes)
+    
+    for mode, measures in results.items():
+        print(f"{mode:<16} " + " | ".join([f"{metric} {value:.4g}" for metric, value in measures.items() if value is not None]))
+    
+    if args.output:
+        with open(args.output, "w") as f: dump({"config": {**config, "depth": args.depth}, "results": results}, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline) as f: baseline = load(f)
+        if baseline.get("config") != {**config, "depth": args.depth}: print("warning: the baseline was run with another configuration")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for regression in regressions: print(f"regression: {regression}")
+        if regressions: sys.exit(1)
+    
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from random import Random
+from threading import Thread
+from time import sleep
+from typing import Dict, Tuple
+
+
+class SyntheticSite():
+    """Generated website served on localhost in a background thread, pages are built on demand
+    from a seed so the same configuration always gives the same website
+
+    Args:
+        pages (int, optional): number of pages of the website. Defaults to 1000.
+        fan_out (int, optional): number of links of each page. Defaults to 10.
+        page_size (int, optional): size in bytes of the text of each page. Defaults to 20000.
+        latency (float, optional): time in seconds to wait before answering. Defaults to 0.
+        redirect_ratio (float, optional): share of the pages answered with a 301 to their real location. Defaults to 0.
+        non_html_ratio (float, optional): share of the pages that are not html. Defaults to 0.
+        seed (int, optional): seed of the random generator. Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        pages: int = 1000,
+        fan_out: int = 10,
+        page_size: int = 20000,
+        latency: float = 0,
+        redirect_ratio: float = 0,
+        non_html_ratio: float = 0,
+        seed: int = 0,
+    ):
+
+        self.pages = pages
+        self.fan_out = fan_out
+        self.page_size = page_size
+        self.latency = latency
+        self.redirect_ratio = redirect_ratio
+        self.non_html_ratio = non_html_ratio
+        self.seed = seed
+
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            protocol_version = "HTTP/1.1"
+            # headers and body are sent separately, without this the client waits for delayed ACKs
+            disable_nagle_algorithm = True
+
+            def do_HEAD(self): site._answer(self, False)
+            def do_GET(self): site._answer(self, True)
+            def log_message(self, *args): pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        # crawlers close keep-alive connections at the end of a crawl
+        self.httpd.handle_error = lambda request, client_address: None
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "SyntheticSite":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def page_kind(self, page: int) -> str:
+        """Kind of a page, drawn once from the seed
+
+        Args:
+            page (int): number of the page
+
+        Returns:
+            str: "html", "redirect" or "binary"
+        """
+
+        draw = Random(self.seed * 1000003 + page).random()
+        if page == 0 or draw >= self.redirect_ratio + self.non_html_ratio: return "html"
+        return "redirect" if draw < self.redirect_ratio else "binary"
+
+    def page(self, path: str) -> Tuple[int, Dict[str, str], bytes]:
+        """Build the answer of a path
+
+        Args:
+            path (str): path requested
+
+        Returns:
+            Tuple[int, Dict[str, str], bytes]: status code, headers and body
+        """
+
+        parts = path.strip("/").split("/")
+        try: page = int(parts[-1]) if parts[0] in ("", "page", "moved") else -1
+        except ValueError: page = -1
+        if path == "/": page = 0
+        if not 0 <= page < self.pages: return 404, {"Content-Type": "text/html"}, b"not found"
+
+        kind = self.page_kind(page)
+        if kind == "redirect" and parts[0] != "moved": return 301, {"Location": f"{self.url}/moved/{page}"}, b""
+        if kind == "binary": return 200, {"Content-Type": "application/octet-stream"}, bytes(self.page_size)
+
+        rng = Random(self.seed * 7919 + page)
+        links = "\n".join([f'<a href="{self.url}/page/{rng.randrange(self.pages)}">link</a>' for _ in range(self.fan_out)])
+        head = f"<html><head><title>page {page}</title></head><body><p>contact: page{page}@example.com</p>{links}<p>"
+        tail = "</p></body></html>"
+        filler = ("lorem ipsum dolor sit amet " * (self.page_size // 27 + 1))[:max(self.page_size - len(head) - len(tail), 0)]
+        return 200, {"Content-Type": "text/html"}, (head + filler + tail).encode()
+
+    def _answer(self, handler: BaseHTTPRequestHandler, send_body: bool):
+        if self.latency: sleep(self.latency)
+        status, headers, body = self.page(handler.path)
+        handler.send_response(status)
+        for key, value in headers.items(): handler.send_header(key, value)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        if send_body: handler.wfile.write(body)
@@ -6,5 +6,16 @@ making it easy to automate the process of collecting any data on a web.
 
 __version__ = "0.2.0"
 
-from .crawler import Crawler
-from .settings import Settings
\ No newline at end of file
+from .settings import Settings
+
+__all__ = ["Crawler", "Settings"]
+
+def __getattr__(name: str):
+    # the crawler module imports requests and lxml, it is imported when Crawler is first used
+    if name == "Crawler":
+        from .crawler import Crawler
+        return Crawler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + ["Crawler"])
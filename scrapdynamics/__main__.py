@@ -3,7 +3,7 @@ from pathlib import Path
 
 import scrapdynamics as sd
 
-SAVE_FORMAT = ["json", "csv", "excel"]
+SAVE_FORMAT = ["json", "jsonl", "csv", "excel"]
 
 def parse_argument() -> Namespace:
     """parse command line arguments
@@ -0,0 +1,264 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Set
+from urllib3.exceptions import MaxRetryError
+
+try: import aiohttp
+except ImportError as e: raise ImportError("the async API of the crawler needs aiohttp, install it with: pip install scrapdynamics[async]") from e
+
+from .crawler import OVER_BUDGET
+
+if TYPE_CHECKING:
+    from .crawler import Crawler
+
+
+@dataclass
+class Response():
+    """Answer of an aiohttp request, read before its connection is given back to the pool
+
+    Args:
+        status_code (int): status code of the answer
+        headers (Any): headers of the answer
+        url (str): url of the answer, after the redirections
+        text (str, optional): body of the answer or None if it has not been downloaded. Defaults to None
+        content (bytes, optional): body of the answer in bytes. Defaults to empty bytes
+        history (List[str], optional): urls that answered a redirection before the answer. Defaults to empty List
+    """
+
+    status_code: int
+    headers: Any
+    url: str
+    text: str = None
+    content: bytes = b""
+    history: List[str] = field(default_factory=lambda: [])
+
+
+class AsyncDomainLimiter():
+    """Limit the number of concurrent requests made to the same domain by the tasks of an event loop
+
+    Args:
+        max_per_domain (int): max number of concurrent requests for one domain, 0 for no limit
+    """
+
+    def __init__(self, max_per_domain: int):
+
+        self.max_per_domain = max_per_domain
+
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        """Context manager that hold a slot of the domain of the url while the request is made
+
+        Args:
+            url (str): url that will be requested
+        """
+
+        if self.max_per_domain <= 0:
+            yield
+            return
+
+        domain = urlsplit(url).netloc
+        if domain not in self._semaphores: self._semaphores[domain] = asyncio.Semaphore(self.max_per_domain)
+        async with self._semaphores[domain]: yield
+
+
+class AsyncFetcher():
+    """Fetch the pages of a crawler with aiohttp on the running event loop, only the requests are made here:
+    what to fetch, redirections, http cache, politeness and retries are decided by the helpers of the crawler like Crawler._fetch_url does.
+    Blocking work, robots.txt and selenium rendering, runs in threads so the loop is never blocked by the network.
+
+    Args:
+        crawler (Crawler): crawler whose settings, redirections, http cache, politeness scheduler and metrics are used
+    """
+
+    def __init__(self, crawler: "Crawler"):
+
+        self.crawler = crawler
+        self.s = crawler.s
+
+        self._limiter = AsyncDomainLimiter(self.s.max_concurrency_per_domain)
+        self._tasks: Set[asyncio.Task] = set()
+        # the session is bound to the running loop, the fetcher is created by the crawl running on it
+        self._session = aiohttp.ClientSession(
+            headers=self.s.request_header,
+            timeout=aiohttp.ClientTimeout(total=self.s.get_timeout),
+            connector=aiohttp.TCPConnector(limit=crawler._max_workers()),
+        )
+
+    def submit(self, url: str) -> asyncio.Task:
+        """Fetch a link in a new task, tasks still running are cancelled when the fetcher is closed
+
+        Args:
+            url (str): url/link to fetch
+
+        Returns:
+            asyncio.Task: task whose result is the html page or None if the link is skipped
+        """
+
+        task = asyncio.ensure_future(self.fetch(url))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def fetch(self, url: str) -> str:
+        """Verify and get the html page of a link
+
+        Args:
+            url (str): url/link to fetch
+
+        Returns:
+            str: html page, None if the link is skipped or OVER_BUDGET if it is left by max_pages or max_pages_per_host
+        """
+
+        c = self.crawler
+        # robots.txt of a new host is requested in a thread
+        allowed = await asyncio.to_thread(c._allowed_link, url) if c._scheduler else c._allowed_link(url)
+        if not allowed: return None
+        if c._over_budget(url): return OVER_BUDGET
+
+        single_request = c._single_request()
+        async with self._limiter.limit(url):
+            with c._metrics.time("fetch"):
+                if not single_request and not await self._verify_headers(url): return None
+                if not c._reserve_page(url): return OVER_BUDGET
+                page_text = await self.get_page(c._resolve_redirect(url), verify=single_request)
+                if page_text is None: c._release_page(url)
+                return page_text
+
+    async def get_page(self, url: str, first_page: bool = False, verify: bool = False) -> str:
+        """Get the html page of a url with aiohttp or selenium depending on the settings,
+        in hybrid mode the page is rendered with selenium only if the aiohttp page needs it
+
+        Args:
+            url (str): url/link
+            first_page (bool, optional): True if url is the base url. Defaults to False.
+            verify (bool, optional): check status code and content type with the GET request. Defaults to False.
+
+        Returns:
+            str: html page or None
+        """
+
+        c = self.crawler
+        if not self.s.simulate_human: return await self._get_page_request(url, verify)
+        if not self.s.hybrid_fetch: return await asyncio.to_thread(c._get_page_selenium, url, first_page)
+
+        page_text = await self._get_page_request(url, verify)
+        if page_text is None or not c._needs_rendering(url, page_text, first_page): return page_text
+        return await asyncio.to_thread(c._get_page_selenium, url, first_page)
+
+    async def close(self):
+        """Cancel the requests in flight and close the connections
+        """
+
+        try:
+            for task in list(self._tasks): task.cancel()
+            if self._tasks: await asyncio.gather(*self._tasks, return_exceptions=True)
+        # the close of an abandoned crawl can be cancelled while the tasks finish
+        finally: await self._session.close()
+
+    async def _verify_headers(self, url: str) -> bool:
+        """Make the HEAD request of Crawler._verify_headers
+
+        Args:
+            url (str): url/link to verify
+
+        Returns:
+            bool: True if status code 200 and is a valid content type
+        """
+
+        c = self.crawler
+        url = c._resolve_redirect(url)
+        try: head = await self._request("HEAD", url, allow_redirects=False)
+        except Exception: return False
+
+        if head.status_code == 200: return c._valid_content_type(head)
+        location = c._redirect_location(url, head)
+        return await self._verify_headers(location) if location else False
+
+    async def _get_page_request(self, url: str, verify: bool = False) -> str:
+        """Make the GET request of Crawler._get_page_request with aiohttp
+
+        Args:
+            url (str): url/link
+            verify (bool, optional): check status code and content type from the headers before downloading the page,
+                replace the HEAD request of _verify_headers. Defaults to False.
+
+        Returns:
+            str: html page or None
+        """
+
+        c = self.crawler
+        cache_entry, headers = c._conditional_request(url)
+        accept = (lambda response: c._accept_response(response, cache_entry)) if verify else None
+        try: response = await self._request("GET", url, accept, headers=headers)
+        except Exception: return None if verify else "None"
+
+        if verify:
+            c._remember_redirects(response.history + [response.url])
+            if response.text is None: return None
+        return c._read_response(url, response, cache_entry)
+
+    async def _request(self, method: str, url: str, accept: Callable[[Response], bool] = None, **kwargs) -> Response:
+        """Make a request like Crawler._request, errors and status codes are retried with the retry policy of the requests session
+
+        Args:
+            method (str): HEAD or GET
+            url (str): url/link
+            accept (Callable[[Response], bool], optional): with the status code and headers of the answer,
+                tell if its body has to be downloaded. Defaults to None to always download it.
+
+        Returns:
+            Response: answer of the request
+        """
+
+        c = self.crawler
+        retry, attempt = c._create_retry(), 0
+        while True:
+            if c._scheduler:
+                with c._metrics.time("polite_wait"):
+                    delay = c._scheduler.reserve(url)
+                    if delay: await asyncio.sleep(delay)
+
+            try:
+                with c._metrics.time(method.lower()): response = await self._send(method, url, accept, **kwargs)
+            except Exception as e:
+                c._metrics.count("errors", host=urlsplit(url).netloc)
+                try: retry = retry.increment(method, url, error=e)
+                except MaxRetryError: raise e
+                delay = retry.get_backoff_time()
+            else:
+                c._request_done(url, response.status_code, response.headers)
+                if c._retry_throttled(response.status_code, attempt):
+                    attempt += 1
+                    continue
+                if not retry.is_retry(method, response.status_code, "Retry-After" in response.headers): return response
+                try: retry = retry.increment(method, url)
+                except MaxRetryError: return response
+                delay = retry.get_retry_after(response) if retry.respect_retry_after_header else None
+                if delay is None: delay = retry.get_backoff_time()
+
+            if delay: await asyncio.sleep(delay)
+
+    async def _send(self, method: str, url: str, accept: Callable[[Response], bool] = None, **kwargs) -> Response:
+        """Send a request and read its answer
+
+        Args:
+            method (str): HEAD or GET
+            url (str): url/link
+            accept (Callable[[Response], bool], optional): with the status code and headers of the answer,
+                tell if its body has to be downloaded. Defaults to None to always download it.
+
+        Returns:
+            Response: answer of the request
+        """
+
+        async with self._session.request(method, url, **kwargs) as response:
+            result = Response(response.status, response.headers, str(response.url), history=[str(redirect.url) for redirect in response.history])
+            # releasing the connection without reading the answer stops the download of invalid pages
+            if accept is None or accept(result):
+                result.content = await response.read()
+                result.text = await response.text(errors="replace")
+            return result
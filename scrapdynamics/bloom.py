@@ -0,0 +1,199 @@
+import mmap
+import os
+from hashlib import shake_128
+from math import ceil, exp, log
+from typing import List, Set, Union
+
+LN2 = log(2)
+
+# files memory mapped by the filters open in this process, a file is only used by one filter at a time
+_open_paths: Set[str] = set()
+
+
+class BloomFilter():
+    """Set of strings in a fixed number of bits, an item added is always found
+    and an item never added is found with a probability of error_rate once capacity items are added
+
+    Args:
+        capacity (int): number of items the filter is sized for
+        error_rate (float, optional): false positive rate at capacity. Defaults to 0.001.
+        path (str, optional): path of the file where the bits are memory mapped, None to keep them in memory.
+            The file is emptied, it can't be used by another filter open at the same time. Defaults to None.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001, path: str = None):
+
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.path = path
+
+        self.nb_bits = ceil(-self.capacity * log(error_rate) / LN2 ** 2)
+        self.nb_hashes = max(round(self.nb_bits / self.capacity * LN2), 1)
+        self._count = 0
+
+        self._file = None
+        self._bits: Union[bytearray, mmap.mmap] = None
+        if path is None: self._bits = bytearray(ceil(self.nb_bits / 8))
+        else:
+            if os.path.abspath(path) in _open_paths: raise ValueError(f"{path} is used by another bloom filter, each crawler needs its own bloom_path")
+            _open_paths.add(os.path.abspath(path))
+            # the file is recreated empty, a filter can't be reopened without the items it was built from
+            self._file = open(path, "w+b")
+            self._file.truncate(ceil(self.nb_bits / 8))
+            self._bits = mmap.mmap(self._file.fileno(), ceil(self.nb_bits / 8))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, item: str) -> bool:
+        for i in self._positions(item):
+            if not self._bits[i >> 3] & (1 << (i & 7)): return False
+        return True
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+    def add(self, item: str) -> bool:
+        """Add an item
+
+        Args:
+            item (str): item to add
+
+        Returns:
+            bool: True if the item was not in the filter yet, False if it was probably already added
+        """
+
+        added = False
+        for i in self._positions(item):
+            byte, bit = i >> 3, 1 << (i & 7)
+            if not self._bits[byte] & bit:
+                self._bits[byte] |= bit
+                added = True
+        if added: self._count += 1
+        return added
+
+    def is_full(self) -> bool:
+        """Check if the filter holds the number of items it is sized for
+
+        Returns:
+            bool: True if adding more items raises the false positive rate above error_rate
+        """
+
+        return self._count >= self.capacity
+
+    def false_positive_rate(self) -> float:
+        """Estimated false positive rate with the items added so far
+
+        Returns:
+            float: probability that an item never added is found
+        """
+
+        return (1 - exp(-self.nb_hashes * self._count / self.nb_bits)) ** self.nb_hashes
+
+    def close(self):
+        """Release the memory map and its file
+        """
+
+        if self._file is None: return
+        self._bits.close()
+        self._file.close()
+        self._file = None
+        _open_paths.discard(os.path.abspath(self.path))
+
+    def _positions(self, item: str) -> List[int]:
+        """Positions of the bits of an item, each one read from its own 8 bytes of an extendable output hash.
+        Positions derived from 2 hashes by double hashing overlap between items on small filters
+
+        Args:
+            item (str): item
+
+        Returns:
+            List[int]: positions of the bits set for the item
+        """
+
+        digest = shake_128(item.encode("utf-8", "surrogatepass")).digest(8 * self.nb_hashes)
+        return [int.from_bytes(digest[i:i + 8], "little") % self.nb_bits for i in range(0, len(digest), 8)]
+
+
+class ScalableBloomFilter():
+    """Bloom filter that grows when it is full without exceeding its false positive rate:
+    a new filter larger and with a tighter error rate is added each time the last one is full,
+    so the number of items doesn't have to be known in advance
+
+    Args:
+        capacity (int, optional): number of items of the first filter. Defaults to 1000000.
+        error_rate (float, optional): max false positive rate of the whole filter. Defaults to 0.001.
+        growth (int, optional): each new filter holds this many times more items than the previous one. Defaults to 2.
+        tightening (float, optional): each new filter has its error rate multiplied by this ratio. Defaults to 0.5.
+        path (str, optional): prefix of the files where the filters are memory mapped, None to keep them in memory. Defaults to None.
+    """
+
+    def __init__(self, capacity: int = 1000000, error_rate: float = 0.001, growth: int = 2, tightening: float = 0.5, path: str = None):
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.path = path
+
+        self._count = 0
+        self._filters: List[BloomFilter] = []
+        self._add_filter()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, item: str) -> bool:
+        # the last filter is the largest one
+        for bloom in reversed(self._filters):
+            if item in bloom: return True
+        return False
+
+    @property
+    def nbytes(self) -> int:
+        return sum([bloom.nbytes for bloom in self._filters])
+
+    def add(self, item: str) -> bool:
+        """Add an item
+
+        Args:
+            item (str): item to add
+
+        Returns:
+            bool: True if the item was not in the filter yet, False if it was probably already added
+        """
+
+        if item in self: return False
+        if self._filters[-1].is_full(): self._add_filter()
+        self._filters[-1].add(item)
+        self._count += 1
+        return True
+
+    def false_positive_rate(self) -> float:
+        """Estimated false positive rate with the items added so far
+
+        Returns:
+            float: probability that an item never added is found
+        """
+
+        rate = 1
+        for bloom in self._filters: rate *= 1 - bloom.false_positive_rate()
+        return 1 - rate
+
+    def close(self):
+        """Release the memory maps and their files
+        """
+
+        for bloom in self._filters: bloom.close()
+
+    def _add_filter(self):
+        """Add a new filter after the last one, the error rates of all the filters sum up to at most error_rate
+        """
+
+        i = len(self._filters)
+        self._filters.append(BloomFilter(
+            self.capacity * self.growth ** i,
+            self.error_rate * (1 - self.tightening) * self.tightening ** i,
+            f"{self.path}.{i}" if self.path else None,
+        ))
@@ -0,0 +1,78 @@
+import sqlite3
+from json import dumps, loads
+from dataclasses import asdict
+from typing import List, Tuple, Iterable, Optional
+
+from .url import Url
+
+
+class Checkpoint():
+    """SQLite store of the state of a crawl, used to resume it without fetching again the pages already done.
+    It keeps the pages already crawled with their Url dataclass and the frontier of the pages still to crawl.
+
+    Args:
+        path (str): path of the SQLite file
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, depth INTEGER, record TEXT);
+            CREATE TABLE IF NOT EXISTS frontier (position INTEGER PRIMARY KEY, url TEXT, depth INTEGER);
+        """)
+        self._pages: List[Tuple[str, int, Optional[str]]] = []
+
+    def clear(self, base_url: str):
+        """Remove the state of a previous crawl to start a new one
+
+        Args:
+            base_url (str): url where the new crawl begins
+        """
+
+        self._db.executescript("DELETE FROM meta; DELETE FROM pages; DELETE FROM frontier;")
+        self._db.execute("INSERT INTO meta VALUES ('base_url', ?)", (base_url,))
+        self._db.commit()
+        self._pages = []
+
+    def add_page(self, url: str, depth: int, url_object: Url = None):
+        """Mark a page as done, it is written at the next save
+
+        Args:
+            url (str): url/link of the page
+            depth (int): depth of the page
+            url_object (Url, optional): Url dataclass of the page or None if it has been skipped. Defaults to None.
+        """
+
+        self._pages.append((url, depth, dumps(asdict(url_object)) if url_object else None))
+
+    def save(self, pending: Iterable[Tuple[str, int]]):
+        """Write the pages done since the last save and replace the frontier
+
+        Args:
+            pending (Iterable[Tuple[str, int]]): urls still to crawl with their depth, in crawl order
+        """
+
+        with self._db:
+            self._db.executemany("INSERT OR IGNORE INTO pages VALUES (?, ?, ?)", self._pages)
+            self._db.execute("DELETE FROM frontier")
+            self._db.executemany("INSERT INTO frontier (url, depth) VALUES (?, ?)", pending)
+        self._pages = []
+
+    def load(self) -> Tuple[str, List[Tuple[str, int, Optional[Url]]], List[Tuple[str, int]]]:
+        """Read the state of the crawl
+
+        Returns:
+            Tuple[str, List[Tuple[str, int, Optional[Url]]], List[Tuple[str, int]]]: base url,
+                pages done with their depth and Url dataclass, urls still to crawl with their depth
+        """
+
+        base_url = self._db.execute("SELECT value FROM meta WHERE key = 'base_url'").fetchone()
+        pages = [(url, depth, Url(**loads(record)) if record else None) for url, depth, record in self._db.execute("SELECT url, depth, record FROM pages ORDER BY rowid")]
+        pending = self._db.execute("SELECT url, depth FROM frontier ORDER BY position").fetchall()
+        return base_url[0] if base_url else None, pages, pending
+
+    def close(self):
+        self._db.close()
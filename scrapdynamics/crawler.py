@@ -1,16 +1,83 @@
-from selenium.webdriver import Firefox
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.firefox.webdriver import WebDriver
-import pandas as pd
 import requests
-from time import sleep
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import re
 from json import dump
-from typing import List
+from cProfile import Profile
+from pstats import Stats
+from io import StringIO
+from urllib.parse import urlsplit
+from os import getpid
+from socket import gethostname
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, Any, AsyncIterator, List, Dict, Iterator, Tuple
+from itertools import islice
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from lxml import etree
 
 from .settings import Settings
-from .progressbar import ProgressBar
-from .url import UrlManager
+from .url import UrlManager, Url
+from .frontier import PriorityFrontier
+from .limiter import DomainLimiter
+from .sink import JsonLinesSink
+from .checkpoint import Checkpoint
+from .driverpool import DriverPool
+from .politeness import HostScheduler, THROTTLE_STATUS
+from .httpcache import HttpCache, CacheEntry
+from .incremental import IncrementalState, content_hash
+from .extraction import ExtractionPool
+from .distributed import FrontierBackend
+from .metrics import Metrics, NullMetrics
+
+# selenium, pandas and rich are slow to import, they are imported when they are first used
+if TYPE_CHECKING:
+    import pandas as pd
+    from selenium.webdriver.firefox.webdriver import WebDriver
+    from .aio import AsyncFetcher
+
+# returned instead of a page for the links left by max_pages or max_pages_per_host
+OVER_BUDGET = object()
+
+# scroll to the bottom each time the page grows, stop when it has not grown for idle time
+# arguments: max scrolls, max items, css selector of items, time budget (ms), idle time (ms), callback
+SCROLL_SCRIPT = """
+var maxScrolls = arguments[0], maxItems = arguments[1], itemSelector = arguments[2],
+    timeBudget = arguments[3], idleTime = arguments[4], done = arguments[arguments.length - 1];
+var scrolls = 0, height = 0, finished = false, idleTimer = null, budgetTimer = null;
+
+function finish(reason) {
+    if (finished) return;
+    finished = true;
+    mutationObserver.disconnect();
+    if (resizeObserver) resizeObserver.disconnect();
+    clearTimeout(idleTimer);
+    clearTimeout(budgetTimer);
+    done({reason: reason, scrolls: scrolls, height: document.body.scrollHeight});
+}
+
+function scroll() {
+    if (maxItems > 0 && itemSelector && document.querySelectorAll(itemSelector).length >= maxItems) return finish("items");
+    if (scrolls >= maxScrolls) return finish("scrolls");
+    scrolls++;
+    height = document.body.scrollHeight;
+    window.scrollTo(0, height);
+    clearTimeout(idleTimer);
+    idleTimer = setTimeout(function () { finish("end"); }, idleTime);
+}
+
+function onChange() {
+    if (!finished && document.body.scrollHeight > height) scroll();
+}
+
+var mutationObserver = new MutationObserver(onChange);
+mutationObserver.observe(document.body, {childList: true, subtree: true});
+var resizeObserver = window.ResizeObserver ? new ResizeObserver(onChange) : null;
+if (resizeObserver) resizeObserver.observe(document.body);
+budgetTimer = setTimeout(function () { finish("time"); }, timeBudget);
+scroll();
+"""
 
 
 class Crawler(UrlManager):
@@ -23,55 +90,524 @@ class Crawler(UrlManager):
     
     def __init__(self, base_url: str, settings: Settings = False):
         
-        super(Crawler, self).__init__()
-        
-        # change the settings that UrlManager created
-        if settings: self.s = settings
+        super(Crawler, self).__init__(settings)
         
         self.base_url = base_url
         self.base_domain = self._get_domain_from_url(base_url)
         
-        # open and configure selenium webdriver
-        if self.s.simulate_human:
-            driver_options = Options()
-            driver_options.headless = self.s.headless
-            self.driver = Firefox(options=driver_options)
-            self.driver.set_page_load_timeout(self.s.get_timeout)
+        self._domain_limiter = DomainLimiter(self.s.max_concurrency_per_domain)
+        self.session = self._create_session()
+        self._redirects: Dict[str, str] = {}
+        self._http_cache: HttpCache = None
+        if self.s.http_cache_path: self._http_cache = HttpCache(self.s.http_cache_path, self.s.http_cache_max_size, self.s.http_cache_ttl)
+        self._scheduler: HostScheduler = None
+        if self.s.polite: self._scheduler = HostScheduler(
+            self.s.polite_rate,
+            self.s.polite_burst,
+            self.s.polite_max_backoff,
+            self._fetch_robots if self.s.respect_robots else None,
+            self.s.request_header.get("User-Agent", "*"),
+        )
+        self._checkpoint: Checkpoint = None
+        self._incremental: IncrementalState = None
+        self._pages_since_checkpoint = 0
+        # page budgets
+        self._started: float = None
+        self._pages_taken = 0
+        self._host_pages: Dict[str, int] = {}
+        self._leftover: List[Tuple[str, int]] = []
+        self._budget_lock = Lock()
+        self._metrics = Metrics(self.s.metrics_path, self.s.metrics_interval) if self.s.metrics else NullMetrics()
+        self._extraction_pool: ExtractionPool = None
+        if self.s.extraction_processes > 1: self._extraction_pool = ExtractionPool(self.s, self.s.extraction_processes)
+        
+        self._re_render_if_match = re.compile(self.s.render_if_match) if self.s.render_if_match else None
+        
+        # selenium webdrivers are opened when the first page is rendered
+        self.driver_pool: DriverPool = None
+        if self.s.simulate_human: self.driver_pool = DriverPool(self._create_driver, self.s.driver_pool_size, self.s.driver_recycle_after)
             
-    def start(self):
+    def start(self, incremental: bool = False):
         """Start the crawler
+
+        Args:
+            incremental (bool, optional): compare pages to the previous crawl saved in Settings.incremental_path,
+                unchanged pages are not extracted again and each Url has a status. Defaults to False.
+        """
+        
+        self._begin_crawl(incremental)
+        self._add_first_page(self._get_page(self.base_url, True))
+        self._crawl(1)
+        
+    async def astart(self, incremental: bool = False):
+        """Start the crawler on the running event loop, pages are fetched with aiohttp without blocking the loop
+
+        Args:
+            incremental (bool, optional): compare pages to the previous crawl saved in Settings.incremental_path,
+                unchanged pages are not extracted again and each Url has a status. Defaults to False.
+        """
+        
+        async for _ in self.iter_results(incremental): pass
+        
+    async def iter_results(self, incremental: bool = False) -> AsyncIterator[Url]:
+        """Crawl on the running event loop and yield each page as soon as it is extracted.
+        Pages of a depth are fetched concurrently up to max_concurrency and come in the order their requests finish.
+        Leaving the loop early stops the crawl, requests in flight are cancelled and the stores, processes and sinks are closed
+        without saving the crawl for the next incremental crawl.
+
+        Args:
+            incremental (bool, optional): compare pages to the previous crawl saved in Settings.incremental_path,
+                unchanged pages are not extracted again and each Url has a status. Defaults to False.
+
+        Yields:
+            AsyncIterator[Url]: Url dataclass of each page crawled
         """
         
+        from .aio import AsyncFetcher
+        
+        fetcher = AsyncFetcher(self)
+        try:
+            self._begin_crawl(incremental)
+            url_object = self._add_first_page(await fetcher.get_page(self.base_url, True))
+            if url_object is not None: yield url_object
+            
+            if isinstance(self._frontier, PriorityFrontier):
+                while len(self._frontier) and not self._budget_exhausted():
+                    async for url_object in self._arun_links(fetcher, self._next_best()): yield url_object
+                    if self._checkpoint and self._pages_since_checkpoint >= self.s.checkpoint_interval: self._save_checkpoint(self._leftover)
+            else:
+                for d in range(1, self.s.depth + 1):
+                    if self._budget_exhausted(): break
+                    links = self._next_layer(d)
+                    if self._checkpoint: self._save_checkpoint(links + self._leftover)
+                    async for url_object in self._arun_links(fetcher, links): yield url_object
+                    if self._checkpoint: self._save_checkpoint(self._leftover)
+            
+            self._save_crawl()
+        finally:
+            # closed before the first await, the task closing an abandoned generator can be cancelled at its awaits
+            self._close_crawl()
+            await fetcher.close()
+        
+    async def _arun_links(self, fetcher: "AsyncFetcher", links: List[Tuple[str, int]]) -> AsyncIterator[Url]:
+        """Fetch links concurrently on the event loop and add them to the UrlManager as their requests finish,
+        stop before the end if max_time runs out
+
+        Args:
+            fetcher (AsyncFetcher): fetcher of the crawl
+            links (List[Tuple[str, int]]): links with the depth where they are crawled
+
+        Yields:
+            AsyncIterator[Url]: Url dataclass of each page crawled
+        """
+        
+        # links not done yet, in crawl order for the checkpoint
+        remaining = dict.fromkeys(links)
+        waiting = iter(links)
+        tasks: Dict[asyncio.Task, Tuple[str, int]] = {}
+        try:
+            while True:
+                for link in islice(waiting, self._max_workers() - len(tasks)): tasks[fetcher.submit(link[0])] = link
+                if not tasks: break
+                
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    link = tasks.pop(task)
+                    del remaining[link]
+                    url, depth = link
+                    page_text = task.result()
+                    
+                    if self.s.progress_bar: self.pb.make_advance(False, True)
+                    else: print(f"    {len(links) - len(remaining)}/{len(links)}", end="\r")
+                    
+                    if page_text is OVER_BUDGET:
+                        self._leftover.append(link)
+                        continue
+                    
+                    url_object = self._add_url(url, page_text, depth) if page_text is not None else None
+                    self._metrics.maybe_dump()
+                    
+                    if self._checkpoint:
+                        self._checkpoint.add_page(url, depth, url_object)
+                        self._pages_since_checkpoint += 1
+                        if self._pages_since_checkpoint >= self.s.checkpoint_interval: self._save_checkpoint(list(remaining) + self._leftover)
+                    
+                    if url_object is not None: yield url_object
+                
+                # requests in flight are cancelled
+                if self._out_of_time():
+                    self._leftover += list(remaining)
+                    break
+        finally:
+            for task in tasks: task.cancel()
+        
+    def _begin_crawl(self, incremental: bool = False):
+        """Open the stores of the crawl and the progress bar before the first page is fetched
+
+        Args:
+            incremental (bool, optional): compare pages to the previous crawl saved in Settings.incremental_path. Defaults to False.
+        """
+        
+        if incremental:
+            self._open_incremental()
+            self._incremental.begin()
+        
+        if self.s.checkpoint_path:
+            self._checkpoint = Checkpoint(self.s.checkpoint_path)
+            self._checkpoint.clear(self.base_url)
+        
         # create progress_bar
         if self.s.progress_bar:
+            from .progressbar import ProgressBar
             self.pb = ProgressBar()
             self.pb.update_task(self.s.depth, 0)
         
-        page_text = self._get_page_selenium(self.base_url, True) if self.s.simulate_human else self._get_page_request(self.base_url)
+        self._started = perf_counter()
+        self._count_page(self.base_url)
+        
+    def _add_first_page(self, page_text: str) -> Url:
+        """Add the page of the base url to UrlManager and collect info
+
+        Args:
+            page_text (str): html page of the base url
+
+        Returns:
+            Url: Url dataclass of the base url
+        """
+        
+        self._frontier.mark_seen(self.base_url)
+        if self._normalizer: self._frontier.mark_seen(self._normalizer.normalize(self.base_url))
+        url_object = self._add_base_url(page_text)
+        if self._checkpoint:
+            # saved at once with its links, a crawl that dies before the first interval can be resumed
+            self._checkpoint.add_page(self.base_url, 0, url_object)
+            self._save_checkpoint()
+        return url_object
+        
+    def _add_base_url(self, page_text: str) -> Url:
+        """Add the page of the base url, its links are only looked for in xpath_restrict_link_crawl
+
+        Args:
+            page_text (str): html page of the base url
+
+        Returns:
+            Url: Url dataclass of the base url
+        """
         
-        # add base url to UrlManager and collect info
-        self._add_url(self.base_url, self._children_element_xpath(page_text))
+        # the parsed page is filtered by the xpath without being serialized again
+        if self.s.parse_html: return self._add_url(self.base_url, page_text, link_xpath=self.s.xpath_restrict_link_crawl)
+        return self._add_url(self.base_url, self._children_element_xpath(page_text))
         
-        for d in range(self.s.depth):
-            
-            # get all links found in precedent pages
-            all_links = self._get_all_links()
-            
-            if self.s.progress_bar: self.pb.make_advance(True, False)
-            else: print(f"Depth = {d+1}/{self.s.depth} | Nb Links = {len(all_links)}")
+    def work(self, backend: FrontierBackend, worker: str = None, lease_time: float = 300, poll_interval: float = 1):
+        """Crawl as one of the workers of a distributed crawl, links are pulled from and pushed to a frontier shared by all the workers.
+        Each worker keeps the pages it has crawled, the results of all the workers are read with load_results.
+        The budgets max_pages, max_pages_per_host and max_time are not shared by the workers and can't be used.
+
+        Args:
+            backend (FrontierBackend): frontier shared by the workers
+            worker (str, optional): id of the worker. Defaults to the host name and process id.
+            lease_time (float, optional): time in seconds after which the links of a worker that has crashed are crawled by another one. Defaults to 300.
+            poll_interval (float, optional): time in seconds to wait when all the links are leased by other workers. Defaults to 1.
+        """
+        
+        if self.s.max_pages or self.s.max_pages_per_host or self.s.max_time:
+            raise ValueError("max_pages, max_pages_per_host and max_time can't be used in a distributed crawl")
+        
+        worker = worker or f"{gethostname()}:{getpid()}"
+        # every worker can seed the crawl, the base url is only queued once
+        backend.push([(self.base_url, 0)])
+        
+        while True:
+            backend.requeue_expired()
+            leased = backend.lease(worker, max(self.s.max_concurrency, 1), lease_time)
+            if not leased:
+                if backend.done(): break
+                sleep(poll_interval)
+                continue
             
-            self._run_layer(all_links)
+            for (url, depth), page_text in zip(leased, self._fetch_layer([url for url, depth in leased])):
+                url_object = None
+                if page_text is not None:
+                    if depth == 0: url_object = self._add_base_url(page_text)
+                    else: url_object = self._add_url(url, page_text, depth)
+                if url_object and depth < self.s.depth: backend.push([(link, depth + 1) for link in url_object.links])
+                backend.ack(url, url_object)
+                self._metrics.maybe_dump()
+            # links are queued in the shared frontier only
+            self._frontier.pop_layer(self.s.depth + 1)
             
-        if self.s.progress_bar: self.pb.close()
+        self._metrics.dump()
+        self._close_sinks()
+        
+    def load_results(self, backend: FrontierBackend):
+        """Merge the results of all the workers of a distributed crawl in the url book, to show or export them
+
+        Args:
+            backend (FrontierBackend): frontier shared by the workers
+        """
+        
+        for url_object in backend.records():
+            if url_object.url not in self._url_book: self._url_book.append(url_object)
+        
+    def stats(self) -> Dict[str, Any]:
+        """Get the metrics of the crawl, stages, hosts and errors are only measured with Settings.metrics
+
+        Returns:
+            Dict[str, Any]: pages crawled, links waiting in the frontier, url normalization stats,
+                counters, latency histograms of each stage and counters of each host
+        """
+        
+        stats = {"pages": len(self._url_book), "pending": len(self._frontier), **self._metrics.stats()}
+        if self._normalizer: stats["normalization"] = self.normalization_stats()
+        return stats
+        
+    def profile_page(self, url: str, path: str = None, sort: str = "cumulative", limit: int = 30) -> str:
+        """Fetch and extract a single page under cProfile, the page is not added to the results
+
+        Args:
+            url (str): url/link of the page
+            path (str, optional): path where the profile is saved for pstats or snakeviz. Defaults to None.
+            sort (str, optional): sort key of the report. Defaults to "cumulative".
+            limit (int, optional): number of functions in the report. Defaults to 30.
+
+        Returns:
+            str: report of the functions where the time was spent
+        """
+        
+        profile = Profile()
+        profile.enable()
+        try:
+            page_text = self._fetch_url(url)
+            if page_text is not None: self._extract_url(url, page_text)
+        finally: profile.disable()
+        
+        if path: profile.dump_stats(path)
+        report = StringIO()
+        Stats(profile, stream=report).sort_stats(sort).print_stats(limit)
+        return report.getvalue()
+        
+    def resume(self, path: str, incremental: bool = False):
+        """Resume a crawl from its checkpoint, pages already crawled are not fetched again
+
+        Args:
+            path (str): path of the checkpoint file of the crawl
+            incremental (bool, optional): True if the crawl was started as incremental. Defaults to False.
+        """
+        
+        if incremental: self._open_incremental()
+        self._checkpoint = Checkpoint(path)
+        base_url, pages, pending = self._checkpoint.load()
+        if base_url != self.base_url: raise ValueError(f"checkpoint {path} is a crawl of {base_url} not of {self.base_url}")
+        if not pages: raise ValueError(f"checkpoint {path} has no page saved, the crawl has to be started again")
+        
+        # restore pages already crawled and the links still to crawl
+        self._started = perf_counter()
+        for url, depth, url_object in pages:
+            self._frontier.mark_seen(url)
+            # pages skipped have not been downloaded and are not counted in the budgets
+            if url_object:
+                self._count_page(url)
+                self._url_book.append(url_object)
+        if self._normalizer: self._frontier.mark_seen(self._normalizer.normalize(self.base_url))
+        for url, depth in pending: self._frontier.push(url, depth)
+        
+        first_depth = min([depth for url, depth in pending], default=self.s.depth + 1)
+        
+        if self.s.progress_bar:
+            from .progressbar import ProgressBar
+            self.pb = ProgressBar()
+            self.pb.update_task(self.s.depth, 0)
+            for _ in range(1, min(first_depth, self.s.depth + 1)): self.pb.make_advance(True, False)
+        
+        self._crawl(first_depth)
+        
+    def _crawl(self, first_depth: int):
+        """Crawl layer by layer the links of the frontier from a depth to the max depth
+
+        Args:
+            first_depth (int): depth of the first layer to crawl
+        """
+        
+        if isinstance(self._frontier, PriorityFrontier): self._crawl_best_first()
+        else:
+            for d in range(first_depth, self.s.depth + 1):
+                if self._budget_exhausted(): break
+                links = self._next_layer(d)
+                # the links popped are still pending until they are done
+                if self._checkpoint: self._save_checkpoint(links + self._leftover)
+                self._run_links(links)
+                if self._checkpoint: self._save_checkpoint(self._leftover)
+        
+        self._finish_crawl()
+    
+    def _finish_crawl(self):
+        """Save the crawl and close its stores, processes, progress bar and sinks
+        """
+        
+        self._save_crawl()
+        self._close_crawl()
+    
+    def _save_crawl(self):
+        """Save a crawl that has run to the end: the incremental store becomes the previous crawl of the next one
+        and the links left by the budgets are kept in the checkpoint
+        """
+        
+        if self._incremental is not None: self._close_incremental()
+        # links not crawled because of the budgets are kept to resume the crawl
+        if self._checkpoint: self._save_checkpoint(self._leftover)
+    
+    def _close_crawl(self):
+        """Close the stores, processes, browsers, progress bar and sinks of the crawl, also when the crawl is stopped before the end
+        """
+        
+        if self._incremental is not None:
+            # the pages of an unfinished crawl are forgotten by the next one
+            self._incremental.close()
+            self._incremental = None
+        if self._extraction_pool is not None: self._extraction_pool.close()
+        if self.driver_pool is not None:
+            # the browsers are quit now, the next crawl opens new ones
+            self.driver_pool.close()
+            self.driver_pool = DriverPool(self.driver_pool.factory, self.driver_pool.size, self.driver_pool.recycle_after)
+        self._metrics.dump()
+        if self.s.progress_bar and getattr(self, "pb", None) is not None:
+            self.pb.close()
+            self.pb = None
+        self._close_sinks()
+        self._close_seen_sets()
+        if self._checkpoint:
+            self._checkpoint.close()
+            self._checkpoint = None
+    
+    def _crawl_best_first(self):
+        """Crawl the links with the highest priority score first, a few at a time to fetch them concurrently,
+        until the frontier is empty or a budget runs out
+        """
+        
+        while len(self._frontier) and not self._budget_exhausted():
+            self._run_links(self._next_best())
+            if self._checkpoint and self._pages_since_checkpoint >= self.s.checkpoint_interval: self._save_checkpoint(self._leftover)
+    
+    def _next_layer(self, depth: int) -> List[Tuple[str, int]]:
+        """Take the links found in the precedent depth that have never been crawled
+
+        Args:
+            depth (int): depth of the layer
+
+        Returns:
+            List[Tuple[str, int]]: links of the layer with their depth
+        """
+        
+        links = [(link, depth) for link in self._frontier.pop_layer(depth)]
+        
+        if self.s.progress_bar: self.pb.make_advance(True, False)
+        else: print(f"Depth = {depth}/{self.s.depth} | Nb Links = {len(links)}")
+        
+        # update and reset link progress bar for a new depth
+        if self.s.progress_bar:
+            self.pb.update_task(0, len(links))
+            self.pb.make_reset(False, True)
+        return links
+    
+    def _next_best(self) -> List[Tuple[str, int]]:
+        """Take the links with the highest priority score, as many as can be fetched at the same time
+
+        Returns:
+            List[Tuple[str, int]]: links with their depth
+        """
+        
+        links = self._frontier.pop_best(self._max_workers())
+        
+        if self.s.progress_bar: self.pb.update_task(0, self.s.max_pages or self._pages_taken + len(self._frontier))
+        else: print(f"Pages = {self._pages_taken} | Nb Links = {len(self._frontier)}", end="\r")
+        return links
+    
+    def _count_page(self, url: str):
+        """Count a page in the budgets
+
+        Args:
+            url (str): url/link of the page
+        """
+        
+        self._pages_taken += 1
+        if self.s.max_pages_per_host:
+            host = urlsplit(url).netloc
+            self._host_pages[host] = self._host_pages.get(host, 0) + 1
+    
+    def _release_page(self, url: str):
+        """Give back the budget of a page reserved but not downloaded, can be called from multiple threads
+
+        Args:
+            url (str): url/link of the page
+        """
+        
+        if self._started is None: return
+        with self._budget_lock:
+            self._pages_taken -= 1
+            if self.s.max_pages_per_host:
+                host = urlsplit(url).netloc
+                self._host_pages[host] = self._host_pages.get(host, 0) - 1
+    
+    def _over_budget(self, url: str) -> bool:
+        """Check if a page can't be downloaded because of max_pages or max_pages_per_host,
+        budgets are only counted by the crawls started with start, resume or astart
+
+        Args:
+            url (str): url/link of the page
+
+        Returns:
+            bool: True if the page has to be left for later
+        """
+        
+        if self._started is None: return False
+        return bool(self.s.max_pages and self._pages_taken >= self.s.max_pages) or bool(
+            self.s.max_pages_per_host and self._host_pages.get(urlsplit(url).netloc, 0) >= self.s.max_pages_per_host
+        )
+    
+    def _reserve_page(self, url: str) -> bool:
+        """Count a page in the budgets right before it is downloaded, links skipped before are not counted.
+        Can be called from multiple threads
+
+        Args:
+            url (str): url/link of the page
+
+        Returns:
+            bool: True if the page can be downloaded, False if it is over budget
+        """
+        
+        if self._started is None: return True
+        with self._budget_lock:
+            if self._over_budget(url): return False
+            self._count_page(url)
+            return True
+    
+    def _out_of_time(self) -> bool:
+        """Check if max_time has elapsed since the start of the crawl
+
+        Returns:
+            bool: True if no new page can be fetched
+        """
+        
+        return bool(self.s.max_time and perf_counter() - self._started >= self.s.max_time)
+    
+    def _budget_exhausted(self) -> bool:
+        """Check if no more pages can be fetched because of max_pages or max_time
+
+        Returns:
+            bool: True if the crawl has to stop
+        """
+        
+        return self._out_of_time() or bool(self.s.max_pages and self._pages_taken >= self.s.max_pages)
     
-    def show(self) -> pd.DataFrame:
+    def show(self) -> "pd.DataFrame":
         """Show results in a pd.Dataframe
 
         Returns:
             pd.DataFrame: results with info of the page in a column
         """
         
-        return pd.DataFrame(self._url_to_dict())
+        import pandas as pd
+        with self._metrics.time("export"): return pd.DataFrame(self._url_to_dict())
               
     def to_json(self, path: str):
         """Save results to JSON format
@@ -80,7 +616,17 @@ class Crawler(UrlManager):
             path (str): path of the results file
         """
         
-        with open(path, "w") as f: dump(self._url_to_dict(), f)
+        with self._metrics.time("export"), open(path, "w") as f: dump(self._url_to_dict(), f)
+            
+    def to_jsonl(self, path: str):
+        """Save results to JSON Lines format, one page per line
+
+        Args:
+            path (str): path of the results file
+        """
+        
+        with self._metrics.time("export"), JsonLinesSink(path) as sink:
+            for url_object in self._url_book: sink.write(self._url_to_row(url_object))
             
     def to_csv(self, path: str):
         """Save results to CSV format
@@ -89,8 +635,10 @@ class Crawler(UrlManager):
             path (str): path of the results file
         """
         
-        df = pd.DataFrame(self._url_to_dict())
-        df.to_csv(path, index=False)
+        import pandas as pd
+        with self._metrics.time("export"):
+            df = pd.DataFrame(self._url_to_dict())
+            df.to_csv(path, index=False)
         
     def to_excel(self, path: str):
         """Save results to CSV format
@@ -99,33 +647,312 @@ class Crawler(UrlManager):
             path (str): path of the results file
         """
         
-        df = pd.DataFrame(self._url_to_dict())
-        df.to_excel(path)
+        import pandas as pd
+        with self._metrics.time("export"):
+            df = pd.DataFrame(self._url_to_dict())
+            df.to_excel(path)
 
-    def _run_layer(self, layer_sub_links: List[str]):
-        """Run all links in the current depth and add them to the UrlManager
+    def _open_incremental(self):
+        """Open the store of the previous crawl for an incremental crawl
+        """
+        
+        if not self.s.incremental_path: raise ValueError("incremental crawl needs Settings.incremental_path")
+        self._incremental = IncrementalState(self.s.incremental_path)
+        
+    def _close_incremental(self):
+        """Add the pages of the previous crawl that have not been found again and save the crawl for the next one
+        """
+        
+        for url_object in self._incremental.removed():
+            url_object.status = "removed"
+            self._url_book.append(url_object)
+            if self._sinks:
+                row = self._url_to_row(url_object)
+                for sink in self._sinks: sink.write(row)
+        
+        self._incremental.commit()
+        self._incremental.close()
+        self._incremental = None
+    
+    def _add_url(self, url: str, page_text: str, depth: int = 0, link_xpath: str = None, extracted: Url = None) -> Url:
+        """Add a page to the url book and queue its links, the time spent is measured in the extract stage
 
         Args:
-            layer_sub_links (List[str]): all the links found in the precedent depth
+            url (str): url/link to add
+            page_text (str): html page of the url
+            depth (int, optional): depth where the url has been found. Defaults to 0.
+            link_xpath (str, optional): with parse_html, xpath of the elements where links are looked for. Defaults to None.
+            extracted (Url, optional): Url dataclass of the page already extracted in another process. Defaults to None.
+
+        Returns:
+            Url: the new Url dataclass or None if url is already in url book
         """
         
-        length_layer_sub_links = len(layer_sub_links)
+        with self._metrics.time("extract"): return super(Crawler, self)._add_url(url, page_text, depth, link_xpath, extracted)
+    
+    def _extract_url(self, url: str, page_text: str, link_xpath: str = None, extracted: Url = None) -> Url:
+        """Create a new Url dataclass of a page, in incremental crawl the Url of the previous crawl
+        is carried forward without extraction if the content of the page has not changed
+
+        Args:
+            url (str): url/link of the page
+            page_text (str): html page of the url
+            link_xpath (str, optional): with parse_html, xpath of the elements where links are looked for. Defaults to None.
+            extracted (Url, optional): Url dataclass of the page already extracted in another process. Defaults to None.
+
+        Returns:
+            Url: Url dataclass of the page
+        """
         
-        # update and reset link progress bar for a new depth
-        if self.s.progress_bar:
-            self.pb.update_task(0, length_layer_sub_links)
-            self.pb.make_reset(False, True)
-            
-        for i, url in enumerate(layer_sub_links):
+        if self._incremental is None: return super(Crawler, self)._extract_url(url, page_text, link_xpath, extracted)
+        
+        page_hash = content_hash(page_text)
+        previous = self._incremental.previous(url)
+        if previous and previous[0] == page_hash:
+            url_object = previous[1]
+            url_object.status = "unchanged"
+        else:
+            url_object = super(Crawler, self)._extract_url(url, page_text, link_xpath, extracted)
+            url_object.status = "changed" if previous else "new"
+        
+        self._incremental.add(url, page_hash, url_object)
+        return url_object
+    
+    def _needs_extraction(self, url: str, page_text: str) -> bool:
+        """Check if a page has to be extracted, in incremental crawl the pages unchanged since the previous crawl are carried forward
+
+        Args:
+            url (str): url/link of the page
+            page_text (str): html page of the url
+
+        Returns:
+            bool: True if the page is new or has changed
+        """
+        
+        return self._incremental is None or self._incremental.previous_hash(url) != content_hash(page_text)
+    
+    def _run_links(self, links: List[Tuple[str, int]]):
+        """Fetch links and add them to the UrlManager, stop before the end if max_time runs out
+
+        Args:
+            links (List[Tuple[str, int]]): links with the depth where they are crawled
+        """
+        
+        urls = [url for url, depth in links]
+        pages = zip(urls, self._fetch_layer(urls))
+        # pages are extracted in other processes while the next ones are fetched, pages unchanged since the previous crawl are not sent
+        if self._extraction_pool is not None: pages = self._extraction_pool.extract(pages, needs_extraction=self._needs_extraction if self._incremental else None)
+        else: pages = ((url, page_text, None) for url, page_text in pages)
+        
+        for i, ((url, page_text, extracted), (_, depth)) in enumerate(zip(pages, links)):
             
             if self.s.progress_bar: self.pb.make_advance(False, True)
-            else: print(f"    {i+1}/{length_layer_sub_links}", end="\r")
+            else: print(f"    {i+1}/{len(links)}", end="\r")
+            
+            if page_text is OVER_BUDGET: self._leftover.append((url, depth))
+            else:
+                url_object = self._add_url(url, page_text, depth, extracted=extracted) if page_text is not None else None
+                self._metrics.maybe_dump()
+                
+                if self._checkpoint:
+                    self._checkpoint.add_page(url, depth, url_object)
+                    self._pages_since_checkpoint += 1
+                    # links after this one have not been added yet
+                    if self._pages_since_checkpoint >= self.s.checkpoint_interval: self._save_checkpoint(links[i+1:] + self._leftover)
+            
+            # pages still being fetched are dropped
+            if self._out_of_time():
+                self._leftover += links[i+1:]
+                break
+    
+    def _save_checkpoint(self, layer_pending: List[Tuple[str, int]] = None):
+        """Save the pages done and the links still to crawl in the checkpoint
+
+        Args:
+            layer_pending (List[Tuple[str, int]], optional): links of the current layer not done yet. Defaults to None.
+        """
+        
+        self._checkpoint.save((layer_pending or []) + self._frontier.pending())
+        self._pages_since_checkpoint = 0
+    
+    def _fetch_layer(self, layer_sub_links: List[str]) -> Iterator[str]:
+        """Fetch all the links of a layer, concurrently if max_concurrency (or driver_pool_size with selenium) is above 1.
+        Pages are yielded in the same order as the links whatever the order requests finish.
+
+        Args:
+            layer_sub_links (List[str]): all the links of the layer
+
+        Yields:
+            Iterator[str]: html page of each link or None if the link was skipped
+        """
+        
+        max_workers = self._max_workers()
+        if max_workers <= 1:
+            for url in layer_sub_links: yield self._fetch_url(url)
+            return
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            yield from executor.map(self._fetch_url, layer_sub_links)
+    
+    def _max_workers(self) -> int:
+        """Number of pages fetched at the same time
+
+        Returns:
+            int: max_concurrency or driver_pool_size with selenium
+        """
+        
+        # each selenium webdriver of the pool can only load one page at a time
+        return max(self.s.driver_pool_size if self.s.simulate_human and not self.s.hybrid_fetch else self.s.max_concurrency, 1)
+    
+    def _fetch_url(self, url: str) -> str:
+        """Verify and get the html page of a link, can be called from multiple threads
+
+        Args:
+            url (str): url/link to fetch
+
+        Returns:
+            str: html page, None if the link is skipped or OVER_BUDGET if it is left by max_pages or max_pages_per_host
+        """
+        
+        if not self._allowed_link(url): return None
+        if self._over_budget(url): return OVER_BUDGET
+        
+        single_request = self._single_request()
+        with self._domain_limiter.limit(url), self._metrics.time("fetch"):
+            if not single_request and not self._verify_headers(url): return None
+            # only pages downloaded count in the budgets
+            if not self._reserve_page(url): return OVER_BUDGET
+            # go straight to the end of redirections already followed
+            page_text = self._get_page(self._resolve_redirect(url), verify=single_request)
+            if page_text is None: self._release_page(url)
+            return page_text
+    
+    def _allowed_link(self, url: str) -> bool:
+        """Check if a link can be fetched: in the base domain with restrict_to_domain and allowed by robots.txt in polite mode.
+        The robots.txt of a new host is requested, so it can block
+
+        Args:
+            url (str): url/link to fetch
+
+        Returns:
+            bool: True if the link can be fetched
+        """
+        
+        # skip current url if base domain not in current url
+        if self.s.restrict_to_domain and self.base_domain not in url: return False
+        return not self._scheduler or self._scheduler.allowed(url)
+    
+    def _single_request(self) -> bool:
+        """Check if pages are verified with their GET request instead of a HEAD request
+
+        Returns:
+            bool: True if there is no HEAD request
+        """
+        
+        # selenium can't check the headers of the page it loads
+        return self.s.single_request and (not self.s.simulate_human or self.s.hybrid_fetch)
+    
+    def _create_retry(self) -> Retry:
+        """Create the retry policy of the requests, shared by the requests session and the async fetcher
+
+        Returns:
+            Retry: retry policy of urllib3
+        """
+        
+        return Retry(
+            total=self.s.retries,
+            backoff_factor=self.s.retry_backoff,
+            # in polite mode throttled requests are made again by _request after the backoff of the scheduler
+            status_forcelist=[status for status in self.s.retry_status if not (self.s.polite and status in THROTTLE_STATUS)],
+            respect_retry_after_header=not self.s.polite,
+            allowed_methods=["HEAD", "GET"],
+            raise_on_status=False,
+        )
+    
+    def _create_session(self) -> requests.Session:
+        """Create the HTTP session shared by all the requests of the crawler,
+        connections are kept alive and reused between pages of the same host
+
+        Returns:
+            requests.Session: session with pooled and retrying adapters
+        """
+        
+        adapter = HTTPAdapter(pool_connections=self.s.pool_connections, pool_maxsize=self.s.pool_maxsize, max_retries=self._create_retry())
+        
+        session = requests.Session()
+        session.headers.update(self.s.request_header)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Make a request with the session, paced by the politeness scheduler if there is one.
+        A request throttled with 429 or 503 is made again once the host backoff has elapsed, up to polite_max_retries times
+
+        Args:
+            method (str): HEAD or GET
+            url (str): url/link
+
+        Returns:
+            requests.Response: response of the request
+        """
+        
+        attempt = 0
+        while True:
+            if self._scheduler:
+                with self._metrics.time("polite_wait"): self._scheduler.wait(url)
             
-            # skip current url if base domain not in current url
-            if self.s.restrict_to_domain and self.base_domain not in url: continue
+            try:
+                with self._metrics.time(method.lower()): response = self.session.request(method, url, timeout=self.s.get_timeout, **kwargs)
+            except:
+                self._metrics.count("errors", host=urlsplit(url).netloc)
+                raise
             
-            if not self._verify_headers(url): continue
-            self._add_url(url, self._get_page_selenium(url) if self.s.simulate_human else self._get_page_request(url))
+            self._request_done(url, response.status_code, response.headers)
+            if not self._retry_throttled(response.status_code, attempt): return response
+            response.close()
+            attempt += 1
+    
+    def _request_done(self, url: str, status_code: int, headers: Dict[str, str]):
+        """Give the answer of a request to the politeness scheduler and the metrics
+
+        Args:
+            url (str): url/link requested
+            status_code (int): status code of the answer
+            headers (Dict[str, str]): headers of the answer
+        """
+        
+        if self._scheduler: self._scheduler.feedback(url, status_code, headers.get("Retry-After"))
+        if self._metrics.enabled:
+            host = urlsplit(url).netloc
+            self._metrics.count("requests", host=host)
+            self._metrics.count(f"status_{status_code}", host=host)
+    
+    def _retry_throttled(self, status_code: int, attempt: int) -> bool:
+        """Check if a request throttled by its host has to be made again after the backoff of the politeness scheduler
+
+        Args:
+            status_code (int): status code of the answer
+            attempt (int): number of times the request has already been made again
+
+        Returns:
+            bool: True if the request has to be made again
+        """
+        
+        return self._scheduler is not None and status_code in THROTTLE_STATUS and attempt < self.s.polite_max_retries
+    
+    def _fetch_robots(self, url: str) -> Tuple[int, str]:
+        """Get a robots.txt file for the politeness scheduler
+
+        Args:
+            url (str): url of the robots.txt
+
+        Returns:
+            Tuple[int, str]: status code and text of the robots.txt
+        """
+        
+        response = self.session.get(url, timeout=self.s.get_timeout)
+        return response.status_code, response.text
     
     def _verify_headers(self, url: str) -> bool:
         """Verify if link return a 200 status code and is a valid content type or if it's a 301 or 302 recall function with the new location.
@@ -137,27 +964,182 @@ class Crawler(UrlManager):
             bool: return True if status code 200 and is a valid content type
         """               
         
-        try: head = requests.head(url)
+        url = self._resolve_redirect(url)
+        try: head = self._request("HEAD", url, allow_redirects=False)
         except: return False
         else:
             # return True if content type is in the valid content types
-            if head.status_code == 200: return any([vct in head.headers["Content-Type"] for vct in self.s.valid_content_type])
+            if head.status_code == 200: return self._valid_content_type(head)
             # if status code is 301 or 302 recall verify_headers with new location 
-            elif head.status_code == 301 or head.status_code == 302: return self._verify_headers(self._clean_link(url, head.headers["Location"]))
-            else: return False
+            location = self._redirect_location(url, head)
+            return self._verify_headers(location) if location else False
+    
+    def _redirect_location(self, url: str, head: requests.Response) -> str:
+        """Remember the location of a 301 or 302 redirection answered to a HEAD request
+
+        Args:
+            url (str): url/link requested
+            head (requests.Response): response of the HEAD request
+
+        Returns:
+            str: location of the redirection or None if the response is not a redirection
+        """
+        
+        if head.status_code != 301 and head.status_code != 302: return None
+        self._redirects[url] = self._clean_link(url, head.headers["Location"])
+        return self._redirects[url]
+    
+    def _remember_redirects(self, urls: List[str]):
+        """Remember the redirections followed by a GET request to not request them again
+
+        Args:
+            urls (List[str]): urls requested in order, the last one is the url of the final response
+        """
+        
+        for redirect, location in zip(urls, urls[1:]): self._redirects[redirect] = location
+    
+    def _valid_content_type(self, response: requests.Response) -> bool:
+        """Check if the content type of a response is in the valid content types
+
+        Args:
+            response (requests.Response): response of a HEAD or GET request
+
+        Returns:
+            bool: True if the content type is valid
+        """
+        
+        return any([vct in response.headers.get("Content-Type", "") for vct in self.s.valid_content_type])
+    
+    def _resolve_redirect(self, url: str) -> str:
+        """Follow the redirections already seen during the crawl, each redirection is only requested once
+
+        Args:
+            url (str): url/link
+
+        Returns:
+            str: final url of the known redirections
+        """
+        
+        seen = {url}
+        while url in self._redirects:
+            url = self._redirects[url]
+            # stop on redirection loops
+            if url in seen: break
+            seen.add(url)
+        return url
     
-    def _get_page_request(self, url: str) -> str:
+    def _get_page(self, url: str, first_page: bool = False, verify: bool = False) -> str:
+        """Get the html page of a url with requests or selenium module depending on the settings,
+        in hybrid mode the page is rendered with selenium only if the requests page needs it
+
+        Args:
+            url (str): url/link
+            first_page (bool, optional): True if url is the base url. Defaults to False.
+            verify (bool, optional): check status code and content type with the GET request of requests module. Defaults to False.
+
+        Returns:
+            str: html page or None
+        """
+        
+        if not self.s.simulate_human: return self._get_page_request(url, verify)
+        if not self.s.hybrid_fetch: return self._get_page_selenium(url, first_page)
+        
+        page_text = self._get_page_request(url, verify)
+        if page_text is None: return None
+        return self._get_page_selenium(url, first_page) if self._needs_rendering(url, page_text, first_page) else page_text
+    
+    def _needs_rendering(self, url: str, page_text: str, first_page: bool = False) -> bool:
+        """Check if a page got with requests module has to be rendered with selenium in hybrid mode
+
+        Args:
+            url (str): url/link
+            page_text (str): html page got with requests module
+            first_page (bool, optional): True if url is the base url. Defaults to False.
+
+        Returns:
+            bool: True if the page has to be rendered
+        """
+        
+        # the request failed or the first page has to be scrolled down
+        if page_text == "None" or (first_page and self.s.scroll_first_page): return True
+        if self._re_render_if_match and self._re_render_if_match.search(page_text): return True
+        if any([name in self._re_search and not self._re_search[name].search(page_text) for name in self.s.render_if_empty]): return True
+        return bool(self.s.render_predicate and self.s.render_predicate(url, page_text))
+    
+    def _get_page_request(self, url: str, verify: bool = False) -> str:
         """Make a GET request and get the html page of a specific url using requests module
 
         Args:
             url (str): url/link
+            verify (bool, optional): check status code and content type from the headers before downloading the page,
+                replace the HEAD request of _verify_headers. Defaults to False.
 
         Returns:
             str: html page or None 
         """
         
-        try: return requests.get(url, headers=self.s.request_header, timeout=self.s.get_timeout).text
-        except: return "None"
+        cache_entry, headers = self._conditional_request(url)
+        if not verify:
+            try: response = self._request("GET", url, headers=headers)
+            except: return "None"
+            return self._read_response(url, response, cache_entry)
+        
+        try:
+            with self._request("GET", url, stream=True, headers=headers) as response:
+                self._remember_redirects([redirect.url for redirect in response.history] + [response.url])
+                # closing the response without reading it stops the download of invalid pages
+                if not self._accept_response(response, cache_entry): return None
+                return self._read_response(url, response, cache_entry)
+        except: return None
+    
+    def _conditional_request(self, url: str) -> Tuple[CacheEntry, Dict[str, str]]:
+        """Get the page stored in the http cache for a url and the headers of its conditional GET request
+
+        Args:
+            url (str): url/link
+
+        Returns:
+            Tuple[CacheEntry, Dict[str, str]]: page stored or None, headers to add to the GET request
+        """
+        
+        # ask the server to answer 304 if the page stored in the http cache has not changed
+        cache_entry = self._http_cache.get(url) if self._http_cache is not None else None
+        return cache_entry, cache_entry.conditional_headers() if cache_entry else {}
+    
+    def _accept_response(self, response: requests.Response, cache_entry: CacheEntry = None) -> bool:
+        """Check from the headers of a GET request if the page has to be downloaded, when the GET request replaces the HEAD request
+
+        Args:
+            response (requests.Response): response of the GET request, before its body is read
+            cache_entry (CacheEntry, optional): page stored in the http cache for the url. Defaults to None.
+
+        Returns:
+            bool: True if the page stored is still valid or if status code is 200 with a valid content type
+        """
+        
+        if response.status_code == 304: return cache_entry is not None
+        return response.status_code == 200 and self._valid_content_type(response)
+    
+    def _read_response(self, url: str, response: requests.Response, cache_entry: CacheEntry = None) -> str:
+        """Get the html page of a response and keep the http cache up to date
+
+        Args:
+            url (str): url/link requested
+            response (requests.Response): response of the GET request
+            cache_entry (CacheEntry, optional): page stored in the http cache for the url. Defaults to None.
+
+        Returns:
+            str: html page
+        """
+        
+        if response.status_code == 304 and cache_entry:
+            self._http_cache.revalidate(url)
+            return cache_entry.body
+        
+        text = response.text
+        if self._metrics.enabled: self._metrics.count("bytes", len(response.content), urlsplit(url).netloc)
+        if self._http_cache is not None and response.status_code == 200: self._http_cache.put(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), text)
+        return text
     
     def _get_page_selenium(self, url: str, first_page: bool = False) -> str:
         """Make a GET request and get the html page of a specific url using selenium module
@@ -171,44 +1153,52 @@ class Crawler(UrlManager):
         """
         
         try:
-            self.driver.get(url)
-            # scroll down all page or first is settings is set True
-            if self.s.scroll_all_page or (first_page and self.s.scroll_first_page): self._selenium_scroll_page(self.driver)
-            return self.driver.page_source
-        except: return "None"
+            with self.driver_pool.acquire() as driver:
+                with self._metrics.time("selenium"): driver.get(url)
+                # scroll down all page or first is settings is set True
+                if self.s.scroll_all_page or (first_page and self.s.scroll_first_page):
+                    with self._metrics.time("scroll"): self._selenium_scroll_page(driver)
+                return driver.page_source
+        except:
+            self._metrics.count("errors", host=urlsplit(url).netloc)
+            return "None"
     
-    def _selenium_scroll_page(self, driver: WebDriver):
-        """Script to scroll down a page on selenim webdriver
+    def _create_driver(self) -> "WebDriver":
+        """Open and configure a new selenium webdriver for the pool
 
-        Args:
-            driver (WebDriver): driver with set page to scroll down
+        Returns:
+            WebDriver: firefox webdriver
         """
         
-        def check_for_end_page(driver: WebDriver, last_height: int, occurence: int = 0, waittime: int = 0.05) -> bool:
-            """Check if page height has not move since last scroll down and page has not load new content
+        from selenium.webdriver import Firefox
+        from selenium.webdriver.firefox.options import Options
+        
+        driver_options = Options()
+        driver_options.headless = self.s.headless
+        driver = Firefox(options=driver_options)
+        driver.set_page_load_timeout(self.s.get_timeout)
+        return driver
+    
+    def _selenium_scroll_page(self, driver: "WebDriver") -> dict:
+        """Scroll down a page on selenium webdriver until its content stops growing,
+        the whole scroll runs in the page and returns as soon as no new content is loaded
 
-            Args:
-                driver (WebDriver): selenium webdriver
-                last_height (int): height after last scroll down
-                occurence (int, optional): number of time function have wait the page to load new content. Defaults to 0.
-                waittime (int, optional): wait time between each occurence. Defaults to 0.05.
+        Args:
+            driver (WebDriver): driver with set page to scroll down
 
-            Returns:
-                bool: True if no new content has been generated, or False if no new content has been generated.
-            """
-            
-            MAX_OCCURENCE = 20
-            if occurence == MAX_OCCURENCE: return True
-            if driver.execute_script("return document.body.scrollHeight") == last_height:
-                sleep(waittime)
-                return check_for_end_page(driver, last_height, occurence+1)
-            else: return False
-        
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        while True:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            if check_for_end_page(driver, last_height): break
-            last_height = driver.execute_script("return document.body.scrollHeight")
+        Returns:
+            dict: why the scroll stopped (end, scrolls, items or time), number of scrolls and height of the page
+        """
+        
+        driver.set_script_timeout(self.s.scroll_time_budget + self.s.get_timeout)
+        return driver.execute_async_script(
+            SCROLL_SCRIPT,
+            self.s.scroll_max_scrolls,
+            self.s.scroll_max_items,
+            self.s.scroll_item_selector,
+            self.s.scroll_time_budget * 1000,
+            self.s.scroll_idle_time * 1000,
+        )
     
     def _children_element_xpath(self, text: str) -> str:
         """Use to filter some elements of a page with xpath, that will be used to find links
@@ -226,4 +1216,8 @@ class Crawler(UrlManager):
         return "\n".join([etree.tostring(elem).decode() for elem in elements])
     
     def __del__(self):
-        if self.s.simulate_human: self.driver.quit()
\ No newline at end of file
+        if hasattr(self, "session"): self.session.close()
+        if getattr(self, "_http_cache", None) is not None: self._http_cache.close()
+        if getattr(self, "driver_pool", None) is not None: self.driver_pool.close()
+        if getattr(self, "_extraction_pool", None) is not None: self._extraction_pool.close()
+        if hasattr(self, "_seen_sets"): self._close_seen_sets()
\ No newline at end of file
@@ -0,0 +1,238 @@
+import sqlite3
+from threading import Lock
+from time import time
+from json import dumps, loads
+from dataclasses import asdict
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .url import Url
+
+QUEUED, LEASED, DONE = 0, 1, 2
+
+# the scripts of RedisBackend run atomically on the redis server, an url is always either queued, leased or done
+# whenever a worker dies. Queue scores are depth then push order, formatted as integers to keep their precision
+# KEYS: seen, depths, queue, counter | ARGV: url, depth, url, depth...
+REDIS_PUSH = """
+local queued = 0
+for i = 1, #ARGV, 2 do
+    if redis.call("SADD", KEYS[1], ARGV[i]) == 1 then
+        redis.call("HSET", KEYS[2], ARGV[i], ARGV[i + 1])
+        redis.call("ZADD", KEYS[3], string.format("%.0f", ARGV[i + 1] * 1e12 + redis.call("INCR", KEYS[4])), ARGV[i])
+        queued = queued + 1
+    end
+end
+return queued
+"""
+
+# KEYS: queue, leases, depths | ARGV: count, lease expiration
+REDIS_LEASE = """
+local popped = redis.call("ZPOPMIN", KEYS[1], ARGV[1])
+local leased = {}
+for i = 1, #popped, 2 do
+    redis.call("ZADD", KEYS[2], ARGV[2], popped[i])
+    leased[#leased + 1] = popped[i]
+    leased[#leased + 1] = redis.call("HGET", KEYS[3], popped[i])
+end
+return leased
+"""
+
+# KEYS: leases, depths, queue, counter | ARGV: now
+REDIS_REQUEUE = """
+local expired = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1])
+for _, url in ipairs(expired) do
+    redis.call("ZREM", KEYS[1], url)
+    redis.call("ZADD", KEYS[3], string.format("%.0f", redis.call("HGET", KEYS[2], url) * 1e12 + redis.call("INCR", KEYS[4])), url)
+end
+return #expired
+"""
+
+
+class FrontierBackend():
+    """Frontier and seen set shared by the workers of a distributed crawl.
+    Urls are leased to a worker and acknowledged when they are done,
+    urls leased by a worker that has crashed are queued again when their lease expires.
+    """
+
+    def push(self, urls: Iterable[Tuple[str, int]]) -> int:
+        """Queue urls that have never been seen
+
+        Args:
+            urls (Iterable[Tuple[str, int]]): urls/links with the depth where they will be crawled
+
+        Returns:
+            int: number of urls queued
+        """
+
+        raise NotImplementedError
+
+    def lease(self, worker: str, count: int, lease_time: float) -> List[Tuple[str, int]]:
+        """Take queued urls for a time, the lowest depths first
+
+        Args:
+            worker (str): id of the worker
+            count (int): max number of urls to lease
+            lease_time (float): time in seconds before the urls are queued again if they are not acknowledged
+
+        Returns:
+            List[Tuple[str, int]]: urls leased with their depth
+        """
+
+        raise NotImplementedError
+
+    def ack(self, url: str, url_object: Url = None):
+        """Mark a leased url as done
+
+        Args:
+            url (str): url/link leased
+            url_object (Url, optional): Url dataclass of the page or None if it has been skipped. Defaults to None.
+        """
+
+        raise NotImplementedError
+
+    def requeue_expired(self) -> int:
+        """Queue again the urls whose lease has expired
+
+        Returns:
+            int: number of urls queued again
+        """
+
+        raise NotImplementedError
+
+    def done(self) -> bool:
+        """Check if the crawl is over
+
+        Returns:
+            bool: True if no url is queued or leased
+        """
+
+        raise NotImplementedError
+
+    def records(self) -> Iterator[Url]:
+        """Get the results of all the workers
+
+        Yields:
+            Iterator[Url]: Url dataclass of each page crawled
+        """
+
+        raise NotImplementedError
+
+
+class SQLiteBackend(FrontierBackend):
+    """Frontier backend in a SQLite file, the lock of the file is shared by the worker processes of the same machine
+
+    Args:
+        path (str): path of the SQLite file
+        clock (Callable[[], float], optional): time in seconds, the same for all the workers. Defaults to time.time.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time):
+
+        self.path = path
+        self.clock = clock
+
+        self._lock = Lock()
+        # transactions are started explicitly to lock the file while urls are leased
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY, depth INTEGER, state INTEGER, worker TEXT, lease_until REAL, record TEXT
+            );
+            CREATE INDEX IF NOT EXISTS urls_state ON urls (state, depth);
+        """)
+
+    def push(self, urls: Iterable[Tuple[str, int]]) -> int:
+        with self._lock:
+            cursor = self._db.executemany("INSERT OR IGNORE INTO urls (url, depth, state) VALUES (?, ?, ?)", [(url, depth, QUEUED) for url, depth in urls])
+            return cursor.rowcount
+
+    def lease(self, worker: str, count: int, lease_time: float) -> List[Tuple[str, int]]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                leased = self._db.execute("SELECT url, depth FROM urls WHERE state = ? ORDER BY depth, rowid LIMIT ?", (QUEUED, count)).fetchall()
+                self._db.executemany(
+                    "UPDATE urls SET state = ?, worker = ?, lease_until = ? WHERE url = ?",
+                    [(LEASED, worker, self.clock() + lease_time, url) for url, depth in leased],
+                )
+                self._db.execute("COMMIT")
+            except:
+                self._db.execute("ROLLBACK")
+                raise
+        return leased
+
+    def ack(self, url: str, url_object: Url = None):
+        with self._lock: self._db.execute(
+            "UPDATE urls SET state = ?, record = ? WHERE url = ? AND state != ?",
+            (DONE, dumps(asdict(url_object)) if url_object else None, url, DONE),
+        )
+
+    def requeue_expired(self) -> int:
+        with self._lock:
+            return self._db.execute("UPDATE urls SET state = ?, worker = NULL WHERE state = ? AND lease_until < ?", (QUEUED, LEASED, self.clock())).rowcount
+
+    def done(self) -> bool:
+        with self._lock: return self._db.execute("SELECT COUNT(*) FROM urls WHERE state != ?", (DONE,)).fetchone()[0] == 0
+
+    def records(self) -> Iterator[Url]:
+        with self._lock: rows = self._db.execute("SELECT record FROM urls WHERE state = ? AND record IS NOT NULL ORDER BY depth, rowid", (DONE,)).fetchall()
+        for record, in rows: yield Url(**loads(record))
+
+    def close(self):
+        with self._lock: self._db.close()
+
+
+class RedisBackend(FrontierBackend):
+    """Frontier backend in Redis, shared by workers on different machines.
+    The queue is a sorted set scored by depth then push order, leases are a sorted set scored by their expiration.
+    Urls are moved between the queue and the leases by lua scripts, so a worker that dies never loses them.
+
+    Args:
+        client (Any): redis.Redis client or any object with the same methods
+        prefix (str, optional): prefix of the keys of the crawl. Defaults to "scrapdynamics".
+        clock (Callable[[], float], optional): time in seconds, the same for all the workers. Defaults to time.time.
+    """
+
+    def __init__(self, client: Any, prefix: str = "scrapdynamics", clock: Callable[[], float] = time):
+
+        self.client = client
+        self.clock = clock
+        self._seen = f"{prefix}:seen"
+        self._queue = f"{prefix}:queue"
+        self._leases = f"{prefix}:leases"
+        self._depths = f"{prefix}:depths"
+        self._counter = f"{prefix}:counter"
+        self._records = f"{prefix}:records"
+        self._order = f"{prefix}:order"
+
+    def push(self, urls: Iterable[Tuple[str, int]]) -> int:
+        args = [arg for url, depth in urls for arg in (url, depth)]
+        if not args: return 0
+        return int(self.client.eval(REDIS_PUSH, 4, self._seen, self._depths, self._queue, self._counter, *args))
+
+    def lease(self, worker: str, count: int, lease_time: float) -> List[Tuple[str, int]]:
+        leased = self.client.eval(REDIS_LEASE, 3, self._queue, self._leases, self._depths, count, self.clock() + lease_time)
+        return [(_decode(url), int(depth)) for url, depth in zip(leased[::2], leased[1::2])]
+
+    def ack(self, url: str, url_object: Url = None):
+        # an url acknowledged twice after its lease expired is only recorded once
+        if self.client.hset(self._records, url, dumps(asdict(url_object)) if url_object else ""): self.client.rpush(self._order, url)
+        # the url is recorded before its lease is removed, it may have been queued again if its lease expired
+        self.client.zrem(self._leases, url)
+        self.client.zrem(self._queue, url)
+
+    def requeue_expired(self) -> int:
+        return int(self.client.eval(REDIS_REQUEUE, 4, self._leases, self._depths, self._queue, self._counter, self.clock()))
+
+    def done(self) -> bool:
+        return self.client.zcard(self._queue) == 0 and self.client.zcard(self._leases) == 0
+
+    def records(self) -> Iterator[Url]:
+        for url in self.client.lrange(self._order, 0, -1):
+            record = _decode(self.client.hget(self._records, _decode(url)))
+            if record: yield Url(**loads(record))
+
+
+def _decode(value: Optional[Any]) -> Optional[str]:
+    """redis clients return bytes unless they decode responses"""
+    return value.decode("utf-8") if isinstance(value, bytes) else value
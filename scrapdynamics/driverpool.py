@@ -0,0 +1,109 @@
+from threading import Condition
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+
+class DriverPool():
+    """Pool of selenium webdrivers shared by the threads of the crawler.
+    Webdrivers are created only when needed, up to the size of the pool,
+    and replaced by a new one after a number of pages to limit the memory growth of the browser
+    or when a page raises, since the browser may have crashed.
+
+    Args:
+        factory (Callable[[], Any]): function that create a new configured webdriver
+        size (int): max number of webdrivers open at the same time
+        recycle_after (int, optional): number of pages loaded before a webdriver is replaced, 0 to never replace it. Defaults to 0.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int, recycle_after: int = 0):
+
+        self.factory = factory
+        self.size = max(size, 1)
+        self.recycle_after = recycle_after
+
+        self._condition = Condition()
+        self._idle: List[Any] = []
+        self._uses: Dict[int, int] = {}
+        self._nb_drivers = 0
+        self._closed = False
+
+    def __len__(self) -> int:
+        return self._nb_drivers
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """Context manager that lend a webdriver, wait for one to be released if they are all in use.
+        The webdriver is quit instead of being given back if the context raises
+
+        Yields:
+            Iterator[Any]: webdriver to use only in the context
+        """
+
+        driver = self._get()
+        try: yield driver
+        except:
+            self._release(driver, broken=True)
+            raise
+        self._release(driver)
+
+    def _get(self) -> Any:
+        """Get an idle webdriver or create a new one if the pool is not full
+
+        Returns:
+            Any: webdriver
+        """
+
+        with self._condition:
+            while not self._closed and not self._idle and self._nb_drivers >= self.size: self._condition.wait()
+            if self._closed: raise RuntimeError("the driver pool is closed")
+            if self._idle: return self._idle.pop()
+            # reserve the place in the pool before creating the webdriver outside of the lock
+            self._nb_drivers += 1
+
+        try: driver = self.factory()
+        except:
+            with self._condition:
+                self._nb_drivers -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition: self._uses[id(driver)] = 0
+        return driver
+
+    def _release(self, driver: Any, broken: bool = False):
+        """Give back a webdriver to the pool or quit it if it has loaded too many pages
+
+        Args:
+            driver (Any): webdriver acquired from the pool
+            broken (bool, optional): True if the webdriver raised while it was used. Defaults to False.
+        """
+
+        with self._condition:
+            self._uses[id(driver)] += 1
+            recycle = broken or self._closed or (self.recycle_after > 0 and self._uses[id(driver)] >= self.recycle_after)
+            if recycle:
+                # free the place, the next acquire will create a new webdriver
+                self._nb_drivers -= 1
+                del self._uses[id(driver)]
+            else: self._idle.append(driver)
+            self._condition.notify()
+
+        if not recycle: return
+        # the browser of a broken webdriver may already be gone
+        try: driver.quit()
+        except:
+            if not broken: raise
+
+    def close(self):
+        """Quit all the webdrivers, webdrivers in use are quit when they are released
+        """
+
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._nb_drivers -= len(idle)
+            for driver in idle: del self._uses[id(driver)]
+            # threads waiting for a webdriver stop waiting
+            self._condition.notify_all()
+
+        for driver in idle: driver.quit()
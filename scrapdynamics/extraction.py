@@ -0,0 +1,81 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import replace
+from typing import Callable, Deque, Iterable, Iterator, Optional, Tuple
+
+from .settings import Settings
+from .url import Url, UrlManager
+
+# UrlManager of each worker process, created once by the initializer
+_worker_manager: UrlManager = None
+
+
+def _init_worker(settings: Settings):
+    global _worker_manager
+    _worker_manager = UrlManager(settings)
+
+
+def _extract_page(url: str, page_text: str, link_xpath: str = None) -> Url:
+    return _worker_manager._extract_url(url, page_text, link_xpath)
+
+
+class ExtractionPool():
+    """Pool of processes that extract the links and search results of pages, to use several cores
+    when the search expressions are heavy. Pages are extracted while the next ones are fetched
+    and the results come back in the same order as the pages.
+
+    Args:
+        settings (Settings): settings of the crawler, functions are not sent to the processes
+        processes (int): number of worker processes
+        max_pending (int, optional): max number of pages sent to the processes and not consumed yet. Defaults to 4 per process.
+    """
+
+    def __init__(self, settings: Settings, processes: int, max_pending: int = None):
+
+        # functions like lambdas can't be sent to another process and are not needed for extraction, neither are the seen sets.
+        # Links are normalized by the crawler, its normalizer counts all of them
+        self.settings = replace(settings, render_predicate=None, priority_function=None, bloom_filter=False, normalize_urls=False)
+        self.processes = processes
+        self.max_pending = max_pending or 4 * processes
+
+        self._executor: ProcessPoolExecutor = None
+
+    def extract(
+        self,
+        pages: Iterable[Tuple[str, Optional[str]]],
+        link_xpath: str = None,
+        needs_extraction: Callable[[str, str], bool] = None,
+    ) -> Iterator[Tuple[str, Optional[str], Optional[Url]]]:
+        """Extract pages in the worker processes
+
+        Args:
+            pages (Iterable[Tuple[str, Optional[str]]]): url and html page, None or another object if the page was skipped
+            link_xpath (str, optional): with parse_html, xpath of the elements where links are looked for. Defaults to None.
+            needs_extraction (Callable[[str, str], bool], optional): with the url and html page, tell if the page has to be extracted,
+                the Url dataclass of the pages not sent to the processes is None. Defaults to None to extract all the pages.
+
+        Yields:
+            Iterator[Tuple[str, Optional[str], Optional[Url]]]: url, html page and Url dataclass of each page in the same order
+        """
+
+        # processes are started at the first page and kept for the next layers
+        if self._executor is None: self._executor = ProcessPoolExecutor(self.processes, initializer=_init_worker, initargs=(self.settings,))
+
+        pending: Deque[Tuple[str, Optional[str], Future]] = deque()
+        for url, page_text in pages:
+            # links skipped or left by the budgets have no page to extract
+            extract = isinstance(page_text, str) and (needs_extraction is None or needs_extraction(url, page_text))
+            future = self._executor.submit(_extract_page, url, page_text, link_xpath) if extract else None
+            pending.append((url, page_text, future))
+            if len(pending) >= self.max_pending: yield self._result(*pending.popleft())
+        while pending: yield self._result(*pending.popleft())
+
+    def _result(self, url: str, page_text: Optional[str], future: Optional[Future]) -> Tuple[str, Optional[str], Optional[Url]]:
+        return url, page_text, future.result() if future else None
+
+    def close(self):
+        """Stop the worker processes
+        """
+
+        if self._executor is not None: self._executor.shutdown()
+        self._executor = None
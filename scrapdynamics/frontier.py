@@ -0,0 +1,178 @@
+from collections import deque
+from heapq import heapify, heappop, heappush
+from itertools import count
+from typing import Any, Callable, Deque, Dict, List, Set, Tuple, Iterable
+
+
+class Frontier():
+    """Queue of the urls waiting to be crawled, tagged with their depth.
+    An url can only enter the frontier once, even after it has been popped.
+
+    Args:
+        seen (Any, optional): set of the urls already seen, any object with add and in like a bloom filter
+            to bound the memory of very large crawls. Defaults to an empty set.
+    """
+
+    def __init__(self, seen: Any = None):
+
+        self._queue: Deque[Tuple[str, int]] = deque()
+        self._seen: Set[str] = seen if seen is not None else set()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._seen
+
+    def mark_seen(self, url: str):
+        """Mark an url as seen without queuing it, like the base url that is crawled directly
+
+        Args:
+            url (str): url/link
+        """
+
+        self._seen.add(url)
+
+    def push(self, url: str, depth: int) -> bool:
+        """Add an url at the end of the queue if it has never been seen
+
+        Args:
+            url (str): url/link
+            depth (int): depth where the url will be crawled
+
+        Returns:
+            bool: True if the url has been queued, False if it was already seen
+        """
+
+        if url in self._seen: return False
+        self._seen.add(url)
+        self._queue.append((url, depth))
+        return True
+
+    def push_many(self, urls: Iterable[str], depth: int) -> int:
+        """Add multiple urls at the end of the queue
+
+        Args:
+            urls (Iterable[str]): urls/links
+            depth (int): depth where the urls will be crawled
+
+        Returns:
+            int: number of urls queued
+        """
+
+        return sum([self.push(url, depth) for url in urls])
+
+    def pop_layer(self, depth: int) -> List[str]:
+        """Remove and return all the queued urls up to a depth, in the order they were queued
+
+        Args:
+            depth (int): max depth of the urls to pop
+
+        Returns:
+            List[str]: urls of the layer
+        """
+
+        layer = []
+        while self._queue and self._queue[0][1] <= depth: layer.append(self._queue.popleft()[0])
+        return layer
+
+    def pending(self) -> List[Tuple[str, int]]:
+        """Get the queued urls without removing them
+
+        Returns:
+            List[Tuple[str, int]]: urls with their depth, in the order they were queued
+        """
+
+        return list(self._queue)
+
+
+class PriorityFrontier(Frontier):
+    """Queue of the urls waiting to be crawled where the urls with the highest score are popped first,
+    urls with the same score are popped in the order they were queued.
+    An url can only enter the frontier once, even after it has been popped.
+
+    Args:
+        scorer (Callable[[str, int, str], float]): function of the url, its depth and the text of its anchor that gives its score
+        max_depth (int, optional): urls deeper than this are not queued, None for no limit. Defaults to None.
+        seen (Any, optional): set of the urls already seen, any object with add and in like a bloom filter. Defaults to an empty set.
+    """
+
+    def __init__(self, scorer: Callable[[str, int, str], float], max_depth: int = None, seen: Any = None):
+
+        super(PriorityFrontier, self).__init__(seen)
+        self.scorer = scorer
+        self.max_depth = max_depth
+
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._counter = count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, url: str, depth: int, anchor: str = None) -> bool:
+        """Add an url to the queue with its score if it has never been seen
+
+        Args:
+            url (str): url/link
+            depth (int): depth where the url will be crawled
+            anchor (str, optional): text of the links to the url. Defaults to None.
+
+        Returns:
+            bool: True if the url has been queued, False if it was already seen or is too deep
+        """
+
+        if url in self._seen or (self.max_depth is not None and depth > self.max_depth): return False
+        self._seen.add(url)
+        heappush(self._heap, (-self.scorer(url, depth, anchor), next(self._counter), url, depth))
+        return True
+
+    def push_many(self, urls: Iterable[str], depth: int, anchors: Dict[str, str] = None) -> int:
+        """Add multiple urls to the queue
+
+        Args:
+            urls (Iterable[str]): urls/links
+            depth (int): depth where the urls will be crawled
+            anchors (Dict[str, str], optional): text of the links to each url. Defaults to None.
+
+        Returns:
+            int: number of urls queued
+        """
+
+        anchors = anchors or {}
+        return sum([self.push(url, depth, anchors.get(url)) for url in urls])
+
+    def pop_best(self, nb_urls: int) -> List[Tuple[str, int]]:
+        """Remove and return the urls with the highest scores
+
+        Args:
+            nb_urls (int): max number of urls to pop
+
+        Returns:
+            List[Tuple[str, int]]: urls with their depth, best first
+        """
+
+        return [heappop(self._heap)[2:] for _ in range(min(nb_urls, len(self._heap)))]
+
+    def pop_layer(self, depth: int) -> List[str]:
+        """Remove and return all the queued urls up to a depth, best first
+
+        Args:
+            depth (int): max depth of the urls to pop
+
+        Returns:
+            List[str]: urls of the layer
+        """
+
+        layer = [entry for entry in sorted(self._heap) if entry[3] <= depth]
+        self._heap = [entry for entry in self._heap if entry[3] > depth]
+        heapify(self._heap)
+        return [entry[2] for entry in layer]
+
+    def pending(self) -> List[Tuple[str, int]]:
+        """Get the queued urls without removing them
+
+        Returns:
+            List[Tuple[str, int]]: urls with their depth, best first
+        """
+
+        return [entry[2:] for entry in sorted(self._heap)]
@@ -0,0 +1,146 @@
+import sqlite3
+from threading import Lock
+from time import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit, urlunsplit
+from typing import Callable, Dict, Optional
+
+
+@dataclass
+class CacheEntry():
+    """Dataclass of a page stored in the HTTP cache
+
+    Args:
+        etag (str): ETag header of the page
+        last_modified (str): Last-Modified header of the page
+        body (str): html page
+    """
+
+    etag: str
+    last_modified: str
+    body: str
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that ask the server to answer 304 if the page has not changed
+
+        Returns:
+            Dict[str, str]: If-None-Match and If-Modified-Since headers
+        """
+
+        headers = {}
+        if self.etag: headers["If-None-Match"] = self.etag
+        if self.last_modified: headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache():
+    """On-disk SQLite cache of pages with their validators, used to make conditional requests on the next crawls.
+    Least recently used pages are evicted when the cache is too big and pages expire after a time to live.
+
+    Args:
+        path (str): path of the SQLite file
+        max_size (int, optional): max size in bytes of the stored pages. Defaults to 512MB.
+        ttl (float, optional): time in seconds after which a page not validated again is removed, 0 to never expire. Defaults to 7 days.
+        clock (Callable[[], float], optional): time in seconds. Defaults to time.time.
+    """
+
+    def __init__(self, path: str, max_size: int = 512 * 1024 * 1024, ttl: float = 7 * 24 * 3600, clock: Callable[[], float] = time):
+
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body TEXT, size INTEGER, stored REAL, accessed REAL
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+        """)
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock: return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Get the stored page of an url
+
+        Args:
+            url (str): url/link
+
+        Returns:
+            Optional[CacheEntry]: stored page or None if it is not in the cache or has expired
+        """
+
+        key, now = cache_key(url), self.clock()
+        with self._lock, self._db:
+            row = self._db.execute("SELECT etag, last_modified, body, size, stored FROM entries WHERE key = ?", (key,)).fetchone()
+            if not row: return None
+            etag, last_modified, body, size, stored = row
+            if self.ttl and now - stored > self.ttl:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._size -= size
+                return None
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return CacheEntry(etag, last_modified, body)
+
+    def put(self, url: str, etag: str, last_modified: str, body: str):
+        """Store a page, pages without validators are not stored because they can't be requested conditionally
+
+        Args:
+            url (str): url/link
+            etag (str): ETag header of the page
+            last_modified (str): Last-Modified header of the page
+            body (str): html page
+        """
+
+        if not etag and not last_modified: return
+        key, now, size = cache_key(url), self.clock(), len(body.encode("utf-8"))
+        with self._lock, self._db:
+            old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", (key, etag, last_modified, body, size, now, now))
+            self._size += size - (old[0] if old else 0)
+            self._evict()
+
+    def revalidate(self, url: str):
+        """Mark a stored page as still valid after a 304 answer, its time to live starts again
+
+        Args:
+            url (str): url/link
+        """
+
+        now = self.clock()
+        with self._lock, self._db: self._db.execute("UPDATE entries SET stored = ?, accessed = ? WHERE key = ?", (now, now, cache_key(url)))
+
+    def _evict(self):
+        """Remove the least recently used pages until the cache is not too big, the lock must be held
+        """
+
+        while self._size > self.max_size:
+            rows = self._db.execute("SELECT key, size FROM entries ORDER BY accessed LIMIT 100").fetchall()
+            if not rows: break
+            for key, size in rows:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._size -= size
+                if self._size <= self.max_size: break
+
+    def close(self):
+        with self._lock: self._db.close()
+
+
+def cache_key(url: str) -> str:
+    """Normalize an url to use it as a cache key, scheme and host are case insensitive and the fragment is never sent
+
+    Args:
+        url (str): url/link
+
+    Returns:
+        str: normalized url
+    """
+
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
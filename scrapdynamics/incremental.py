@@ -0,0 +1,106 @@
+import sqlite3
+from hashlib import blake2b
+from json import dumps, loads
+from dataclasses import asdict
+from typing import Iterator, Optional, Tuple
+
+from .url import Url
+
+
+class IncrementalState():
+    """SQLite store of the pages of the previous crawl with the hash of their content,
+    used to carry forward the Url of pages that have not changed since the previous crawl
+
+    Args:
+        path (str): path of the SQLite file
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self._db = sqlite3.connect(path)
+        # each page is committed on its own, without a sync of the file for each one
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS previous (url TEXT PRIMARY KEY, hash TEXT, record TEXT);
+            CREATE TABLE IF NOT EXISTS current (url TEXT PRIMARY KEY, hash TEXT, record TEXT);
+        """)
+
+    def begin(self):
+        """Start a new crawl, pages of an unfinished crawl are forgotten
+        """
+
+        with self._db: self._db.execute("DELETE FROM current")
+
+    def previous(self, url: str) -> Optional[Tuple[str, Url]]:
+        """Get a page of the previous crawl
+
+        Args:
+            url (str): url/link of the page
+
+        Returns:
+            Optional[Tuple[str, Url]]: hash of the content and Url dataclass of the page, None if it was not crawled
+        """
+
+        row = self._db.execute("SELECT hash, record FROM previous WHERE url = ?", (url,)).fetchone()
+        return (row[0], Url(**loads(row[1]))) if row else None
+
+    def previous_hash(self, url: str) -> Optional[str]:
+        """Get the hash of the content of a page of the previous crawl, without reading its Url dataclass
+
+        Args:
+            url (str): url/link of the page
+
+        Returns:
+            Optional[str]: hash of the content, None if the page was not crawled
+        """
+
+        row = self._db.execute("SELECT hash FROM previous WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, url: str, page_hash: str, url_object: Url):
+        """Store a page of the current crawl
+
+        Args:
+            url (str): url/link of the page
+            page_hash (str): hash of the content of the page
+            url_object (Url): Url dataclass of the page
+        """
+
+        with self._db: self._db.execute("INSERT OR REPLACE INTO current VALUES (?, ?, ?)", (url, page_hash, dumps(asdict(url_object))))
+
+    def removed(self) -> Iterator[Url]:
+        """Get the pages of the previous crawl that have not been crawled in the current one
+
+        Yields:
+            Iterator[Url]: Url dataclass of the removed pages
+        """
+
+        for record, in self._db.execute("SELECT record FROM previous WHERE url NOT IN (SELECT url FROM current) ORDER BY rowid").fetchall():
+            yield Url(**loads(record))
+
+    def commit(self):
+        """End the current crawl, its pages become the previous crawl of the next one
+        """
+
+        with self._db:
+            self._db.execute("DELETE FROM previous")
+            self._db.execute("INSERT INTO previous SELECT * FROM current ORDER BY rowid")
+            self._db.execute("DELETE FROM current")
+
+    def close(self):
+        self._db.close()
+
+
+def content_hash(text: str) -> str:
+    """Hash the content of a page
+
+    Args:
+        text (str): html page
+
+    Returns:
+        str: hexadecimal hash
+    """
+
+    return blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
@@ -0,0 +1,48 @@
+from threading import BoundedSemaphore, Lock
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from typing import Dict, Iterator
+
+
+class DomainLimiter():
+    """Limit the number of concurrent requests made to the same domain
+
+    Args:
+        max_per_domain (int): max number of concurrent requests for one domain, 0 for no limit
+    """
+
+    def __init__(self, max_per_domain: int):
+
+        self.max_per_domain = max_per_domain
+
+        self._lock = Lock()
+        self._semaphores: Dict[str, BoundedSemaphore] = {}
+
+    @contextmanager
+    def limit(self, url: str) -> Iterator[None]:
+        """Context manager that hold a slot of the domain of the url while the request is made
+
+        Args:
+            url (str): url that will be requested
+        """
+
+        if self.max_per_domain <= 0:
+            yield
+            return
+
+        semaphore = self._get_semaphore(urlsplit(url).netloc)
+        with semaphore: yield
+
+    def _get_semaphore(self, domain: str) -> BoundedSemaphore:
+        """Get the semaphore of a domain or create it if it's the first time the domain is seen
+
+        Args:
+            domain (str): domain of the url
+
+        Returns:
+            BoundedSemaphore: semaphore shared by all the requests of the domain
+        """
+
+        with self._lock:
+            if domain not in self._semaphores: self._semaphores[domain] = BoundedSemaphore(self.max_per_domain)
+            return self._semaphores[domain]
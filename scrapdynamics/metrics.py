@@ -0,0 +1,180 @@
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from json import dump
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, ContextManager, Dict, Iterator, List
+
+# upper bounds in seconds of the histogram buckets, from 0.5ms to about 65s
+BUCKETS = [0.0005 * 2 ** i for i in range(18)]
+
+
+class Histogram():
+    """Latency histogram with fixed buckets, percentiles are the upper bound of the bucket they fall in
+    """
+
+    def __init__(self):
+
+        self.counts: List[int] = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        """Add a measure
+
+        Args:
+            value (float): time in seconds
+        """
+
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        """Approximate percentile of the measures
+
+        Args:
+            p (float): percentile between 0 and 100
+
+        Returns:
+            float: time in seconds, 0 if there is no measure
+        """
+
+        if not self.count: return 0
+        rank, cumulated = p / 100 * self.count, 0
+        for i, count in enumerate(self.counts):
+            cumulated += count
+            if cumulated >= rank and count: return min(BUCKETS[i] if i < len(BUCKETS) else self.max, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0,
+            "min": self.min or 0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max or 0,
+        }
+
+
+class Metrics():
+    """Counters and latency histograms of the stages of a crawl, with a breakdown by host.
+    Can be used from multiple threads.
+
+    Args:
+        path (str, optional): path of the JSON file where the metrics are dumped periodically. Defaults to None.
+        interval (float, optional): time in seconds between two dumps. Defaults to 60.
+        clock (Callable[[], float], optional): time in seconds. Defaults to time.perf_counter.
+    """
+
+    enabled = True
+
+    def __init__(self, path: str = None, interval: float = 60, clock: Callable[[], float] = perf_counter):
+
+        self.path = path
+        self.interval = interval
+        self.clock = clock
+
+        self._lock = Lock()
+        self._stages: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._hosts: Dict[str, Dict[str, float]] = {}
+        self._started = clock()
+        self._last_dump = self._started
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Context manager that measure the time spent in a stage
+
+        Args:
+            stage (str): name of the stage
+        """
+
+        start = self.clock()
+        try: yield
+        finally: self.observe(stage, self.clock() - start)
+
+    def observe(self, stage: str, value: float):
+        """Add a measure to the histogram of a stage
+
+        Args:
+            stage (str): name of the stage
+            value (float): time in seconds
+        """
+
+        with self._lock:
+            if stage not in self._stages: self._stages[stage] = Histogram()
+            self._stages[stage].observe(value)
+
+    def count(self, name: str, value: float = 1, host: str = None):
+        """Increment a counter, also for a host if it is given
+
+        Args:
+            name (str): name of the counter
+            value (float, optional): increment. Defaults to 1.
+            host (str, optional): host of the url concerned. Defaults to None.
+        """
+
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+            if host is not None:
+                counters = self._hosts.setdefault(host, {})
+                counters[name] = counters.get(name, 0) + value
+
+    def stats(self) -> Dict[str, Any]:
+        """Get all the metrics
+
+        Returns:
+            Dict[str, Any]: elapsed time, counters, histograms of the stages and counters of each host
+        """
+
+        with self._lock:
+            return {
+                "elapsed": self.clock() - self._started,
+                "counters": dict(self._counters),
+                "stages": {stage: histogram.to_dict() for stage, histogram in self._stages.items()},
+                "hosts": {host: dict(counters) for host, counters in self._hosts.items()},
+            }
+
+    def maybe_dump(self):
+        """Dump the metrics in the JSON file if the interval has elapsed since the last dump
+        """
+
+        if self.path and self.clock() - self._last_dump >= self.interval: self.dump()
+
+    def dump(self, path: str = None):
+        """Dump the metrics in a JSON file
+
+        Args:
+            path (str, optional): path of the JSON file. Defaults to the path of the metrics.
+        """
+
+        path = path or self.path
+        if not path: return
+        self._last_dump = self.clock()
+        with open(path, "w") as f: dump(self.stats(), f, indent=2)
+
+
+class NullMetrics():
+    """Metrics that measure nothing, used when metrics are disabled so the hot path stays cheap
+    """
+
+    enabled = False
+
+    _context = nullcontext()
+
+    def time(self, stage: str) -> ContextManager[None]:
+        return self._context
+
+    def observe(self, stage: str, value: float): pass
+    def count(self, name: str, value: float = 1, host: str = None): pass
+    def stats(self) -> Dict[str, Any]: return {}
+    def maybe_dump(self): pass
+    def dump(self, path: str = None): pass
@@ -0,0 +1,134 @@
+import re
+from urllib.parse import urlsplit, urlunsplit
+from typing import Dict, List
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+class UrlNormalizer():
+    """Normalize urls so the different ways of writing the same page are crawled once:
+    lowercase scheme and host, no default port, no fragment, no dot segments,
+    tracking query params removed and query params sorted.
+    Results are memoized since the same links are found on most pages of a website.
+
+    Args:
+        strip_query_params (List[str], optional): regex expressions of the names of query params to remove. Defaults to None.
+        sort_query_params (bool, optional): sort query params by name. Defaults to True.
+        strip_www (bool, optional): remove www. in front of the host. Defaults to False.
+        strip_trailing_slash (bool, optional): remove the slash at the end of the path, except for the root path. Defaults to True.
+        cache_size (int, optional): max number of urls memoized. Defaults to 100000.
+    """
+
+    def __init__(
+        self,
+        strip_query_params: List[str] = None,
+        sort_query_params: bool = True,
+        strip_www: bool = False,
+        strip_trailing_slash: bool = True,
+        cache_size: int = 100000,
+    ):
+
+        self.re_strip_query_params = re.compile("|".join([f"(?:{param})" for param in strip_query_params])) if strip_query_params else None
+        self.sort_query_params = sort_query_params
+        self.strip_www = strip_www
+        self.strip_trailing_slash = strip_trailing_slash
+        self.cache_size = cache_size
+
+        self._cache: Dict[str, str] = {}
+        self._normalized: Dict[str, str] = {}
+        self.stats = {"calls": 0, "cache_hits": 0, "rewritten": 0, "collapsed": 0}
+
+    def normalize(self, url: str) -> str:
+        """Normalize an url
+
+        Args:
+            url (str): url/link
+
+        Returns:
+            str: normalized url
+        """
+
+        self.stats["calls"] += 1
+        if url in self._cache:
+            self.stats["cache_hits"] += 1
+            return self._cache[url]
+
+        normalized = self._normalize(url)
+        if normalized != url: self.stats["rewritten"] += 1
+        # another way of writing this url has already been seen, it is a page that won't be fetched twice
+        if normalized in self._normalized and self._normalized[normalized] != url: self.stats["collapsed"] += 1
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+            self._normalized.clear()
+        self._cache[url] = normalized
+        self._normalized.setdefault(normalized, url)
+        return normalized
+
+    def hit_rate(self) -> Dict[str, float]:
+        """Share of the normalized links that were memoized, rewritten or collapsed on another url
+
+        Returns:
+            Dict[str, float]: stats of the normalizer with their rates
+        """
+
+        calls = self.stats["calls"] or 1
+        distinct = (self.stats["calls"] - self.stats["cache_hits"]) or 1
+        return {
+            **self.stats,
+            "cache_hit_rate": self.stats["cache_hits"] / calls,
+            "rewritten_rate": self.stats["rewritten"] / distinct,
+            "collapsed_rate": self.stats["collapsed"] / distinct,
+        }
+
+    def _normalize(self, url: str) -> str:
+        """Normalize an url without memoization
+
+        Args:
+            url (str): url/link
+
+        Returns:
+            str: normalized url
+        """
+
+        try: parts = urlsplit(url.strip())
+        except ValueError: return url
+        scheme = parts.scheme.lower()
+
+        # host is case insensitive, userinfo is kept as it is
+        userinfo, _, hostport = parts.netloc.rpartition("@")
+        host, _, port = hostport.lower().partition(":") if not hostport.startswith("[") else (hostport.lower(), "", "")
+        if self.strip_www and host.startswith("www."): host = host[4:]
+        if port == DEFAULT_PORTS.get(scheme): port = ""
+        netloc = (userinfo + "@" if userinfo else "") + host + (":" + port if port else "")
+
+        path = remove_dot_segments(parts.path) or "/"
+        if self.strip_trailing_slash and len(path) > 1 and path.endswith("/"): path = path.rstrip("/") or "/"
+
+        query = [param for param in parts.query.split("&") if param]
+        if self.re_strip_query_params: query = [param for param in query if not self.re_strip_query_params.fullmatch(param.partition("=")[0])]
+        if self.sort_query_params: query.sort(key=lambda param: param.partition("=")[0])
+
+        return urlunsplit((scheme, netloc, path, "&".join(query), ""))
+
+
+def remove_dot_segments(path: str) -> str:
+    """Resolve the . and .. segments of a path (RFC 3986 section 5.2.4)
+
+    Args:
+        path (str): path of an url
+
+    Returns:
+        str: path without dot segments
+    """
+
+    if "." not in path: return path
+
+    segments = []
+    for segment in path.split("/"):
+        if segment == "..":
+            if len(segments) > 1: segments.pop()
+        elif segment != ".": segments.append(segment)
+    # keep the trailing slash of paths ending with a dot segment
+    if path.endswith(("/.", "/..")): segments.append("")
+    return "/".join(segments)
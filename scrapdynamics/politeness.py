@@ -0,0 +1,211 @@
+from threading import Lock
+from time import monotonic, sleep
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from typing import Callable, Dict, Tuple
+
+THROTTLE_STATUS = [429, 503]
+
+
+class TokenBucket():
+    """Token bucket that spaces out requests to a rate, tokens can be reserved in advance
+
+    Args:
+        rate (float): tokens added per second
+        burst (int, optional): max number of tokens stored. Defaults to 1.
+        clock (Callable[[], float], optional): time in seconds. Defaults to time.monotonic.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = monotonic):
+
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.clock = clock
+
+        self._tokens = float(self.burst)
+        self._last = clock()
+
+    def reserve(self) -> float:
+        """Take a token, the bucket can go in debt so the next callers wait their turn
+
+        Returns:
+            float: time in seconds to wait before using the token
+        """
+
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        self._tokens -= 1
+        return max(-self._tokens / self.rate, 0)
+
+
+class HostScheduler():
+    """Politeness of the crawler for each host: requests are spaced out by a token bucket,
+    slowed down when the host answers 429 or 503 and robots.txt rules are respected
+
+    Args:
+        rate (float): max number of requests per second for a host, 0 for no limit
+        burst (int, optional): number of requests that can be made at once before being spaced out. Defaults to 1.
+        max_backoff (float, optional): max time in seconds a host is paused after being throttled. Defaults to 60.
+        fetch_robots (Callable[[str], Tuple[int, str]], optional): function that get the status code and text of a robots.txt url,
+            None to not respect robots.txt. Defaults to None.
+        user_agent (str, optional): user agent matched against robots.txt rules. Defaults to "*".
+        clock (Callable[[], float], optional): time in seconds. Defaults to time.monotonic.
+        sleep (Callable[[float], None], optional): function that wait. Defaults to time.sleep.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        max_backoff: float = 60,
+        fetch_robots: Callable[[str], Tuple[int, str]] = None,
+        user_agent: str = "*",
+        clock: Callable[[], float] = monotonic,
+        sleep: Callable[[float], None] = sleep,
+    ):
+
+        self.rate = rate
+        self.burst = burst
+        self.max_backoff = max_backoff
+        self.fetch_robots = fetch_robots
+        self.user_agent = user_agent
+        self.clock = clock
+        self.sleep = sleep
+
+        self._lock = Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._backoffs: Dict[str, float] = {}
+        self._paused_until: Dict[str, float] = {}
+        self._robots: Dict[str, RobotFileParser] = {}
+        self._robots_locks: Dict[str, Lock] = {}
+
+    def allowed(self, url: str) -> bool:
+        """Check robots.txt rules of the host, robots.txt is fetched once per host
+
+        Args:
+            url (str): url/link
+
+        Returns:
+            bool: True if the url can be crawled
+        """
+
+        if not self.fetch_robots: return True
+        return self._get_robots(url).can_fetch(self.user_agent, url)
+
+    def wait(self, url: str):
+        """Wait until a request can be made to the host of the url
+
+        Args:
+            url (str): url/link that will be requested
+        """
+
+        delay = self.reserve(url)
+        if delay > 0: self.sleep(delay)
+
+    def reserve(self, url: str) -> float:
+        """Book the next request to the host of the url without waiting, for callers that wait on their own like an event loop
+
+        Args:
+            url (str): url/link that will be requested
+
+        Returns:
+            float: time in seconds to wait before making the request
+        """
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            delay = self._paused_until.get(host, 0) - self.clock()
+            bucket = self._get_bucket(url, host)
+            if bucket: delay = max(delay, bucket.reserve())
+        return max(delay, 0)
+
+    def feedback(self, url: str, status_code: int, retry_after: str = None):
+        """Adapt the pace of a host to its answer, a throttled host is paused with an exponential backoff
+        that decreases again with each successful answer
+
+        Args:
+            url (str): url/link requested
+            status_code (int): status code of the answer
+            retry_after (str, optional): Retry-After header of the answer. Defaults to None.
+        """
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            backoff = self._backoffs.get(host, 0)
+            if status_code in THROTTLE_STATUS:
+                backoff = min(max(parse_retry_after(retry_after), backoff * 2, 1 / self.rate if self.rate else 1), self.max_backoff)
+                self._paused_until[host] = self.clock() + backoff
+            else: backoff = backoff / 2 if backoff > 0.1 else 0
+            self._backoffs[host] = backoff
+
+    def _get_bucket(self, url: str, host: str) -> TokenBucket:
+        """Get the token bucket of a host, its rate is lowered to the crawl-delay of robots.txt
+
+        Args:
+            url (str): url/link
+            host (str): host of the url
+
+        Returns:
+            TokenBucket: token bucket of the host or None if there is no limit
+        """
+
+        if host not in self._buckets:
+            rate = self.rate
+            robots = self._robots.get(host)
+            delay = robots.crawl_delay(self.user_agent) if robots else None
+            if delay: rate = min(rate, 1 / float(delay)) if rate else 1 / float(delay)
+            self._buckets[host] = TokenBucket(rate, self.burst, self.clock) if rate else None
+        return self._buckets[host]
+
+    def _get_robots(self, url: str) -> RobotFileParser:
+        """Get the parsed robots.txt of the host of an url, fetch it the first time the host is seen
+
+        Args:
+            url (str): url/link
+
+        Returns:
+            RobotFileParser: parsed robots.txt
+        """
+
+        parts = urlsplit(url)
+        with self._lock:
+            if parts.netloc in self._robots: return self._robots[parts.netloc]
+            host_lock = self._robots_locks.setdefault(parts.netloc, Lock())
+
+        # only one thread fetch the robots.txt of a host, the others wait for it
+        with host_lock:
+            if parts.netloc in self._robots: return self._robots[parts.netloc]
+
+            robots = RobotFileParser(f"{parts.scheme}://{parts.netloc}/robots.txt")
+            try: status_code, text = self.fetch_robots(robots.url)
+            except: status_code, text = 404, ""
+            # same rules as RobotFileParser.read
+            if status_code in (401, 403): robots.disallow_all = True
+            elif status_code >= 400: robots.allow_all = True
+            else: robots.parse(text.splitlines())
+
+            with self._lock:
+                self._robots[parts.netloc] = robots
+                # the bucket is created again with the crawl-delay
+                self._buckets.pop(parts.netloc, None)
+            return robots
+
+
+def parse_retry_after(retry_after: str) -> float:
+    """Get the time to wait from a Retry-After header
+
+    Args:
+        retry_after (str): seconds or http date
+
+    Returns:
+        float: time to wait in seconds, 0 if the header is missing or invalid
+    """
+
+    if not retry_after: return 0
+    try: return max(float(retry_after), 0)
+    except ValueError: pass
+    try: return max((parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError): return 0
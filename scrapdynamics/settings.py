@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Callable
 from dataclasses import dataclass, field
 
 @dataclass
@@ -11,17 +11,75 @@ class Settings():
         link_schema_relative_sub (List[str]): regex expression to substitute schema relative links.
         domain_findall (str): regex expression to find domain from a url.
         search_expressions (Dict[str, str]): dict of regex expression to look for in the html page.
+        combine_search_expressions (bool): look for all the search expressions in a single pass over the page, results of different expressions can't overlap.
+        search_xpaths (Dict[str, str]): dict of xpath expression to look for in the parsed html page, the text of the elements found is stored.
+        parse_html (bool): parse each page once with lxml and get links from the href attributes, relative links are resolved against the url of the page.
+        normalize_urls (bool): normalize the links found so the different ways of writing the same url are crawled once.
+        strip_query_params (List[str]): with normalize_urls, regex expressions of the names of query params removed from the links.
+        sort_query_params (bool): with normalize_urls, sort query params by name.
+        strip_www (bool): with normalize_urls, remove www. in front of the host of the links.
+        strip_trailing_slash (bool): with normalize_urls, remove the slash at the end of the path of the links.
+        honor_canonical (bool): with normalize_urls, store a page under the url of its <link rel="canonical"> and skip it if this url has already been crawled.
+        compact_storage (bool): store each distinct url once and the links of the pages as arrays of ids to use less memory on large crawls, links are turned back into strings when they are read.
+        keep_results (bool): keep the Url of each page in memory to show or export them at the end, False to only write them in the sinks so memory doesn't grow with the number of pages.
+        bloom_filter (bool): remember the urls already seen in a scalable bloom filter instead of a set, memory is bounded for very large crawls but a few urls never seen are skipped.
+        bloom_capacity (int): with bloom_filter, number of urls of the first filter, a larger filter is added each time it is full.
+        bloom_error_rate (float): with bloom_filter, max rate of urls never seen that are skipped.
+        bloom_path (str): with bloom_filter, prefix of the files where the filters are memory mapped, None to keep them in memory. Each crawler open at the same time needs its own prefix.
         restrict_to_domain (bool): restrict future urls to the domain given at the start.
         depth (int): max depth to crawl.
         simulate_human (bool): use selenium webdriver to get html page.
+        hybrid_fetch (bool): with simulate_human, get html page with requests and use selenium webdriver only for the pages that need it.
+        render_if_empty (List[str]): in hybrid mode, names of search expressions that render the page with selenium if they find nothing.
+        render_if_match (str): in hybrid mode, regex expression that render the page with selenium if it is found in the page.
+        render_predicate (Callable[[str, str], bool]): in hybrid mode, function of the url and the page that return True to render the page with selenium.
         scroll_first_page (bool): selenium webdriver scroll down the first url given at the start.
         scroll_all_page (bool): selenium webdriver scroll down all the url found.
+        scroll_max_scrolls (int): max number of times a page is scrolled down.
+        scroll_max_items (int): stop scrolling down when the page has this number of elements matching scroll_item_selector, 0 for no limit.
+        scroll_item_selector (str): css selector of the elements counted by scroll_max_items.
+        scroll_time_budget (float): max time in seconds spent scrolling down a page.
+        scroll_idle_time (float): time in seconds without new content after which a page is fully scrolled down.
         headless (bool): don't show the page of selenium webdriver.
+        driver_pool_size (int): max number of selenium webdrivers rendering pages at the same time.
+        driver_recycle_after (int): number of pages loaded before a selenium webdriver is replaced by a new one, 0 to never replace it.
         get_timeout (int): time in seconds of a GET timeout.
         progress_bar (bool): use progress bar or simple prints.
         request_header (Dict[str, str]): header to add when doing a GET request with the module requests.
         valid_content_type (List[str]): content type of page content to allow the crawler to explore.
-        xpath_restrict_link_crawl (str): xpath where children elements will be used to find links for depth 1.
+        single_request (bool): check status code and content type with the headers of the GET request instead of a HEAD request before it.
+        xpath_restrict_link_crawl (str): xpath where children elements will be used to find links for depth 1, with parse_html only links are restricted and the whole page is searched.
+        max_concurrency (int): max number of pages fetched at the same time, 1 to fetch pages one by one.
+        max_concurrency_per_domain (int): max number of pages of the same domain fetched at the same time, 0 for no limit.
+        extraction_processes (int): number of processes extracting links and search results while pages are fetched, 0 or 1 to extract in the crawler process.
+        crawl_order (str): "breadth_first" to crawl depth by depth or "best_first" to crawl the links with the highest priority score first.
+        priority_url_rules (Dict[str, float]): with best_first, dict of regex expression -> score added to the priority of the links matching it.
+        priority_anchor_rules (Dict[str, float]): with best_first, dict of regex expression -> score added to the priority of the links whose anchor text matches it.
+        priority_function (Callable[[str, int, str], float]): with best_first, function of the link, its depth and its anchor text that return a score added to its priority.
+        depth_penalty (float): with best_first, score removed from the priority of a link for each level of depth.
+        max_pages (int): max number of pages fetched, 0 for no limit.
+        max_pages_per_host (int): max number of pages fetched from the same host, 0 for no limit.
+        max_time (float): time in seconds after which no new page is fetched, 0 for no limit.
+        pool_connections (int): number of hosts the HTTP session keeps a connection pool for.
+        pool_maxsize (int): max number of keep-alive connections kept open per host.
+        retries (int): number of times a failed request is retried, 0 to never retry.
+        retry_backoff (float): backoff factor in seconds between retries, doubled at each retry.
+        retry_status (List[int]): status codes that trigger a retry.
+        http_cache_path (str): path of the SQLite file where pages are cached to make conditional requests on the next crawls, None to not cache pages.
+        http_cache_max_size (int): max size in bytes of the cached pages, least recently used pages are removed first.
+        http_cache_ttl (float): time in seconds after which a cached page not validated again is removed, 0 to never remove it.
+        incremental_path (str): path of the SQLite file where pages are saved with the hash of their content for Crawler.start(incremental=True).
+        polite (bool): space out requests made to the same host and slow down when the host answers 429 or 503.
+        polite_rate (float): with polite, max number of requests per second made to the same host, 0 for no limit.
+        polite_burst (int): with polite, number of requests that can be made at once to a host before being spaced out.
+        polite_max_backoff (float): with polite, max time in seconds a host is paused after answering 429 or 503.
+        polite_max_retries (int): with polite, number of times a request answered 429 or 503 is made again once the host backoff has elapsed.
+        respect_robots (bool): with polite, skip urls disallowed by the robots.txt of their host and use its crawl-delay.
+        checkpoint_path (str): path of the SQLite file where the crawl is saved to be resumed, None to not save it.
+        checkpoint_interval (int): number of pages crawled between two saves of the checkpoint.
+        metrics (bool): measure the time spent in each stage of the crawl, the requests, bytes and errors of each host, read with Crawler.stats().
+        metrics_path (str): with metrics, path of the JSON file where the metrics are dumped periodically and at the end of the crawl, None to not dump them.
+        metrics_interval (float): with metrics, time in seconds between two dumps of the metrics.
     """    
     
     link_findall: str = r"href=\"((?:https?|\/\w|\/\/\w).+?)\""
@@ -33,13 +91,42 @@ class Settings():
         "phones": r"(?:tel\:)(\+?[\d\-\ ]{6,20})(?!\d)",
         "title": r"(?:<title>|<meta.*?property=\"og:title\".*?content=\")(.*?)(?:<\/title>|\".*?>)",
     })
+    combine_search_expressions: bool = False
+    search_xpaths: Dict[str, str] = field(default_factory=lambda: {})
+    parse_html: bool = False
+    
+    normalize_urls: bool = False
+    strip_query_params: List[str] = field(default_factory=lambda: [
+        r"utm_\w+", "fbclid", "gclid", "msclkid", "mc_cid", "mc_eid",
+    ])
+    sort_query_params: bool = True
+    strip_www: bool = False
+    strip_trailing_slash: bool = True
+    honor_canonical: bool = True
+    compact_storage: bool = False
+    keep_results: bool = True
+    bloom_filter: bool = False
+    bloom_capacity: int = 1000000
+    bloom_error_rate: float = 0.001
+    bloom_path: str = None
     
     restrict_to_domain: bool = True
     depth: int = 1
     simulate_human: bool = False
+    hybrid_fetch: bool = False
+    render_if_empty: List[str] = field(default_factory=lambda: [])
+    render_if_match: str = None
+    render_predicate: Callable[[str, str], bool] = None
     scroll_first_page: bool = True
     scroll_all_page: bool = False
+    scroll_max_scrolls: int = 100
+    scroll_max_items: int = 0
+    scroll_item_selector: str = None
+    scroll_time_budget: float = 30
+    scroll_idle_time: float = 0.5
     headless: bool = True
+    driver_pool_size: int = 1
+    driver_recycle_after: int = 0
     get_timeout: int = 3
     progress_bar: bool = True
     
@@ -49,4 +136,45 @@ class Settings():
     valid_content_type: List[str] = field(default_factory=lambda: [
         "text/html",
     ])
-    xpath_restrict_link_crawl: str = "/html"
\ No newline at end of file
+    single_request: bool = False
+    xpath_restrict_link_crawl: str = "/html"
+    
+    max_concurrency: int = 1
+    max_concurrency_per_domain: int = 0
+    extraction_processes: int = 0
+    
+    crawl_order: str = "breadth_first"
+    priority_url_rules: Dict[str, float] = field(default_factory=lambda: {})
+    priority_anchor_rules: Dict[str, float] = field(default_factory=lambda: {})
+    priority_function: Callable[[str, int, str], float] = None
+    depth_penalty: float = 1
+    max_pages: int = 0
+    max_pages_per_host: int = 0
+    max_time: float = 0
+    
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    retries: int = 0
+    retry_backoff: float = 0
+    retry_status: List[int] = field(default_factory=lambda: [
+        429, 500, 502, 503, 504,
+    ])
+    
+    http_cache_path: str = None
+    http_cache_max_size: int = 512 * 1024 * 1024
+    http_cache_ttl: float = 7 * 24 * 3600
+    incremental_path: str = None
+    
+    polite: bool = False
+    polite_rate: float = 1
+    polite_burst: int = 1
+    polite_max_backoff: float = 60
+    polite_max_retries: int = 3
+    respect_robots: bool = True
+    
+    checkpoint_path: str = None
+    checkpoint_interval: int = 100
+    
+    metrics: bool = False
+    metrics_path: str = None
+    metrics_interval: float = 60
\ No newline at end of file
@@ -0,0 +1,128 @@
+from json import dumps
+from csv import DictWriter
+from typing import Dict, List, Union
+
+Row = Dict[str, Union[str, List[str]]]
+
+
+class Sink():
+    """Base class of the sinks, a sink write each page as soon as it is added to the url book
+    so results don't have to be kept in memory until the end of the crawl
+
+    Args:
+        path (str): path of the results file
+        append (bool, optional): add results at the end of an existing file. Defaults to False.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+
+        self.path = path
+        self.append = append
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, row: Row):
+        """Write the flattened Url of a page
+
+        Args:
+            row (Row): flattened Url, search results are at the same level as url, domain and links
+        """
+
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and close the results file
+        """
+
+        raise NotImplementedError
+
+
+class JsonLinesSink(Sink):
+    """Write one JSON object per page and per line, lists are kept as JSON arrays
+    """
+
+    def __init__(self, path: str, append: bool = False):
+
+        super(JsonLinesSink, self).__init__(path, append)
+
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, row: Row):
+        self._file.write(dumps(row) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CsvSink(Sink):
+    """Write one CSV line per page, lists are joined like Crawler.to_csv.
+    Columns are taken from the first page written.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+
+        super(CsvSink, self).__init__(path, append)
+
+        self._file = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        self._writer: DictWriter = None
+
+    def write(self, row: Row):
+
+        if not self._writer:
+            self._writer = DictWriter(self._file, fieldnames=list(row.keys()), extrasaction="ignore")
+            # don't write the header again in the middle of an existing file
+            if self._file.tell() == 0: self._writer.writeheader()
+
+        self._writer.writerow({key: ", ".join(value) if type(value) == list else value for key, value in row.items()})
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink(Sink):
+    """Write pages in a Parquet file by batch, needs the optional pyarrow package.
+    Pages of the batch that is not written yet are lost if the process dies.
+
+    Args:
+        path (str): path of the results file
+        batch_size (int, optional): number of pages in each row group. Defaults to 1000.
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000):
+
+        super(ParquetSink, self).__init__(path)
+
+        try: import pyarrow, pyarrow.parquet
+        except ImportError: raise ImportError("ParquetSink needs pyarrow, install it with: pip install pyarrow")
+
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.batch_size = batch_size
+        self._rows: List[Row] = []
+        self._writer = None
+
+    def write(self, row: Row):
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size: self._write_batch()
+
+    def _write_batch(self):
+        """Write the pages waiting in memory as a new row group
+        """
+
+        if not self._rows: return
+        if not self._writer:
+            # type the columns from the first page, an empty list would otherwise give a list of null column
+            schema = self._pa.schema([(key, self._pa.list_(self._pa.string()) if type(value) == list else self._pa.string()) for key, value in self._rows[0].items()])
+            self._writer = self._pq.ParquetWriter(self.path, schema)
+        self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._writer.schema))
+        self._rows = []
+
+    def close(self):
+        self._write_batch()
+        if self._writer: self._writer.close()
@@ -1,8 +1,22 @@
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import Any, List, Dict, Iterator, Set, Tuple, Pattern, Union
 import re
+import sys
+from array import array
+from urllib.parse import urljoin
+from lxml import etree
 
 from .settings import Settings
+from .frontier import Frontier, PriorityFrontier
+from .sink import Sink
+from .normalize import UrlNormalizer
+from .bloom import ScalableBloomFilter
+
+RE_BACKREFERENCE = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?P=|\(\?\(")
+RE_CANONICAL = re.compile(r"<link\b[^>]*?\brel=[\"']?canonical\b[^>]*>", re.IGNORECASE)
+RE_HREF = re.compile(r"\bhref=[\"']?([^\"'\s>]+)", re.IGNORECASE)
+RE_ANCHOR = re.compile(r"<a\b[^>]*?\bhref=[\"']?([^\"'\s>]+)[^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL)
+RE_TAG = re.compile(r"<[^>]+>|\s+")
 
 @dataclass
 class Url():
@@ -13,12 +27,174 @@ class Url():
         domain (str, optional): domain of the page. Defaults to None
         links (List[str], optional): links found in the page. Defaults to None
         search (Dict[str, List[str]], optional): dict of element searched in the page. Defaults to empty Dict
+        status (str, optional): in incremental crawl, new, changed, unchanged or removed since the previous crawl. Defaults to None
     """
     
     url: str
     domain: str = None
     links: List[str] = None
     search: Dict[str, List[str]] = field(default_factory=lambda: {})
+    status: str = None
+    
+class UrlTable():
+    """Intern urls into integer ids, each distinct url is stored once whatever the number of pages linking to it
+    """
+    
+    def __init__(self):
+        
+        self._ids: Dict[str, int] = {}
+        self._urls: List[str] = []
+        
+    def __len__(self) -> int:
+        return len(self._urls)
+    
+    def __getitem__(self, url_id: int) -> str:
+        return self._urls[url_id]
+    
+    def intern(self, url: str) -> int:
+        """Get the id of an url, a new id is given to an url never seen
+        
+        Args:
+            url (str): url/link
+        
+        Returns:
+            int: id of the url
+        """
+        
+        url_id = self._ids.get(url)
+        if url_id is None:
+            url_id = self._ids[url] = len(self._urls)
+            self._urls.append(url)
+        return url_id
+    
+class CompactUrl():
+    """Memory compact version of the Url dataclass used by Settings.compact_storage,
+    urls are stored as ids of an UrlTable and links as an array of ids.
+    url and links attributes are turned back into strings when they are read.
+    
+    Args:
+        table (UrlTable): table where the urls are interned
+        url (str): url of the page
+        domain (str, optional): domain of the page. Defaults to None
+        links (List[str], optional): links found in the page. Defaults to None
+        search (Dict[str, List[str]], optional): dict of element searched in the page. Defaults to empty Dict
+        status (str, optional): in incremental crawl, new, changed, unchanged or removed since the previous crawl. Defaults to None
+    """
+    
+    __slots__ = ("_table", "_url", "domain", "_links", "search", "status")
+    
+    def __init__(self, table: UrlTable, url: str, domain: str = None, links: List[str] = None, search: Dict[str, List[str]] = None, status: str = None):
+        
+        self._table = table
+        self.url = url
+        # the same domain is shared by most of the pages
+        self.domain = sys.intern(domain) if domain else domain
+        self.links = links
+        self.search = search if search is not None else {}
+        self.status = status
+        
+    @classmethod
+    def from_url(cls, table: UrlTable, url_object: Url) -> "CompactUrl":
+        """Create a CompactUrl from an Url dataclass
+        
+        Args:
+            table (UrlTable): table where the urls are interned
+            url_object (Url): Url dataclass to compact
+        
+        Returns:
+            CompactUrl: compact Url
+        """
+        
+        return cls(table, url_object.url, url_object.domain, url_object.links, url_object.search, url_object.status)
+    
+    @property
+    def url(self) -> str:
+        return self._table[self._url]
+    
+    @url.setter
+    def url(self, url: str):
+        self._url = self._table.intern(url)
+    
+    @property
+    def links(self) -> List[str]:
+        return [self._table[link_id] for link_id in self._links] if self._links is not None else None
+    
+    @links.setter
+    def links(self, links: List[str]):
+        self._links = array("I", [self._table.intern(link) for link in links]) if links is not None else None
+    
+    def to_url(self) -> Url:
+        """Turn back into an Url dataclass
+        
+        Returns:
+            Url: Url dataclass of the page
+        """
+        
+        return Url(self.url, self.domain, self.links, self.search, self.status)
+    
+class UrlBook():
+    """Store Url dataclass in insertion order with an index by url,
+    membership and lookup by url don't depend on the number of Url stored
+
+    Args:
+        compact (bool, optional): store CompactUrl instead of Url dataclass. Defaults to False.
+        keep (bool, optional): keep the Url dataclass, False to only remember their urls in seen. Defaults to True.
+        seen (Any, optional): without keep, set of the urls added, any object with add and in like a bloom filter. Defaults to an empty set.
+    """
+    
+    def __init__(self, compact: bool = False, keep: bool = True, seen: Any = None):
+        
+        self._urls: List[Union[Url, CompactUrl]] = []
+        self._index: Dict[str, Union[Url, CompactUrl]] = {}
+        self._table = UrlTable() if compact and keep else None
+        self._seen = None if keep else seen if seen is not None else set()
+        self._count = 0
+        
+    def __len__(self) -> int:
+        return self._count
+    
+    def __iter__(self) -> Iterator[Url]:
+        return iter(self._urls)
+    
+    def __getitem__(self, index: int) -> Url:
+        return self._urls[index]
+    
+    def __contains__(self, url: str) -> bool:
+        if self._seen is not None: return url in self._seen
+        return url in self._index
+    
+    def append(self, url_object: Url) -> Union[Url, CompactUrl]:
+        """Add an Url dataclass at the end of the book
+
+        Args:
+            url_object (Url): Url dataclass to add
+
+        Returns:
+            Union[Url, CompactUrl]: Url stored in the book, compacted in compact mode, the Url given if it is not kept
+        """
+        
+        self._count += 1
+        if self._seen is not None:
+            self._seen.add(url_object.url)
+            return url_object
+        
+        if self._table is not None and not isinstance(url_object, CompactUrl): url_object = CompactUrl.from_url(self._table, url_object)
+        self._urls.append(url_object)
+        self._index.setdefault(url_object.url, url_object)
+        return url_object
+        
+    def get(self, url: str, default: Url = None) -> Url:
+        """Get the Url dataclass of an url
+
+        Args:
+            url (str): url/link
+            default (Url, optional): returned if url is not in the book. Defaults to None.
+
+        Returns:
+            Url: Url dataclass of the url
+        """
+        
+        return self._index.get(url, default)
     
 class UrlManager():
     """Store and Manage multiple Url dataclass
@@ -26,30 +202,330 @@ class UrlManager():
     
     s = Settings()
     
-    def __init__(self):
+    def __init__(self, settings: Settings = False):
 
         super(UrlManager, self).__init__()
         
-        self._url_book: List[Url] = []
+        # change the default settings
+        if settings: self.s = settings
+        self._compile_settings()
+        
+        self._seen_sets: List[Union[Set[str], ScalableBloomFilter]] = []
+        self._url_book = UrlBook(self.s.compact_storage, self.s.keep_results, self._create_seen_set("pages") if not self.s.keep_results else None)
+        seen = self._create_seen_set("links")
+        self._frontier = PriorityFrontier(self._score_link, self.s.depth, seen) if self.s.crawl_order == "best_first" else Frontier(seen)
+        self._sinks: List[Sink] = []
+    
+    def _create_seen_set(self, name: str) -> Union[Set[str], ScalableBloomFilter]:
+        """Create a set of the urls already seen, a bloom filter with Settings.bloom_filter
+
+        Args:
+            name (str): name of the set, added to bloom_path
+
+        Returns:
+            Union[Set[str], ScalableBloomFilter]: empty set of urls
+        """
+        
+        seen = set() if not self.s.bloom_filter else ScalableBloomFilter(
+            self.s.bloom_capacity, self.s.bloom_error_rate, path=f"{self.s.bloom_path}.{name}" if self.s.bloom_path else None
+        )
+        self._seen_sets.append(seen)
+        return seen
+    
+    def _close_seen_sets(self):
+        """Release the memory maps and files of the bloom filters, their bloom_path can be used by another crawler
+        """
+        
+        for seen in self._seen_sets:
+            if isinstance(seen, ScalableBloomFilter): seen.close()
+    
+    def add_sink(self, sink: Sink):
+        """Write each new Url in a sink as soon as it is added to the url book
+
+        Args:
+            sink (Sink): sink where pages are written
+        """
+        
+        self._sinks.append(sink)
+        
+    def _close_sinks(self):
+        """Close all the sinks, remaining results are flushed to their files
+        """
+        
+        for sink in self._sinks: sink.close()
+        self._sinks = []
+    
+    def _compile_settings(self):
+        """Compile once all the regex expressions of the settings, they are reused for every page
+        """
+        
+        self._re_link_findall = re.compile(self.s.link_findall)
+        self._re_link_relative = re.compile(self.s.link_relative_sub[0])
+        self._re_link_schema_relative = re.compile(self.s.link_schema_relative_sub[0])
+        self._re_domain_findall = re.compile(self.s.domain_findall)
+        self._re_search: Dict[str, Pattern] = {name: re.compile(expression) for name, expression in self.s.search_expressions.items() if expression}
+        self._re_search_combined = self._combine_search_expressions() if self.s.combine_search_expressions else None
+        self._xpath_href = etree.XPath("descendant-or-self::*/@href")
+        self._xpath_search: Dict[str, etree.XPath] = {name: etree.XPath(expression) for name, expression in self.s.search_xpaths.items() if expression}
+        self._normalizer = UrlNormalizer(
+            self.s.strip_query_params, self.s.sort_query_params, self.s.strip_www, self.s.strip_trailing_slash,
+        ) if self.s.normalize_urls else None
+        self._re_priority_url_rules = [(re.compile(expression), score) for expression, score in self.s.priority_url_rules.items()]
+        self._re_priority_anchor_rules = [(re.compile(expression), score) for expression, score in self.s.priority_anchor_rules.items()]
+        
+    def normalization_stats(self) -> Dict[str, float]:
+        """Stats of the url normalization: links normalized, memoized, rewritten and collapsed on an url already seen,
+        each collapsed link is a page that has not been fetched twice
+
+        Returns:
+            Dict[str, float]: stats with their rates or an empty dict if normalize_urls is disabled
+        """
+        
+        return self._normalizer.hit_rate() if self._normalizer else {}
+        
+    def _combine_search_expressions(self) -> Tuple[Pattern, Dict[int, Tuple[str, int]]]:
+        """Combine all the search expressions in a single alternation to look for all of them in one pass over the page.
+        Each expression is wrapped in a capturing group to know which one matched.
+
+        Returns:
+            Tuple[Pattern, Dict[int, Tuple[str, int]]]: combined expression and index of the wrapping group -> (name, number of groups of the expression),
+                or None if the expressions can't be combined
+        """
+        
+        parts, groups, index = [], {}, 1
+        for name, pattern in self._re_search.items():
+            # backreferences point to other groups once the expressions are combined
+            if RE_BACKREFERENCE.search(pattern.pattern): return None
+            parts.append(f"({pattern.pattern})")
+            groups[index] = (name, pattern.groups)
+            index += pattern.groups + 1
+        
+        # expressions with global flags can't be combined
+        try: return re.compile("|".join(parts)), groups
+        except re.error: return None
     
-    def _add_url(self, url: str, page_text: str):
-        """Methode that add to url book a new Url dataclass
+    def _add_url(self, url: str, page_text: str, depth: int = 0, link_xpath: str = None, extracted: Url = None) -> Url:
+        """Methode that add to url book a new Url dataclass and queue its links in the frontier
 
         Args:
             url (str): url/link to add
             page_text (str): html page of the url
+            depth (int, optional): depth where the url has been found. Defaults to 0.
+            link_xpath (str, optional): with parse_html, xpath of the elements where links are looked for. Defaults to None.
+            extracted (Url, optional): Url dataclass of the page already extracted in another process. Defaults to None.
+
+        Returns:
+            Url: the new Url dataclass or None if url is already in url book
         """
         
         # check if url is already in url book
-        if url in [url_object.url for url_object in self._url_book]: return
+        if url in self._url_book: return None
+        
+        url_object = self._extract_url(url, page_text, link_xpath, extracted)
+        if self._normalizer and self.s.honor_canonical:
+            canonical = self._get_canonical(url, page_text)
+            if canonical and canonical != self._normalizer.normalize(url):
+                # the page is a duplicate of a page already crawled
+                if canonical in self._url_book: return None
+                self._frontier.mark_seen(canonical)
+                url_object.url = canonical
+        # in compact mode the links of the stored Url share the strings of the url table
+        links = self._url_book.append(url_object).links
+        # anchor texts are only looked for if they change the priority of the links
+        if self._re_priority_anchor_rules and isinstance(self._frontier, PriorityFrontier): self._frontier.push_many(links, depth + 1, self._get_anchors(url, page_text))
+        else: self._frontier.push_many(links, depth + 1)
+        
+        if self._sinks:
+            row = self._url_to_row(url_object)
+            for sink in self._sinks: sink.write(row)
+        return url_object
+    
+    def _extract_url(self, url: str, page_text: str, link_xpath: str = None, extracted: Url = None) -> Url:
+        """Create a new Url dataclass with the links and search results of a page
+
+        Args:
+            url (str): url/link of the page
+            page_text (str): html page of the url
+            link_xpath (str, optional): with parse_html, xpath of the elements where links are looked for. Defaults to None.
+            extracted (Url, optional): Url dataclass of the page already extracted in another process, only its links are normalized. Defaults to None.
+
+        Returns:
+            Url: Url dataclass of the page
+        """
+        
+        if extracted is None:
+            domain = self._get_domain_from_url(url)
+            search = self._search_text(page_text)
+            if not self.s.parse_html and not self._xpath_search:
+                links = self._get_links_from_text(url, page_text, domain)
+            else:
+                # the page is parsed once for both links and xpath search
+                tree = self._parse_html(page_text)
+                links = self._get_links_from_tree(url, tree, link_xpath) if self.s.parse_html else self._get_links_from_text(url, page_text, domain)
+                search.update(self._search_tree(tree))
+            extracted = Url(url, domain, links=links, search=search)
+        
+        # links are normalized in this process to keep the memoization and the stats of the normalizer in one place
+        if self._normalizer: extracted.links = [self._normalizer.normalize(link) for link in extracted.links]
+        return extracted
+    
+    def _score_link(self, url: str, depth: int, anchor: str = None) -> float:
+        """Priority score of a link in best first crawl, the links with the highest score are crawled first
+
+        Args:
+            url (str): url/link
+            depth (int): depth where the link will be crawled
+            anchor (str, optional): text of the anchors of the link. Defaults to None.
+
+        Returns:
+            float: score of the priority rules matched minus the depth penalty
+        """
         
-        # create a new Url dataclass
-        url_object = Url(url, self._get_domain_from_url(url), links=self._get_links_from_text(url, page_text))
+        score = -self.s.depth_penalty * depth
+        for pattern, points in self._re_priority_url_rules:
+            if pattern.search(url): score += points
+        if anchor:
+            for pattern, points in self._re_priority_anchor_rules:
+                if pattern.search(anchor): score += points
+        if self.s.priority_function: score += self.s.priority_function(url, depth, anchor or "")
+        return score
+    
+    def _get_anchors(self, url: str, page_text: str) -> Dict[str, str]:
+        """Get the text of the anchors of each link of a page
+
+        Args:
+            url (str): url/link of the page
+            page_text (str): html page of the url
+
+        Returns:
+            Dict[str, str]: link -> text of its anchors, written the same way as the links of the Url
+        """
         
-        # run through all the regex expression in the settings and store them in search attribute of Url
-        for name, expression in self.s.search_expressions.items():
-            if expression: url_object.search[name] = [result.strip() for result in re.findall(expression, page_text)]
-        self._url_book.append(url_object)
+        anchors = {}
+        domain = None if self.s.parse_html else self._get_domain_from_url(url)
+        for href, text in RE_ANCHOR.findall(page_text):
+            link = urljoin(url, href.strip()) if self.s.parse_html else self._clean_link(url, href, domain)
+            if self._normalizer: link = self._normalizer.normalize(link)
+            text = RE_TAG.sub(" ", text).strip()
+            anchors[link] = f"{anchors[link]} {text}" if link in anchors else text
+        return anchors
+    
+    def _get_canonical(self, url: str, page_text: str) -> str:
+        """Get the normalized url of the <link rel="canonical"> of a page
+        
+        Args:
+            url (str): url/link of the page
+            page_text (str): html page of the url
+        
+        Returns:
+            str: canonical url or None if the page doesn't have one
+        """
+        
+        # the canonical link is in the head, the body is not searched
+        end = page_text.find("</head>")
+        match = RE_CANONICAL.search(page_text, 0, end if end != -1 else len(page_text))
+        href = RE_HREF.search(match.group(0)) if match else None
+        if not href: return None
+        canonical = urljoin(url, href.group(1).strip())
+        return self._normalizer.normalize(canonical) if canonical.startswith(("http://", "https://")) else None
+    
+    def _parse_html(self, text: str) -> etree._Element:
+        """Parse an html page with lxml
+
+        Args:
+            text (str): html page
+
+        Returns:
+            etree._Element: root of the page or None if the page can't be parsed
+        """
+        
+        try: return etree.HTML(text)
+        except ValueError: return None
+    
+    def _get_links_from_tree(self, url: str, tree: etree._Element, link_xpath: str = None) -> List[str]:
+        """Get all the href of a parsed html page resolved against the url of the page
+
+        Args:
+            url (str): url/link of the page
+            tree (etree._Element): root of the page
+            link_xpath (str, optional): xpath of the elements where links are looked for. Defaults to None.
+
+        Returns:
+            List[str]: list of absolute http(s) links
+        """
+        
+        if tree is None: return []
+        
+        hrefs = []
+        for element in (tree.xpath(link_xpath) if link_xpath else [tree]):
+            # the xpath can directly select href attributes
+            if isinstance(element, str): hrefs.append(element)
+            elif isinstance(element, etree._Element): hrefs += self._xpath_href(element)
+        
+        links = []
+        for href in hrefs:
+            href = href.strip()
+            # skip anchors of the same page
+            if not href or href.startswith("#"): continue
+            link = urljoin(url, href)
+            if link.startswith(("http://", "https://")): links.append(link)
+        return links
+    
+    def _search_tree(self, tree: etree._Element) -> Dict[str, List[str]]:
+        """Run through all the xpath search expressions in the settings
+
+        Args:
+            tree (etree._Element): root of the page
+
+        Returns:
+            Dict[str, List[str]]: text of the results found for each expression name
+        """
+        
+        search = {}
+        for name, xpath in self._xpath_search.items():
+            results = xpath(tree) if tree is not None else []
+            # an xpath can return elements, strings, numbers or booleans
+            if not isinstance(results, list): results = [results]
+            search[name] = [("".join(result.itertext()) if isinstance(result, etree._Element) else str(result)).strip() for result in results]
+        return search
+    
+    def _search_text(self, text: str) -> Dict[str, List[str]]:
+        """Run through all the regex expression in the settings
+
+        Args:
+            text (str): html page
+
+        Returns:
+            Dict[str, List[str]]: results found for each expression name
+        """
+        
+        if not self._re_search_combined:
+            return {name: [self._strip_result(result) for result in pattern.findall(text)] for name, pattern in self._re_search.items()}
+        
+        combined, groups = self._re_search_combined
+        search = {name: [] for name in self._re_search}
+        for match in combined.finditer(text):
+            # the wrapping group of the expression that matched is the last one to close
+            name, nb_groups = groups[match.lastindex]
+            # keep the same results as re.findall: whole match, single group or tuple of groups
+            if nb_groups == 0: result = match.group(match.lastindex)
+            elif nb_groups == 1: result = match.group(match.lastindex + 1) or ""
+            else: result = tuple([match.group(match.lastindex + i) or "" for i in range(1, nb_groups + 1)])
+            search[name].append(self._strip_result(result))
+        return search
+    
+    def _strip_result(self, result: Union[str, Tuple[str, ...]]) -> Union[str, Tuple[str, ...]]:
+        """Strip a result of a search expression, each group of an expression with several groups is stripped
+
+        Args:
+            result (Union[str, Tuple[str, ...]]): whole match, single group or tuple of groups
+
+        Returns:
+            Union[str, Tuple[str, ...]]: result stripped
+        """
+        
+        if isinstance(result, tuple): return tuple([group.strip() for group in result])
+        return result.strip()
     
     def _get_all_links(self) -> List[str]:
         """Get all links found in the precedent depth
@@ -62,7 +538,7 @@ class UrlManager():
         for url_object in self._url_book: all_links += url_object.links
         return all_links
     
-    def _clean_link(self, url: str, link: str) -> str:
+    def _clean_link(self, url: str, link: str, domain: str = None) -> str:
         """Use regex substitution to find if link is schema relative "//google.com/path" 
         or relative "/path/path" or absolute "https://google.com" and add the https: or https://domain
         in front
@@ -70,28 +546,31 @@ class UrlManager():
         Args:
             url (str): url where if link is relative path have complete domain in it
             link (str): link to clean
+            domain (str, optional): domain of the url if already known. Defaults to None.
 
         Returns:
             str: clean link
         """
         
-        link = re.sub(self.s.link_schema_relative_sub[0], self.s.link_schema_relative_sub[1], link)
-        link = re.sub(self.s.link_relative_sub[0], self.s.link_relative_sub[1].format(domain=self._get_domain_from_url(url)), link)
+        link = self._re_link_schema_relative.sub(self.s.link_schema_relative_sub[1], link)
+        link = self._re_link_relative.sub(self.s.link_relative_sub[1].format(domain=domain or self._get_domain_from_url(url)), link)
         return link
     
-    def _get_links_from_text(self, url: str, text: str) -> List[str]:
+    def _get_links_from_text(self, url: str, text: str, domain: str = None) -> List[str]:
         """Get all the links from an html page
 
         Args:
             url (str): url/link where text comes from (to get the domain)
             text (str): html page
+            domain (str, optional): domain of the url if already known. Defaults to None.
 
         Returns:
             List[str]: list of clean links
         """
         
-        links = re.findall(self.s.link_findall, text)
-        return [self._clean_link(url, l) for l in links]
+        # the domain is the same for all the links of the page
+        domain = domain or self._get_domain_from_url(url)
+        return [self._clean_link(url, l, domain) for l in self._re_link_findall.findall(text)]
     
     def _get_domain_from_url(self, url: str) -> str:
         """Get the domain from a url
@@ -103,7 +582,23 @@ class UrlManager():
             str: domain
         """
         
-        return re.findall(self.s.domain_findall, url)[0]
+        return self._re_domain_findall.findall(url)[0]
+    
+    def _url_to_row(self, url_object: Union[Url, CompactUrl]) -> Dict[str, Union[str, List[str]]]:
+        """Flatten the search dict of an Url at the same level as its other attributes
+
+        Args:
+            url_object (Union[Url, CompactUrl]): Url dataclass to flatten
+
+        Returns:
+            Dict[str, Union[str, List[str]]]: flatten Url
+        """
+        
+        d = {"url": url_object.url, "domain": url_object.domain, "links": url_object.links}
+        # status is only set in incremental crawl
+        if url_object.status is not None: d["status"] = url_object.status
+        # split search dict of Url dict
+        return {**d, **url_object.search}
     
     def _url_to_dict(self) -> Dict[str, List]:
         """Transform url book into a 2 dimentional Dict of List
@@ -113,13 +608,7 @@ class UrlManager():
         """
         
         # flatten search dict of Url dict
-        flatten_dict: List[Dict[str, str | str, List[str]]] = []
-        for url_object in self._url_book:
-            d = url_object.__dict__.copy()
-            # split search dict of Url dict
-            search, remaining = d.pop("search"), d
-            # flatten search dict at the same level of the remaining dict
-            flatten_dict.append({**remaining, **search})
+        flatten_dict: List[Dict[str, str | str, List[str]]] = [self._url_to_row(url_object) for url_object in self._url_book]
         
         # Unifie List of Dict that sometimes contain List and str to only contain str
         lod: List[Dict[str: str]] = [{key: ", ".join(value) if type(value) == list else value for key, value in d.items()} for d in flatten_dict]
@@ -9,6 +9,10 @@ install_requires = [
     "selenium>=4.10.0",
 ]
 
+extras_require = {
+    "async": ["aiohttp>=3.8.0"],
+}
+
 setup(
     name="scrapdynamics",
     version=__version__,
@@ -20,6 +24,7 @@ setup(
     author_email="guychahine@gmail.com",
     packages=["scrapdynamics"],
     install_requires=install_requires,
+    extras_require=extras_require,
     license="BSD",
     classifiers=[
         "Development Status :: 5 - Production/Stable",
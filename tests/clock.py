@@ -0,0 +1,11 @@
+class FakeClock():
+    """Clock of the tests, the time only moves when the test sets now or sleeps"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, delay: float):
+        self.now += delay
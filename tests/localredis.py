@@ -0,0 +1,108 @@
+from threading import RLock
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from scrapdynamics.distributed import REDIS_LEASE, REDIS_PUSH, REDIS_REQUEUE
+
+
+class LocalRedis():
+    """In memory stand-in of the redis.Redis client with decode_responses=True,
+    only the commands used by RedisBackend are implemented. The lua scripts of RedisBackend
+    are run by python functions doing the same commands, atomically like on a redis server
+    """
+
+    def __init__(self):
+
+        # scripts call the other commands while they hold the lock
+        self._lock = RLock()
+        self._sets: Dict[str, Set[str]] = {}
+        self._hashes: Dict[str, Dict[str, str]] = {}
+        self._zsets: Dict[str, Dict[str, float]] = {}
+        self._lists: Dict[str, List[str]] = {}
+        self._counters: Dict[str, int] = {}
+
+    def sadd(self, name: str, value: str) -> int:
+        with self._lock:
+            values = self._sets.setdefault(name, set())
+            if value in values: return 0
+            values.add(value)
+            return 1
+
+    def hset(self, name: str, key: str, value) -> int:
+        with self._lock:
+            values = self._hashes.setdefault(name, {})
+            new = key not in values
+            values[key] = str(value)
+            return int(new)
+
+    def hget(self, name: str, key: str) -> Optional[str]:
+        with self._lock: return self._hashes.get(name, {}).get(key)
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+            return self._counters[name]
+
+    def zadd(self, name: str, mapping: Dict[str, float]) -> int:
+        with self._lock:
+            values = self._zsets.setdefault(name, {})
+            new = len([key for key in mapping if key not in values])
+            values.update(mapping)
+            return new
+
+    def zpopmin(self, name: str, count: int = 1) -> List[Tuple[str, float]]:
+        with self._lock:
+            values = self._zsets.setdefault(name, {})
+            popped = sorted(values.items(), key=lambda item: (item[1], item[0]))[:count]
+            for key, score in popped: del values[key]
+            return popped
+
+    def zrem(self, name: str, key: str) -> int:
+        with self._lock: return int(self._zsets.setdefault(name, {}).pop(key, None) is not None)
+
+    def zrangebyscore(self, name: str, min: str, max: float) -> List[str]:
+        with self._lock:
+            return [key for key, score in sorted(self._zsets.get(name, {}).items(), key=lambda item: item[1]) if float(min) <= score <= float(max)]
+
+    def zcard(self, name: str) -> int:
+        with self._lock: return len(self._zsets.get(name, {}))
+
+    def rpush(self, name: str, value: str) -> int:
+        with self._lock:
+            self._lists.setdefault(name, []).append(value)
+            return len(self._lists[name])
+
+    def lrange(self, name: str, start: int, end: int) -> List[str]:
+        with self._lock:
+            values = self._lists.get(name, [])
+            return values[start:] if end == -1 else values[start:end + 1]
+
+    def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        scripts = {REDIS_PUSH: self._push, REDIS_LEASE: self._lease, REDIS_REQUEUE: self._requeue}
+        keys, args = keys_and_args[:numkeys], [str(arg) for arg in keys_and_args[numkeys:]]
+        with self._lock: return scripts[script](keys, args)
+
+    def _push(self, keys: List[str], args: List[str]) -> int:
+        seen, depths, queue, counter = keys
+        queued = 0
+        for url, depth in zip(args[::2], args[1::2]):
+            if not self.sadd(seen, url): continue
+            self.hset(depths, url, depth)
+            self.zadd(queue, {url: int(depth) * 1e12 + self.incr(counter)})
+            queued += 1
+        return queued
+
+    def _lease(self, keys: List[str], args: List[str]) -> List[str]:
+        queue, leases, depths = keys
+        leased = []
+        for url, score in self.zpopmin(queue, int(args[0])):
+            self.zadd(leases, {url: float(args[1])})
+            leased += [url, self.hget(depths, url)]
+        return leased
+
+    def _requeue(self, keys: List[str], args: List[str]) -> int:
+        leases, depths, queue, counter = keys
+        expired = self.zrangebyscore(leases, "-inf", float(args[0]))
+        for url in expired:
+            self.zrem(leases, url)
+            self.zadd(queue, {url: int(self.hget(depths, url)) * 1e12 + self.incr(counter)})
+        return len(expired)
@@ -0,0 +1,77 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread, Lock
+from time import sleep
+from typing import Dict, List, Set, Tuple
+
+
+class LocalServer():
+    """Serve static pages on localhost in a background thread to test the crawler without internet
+
+    Args:
+        pages (Dict[str, Tuple[int, Dict[str, str], str]]): path -> (status code, headers, body),
+            "{base}" in headers and body is replaced by the url of the server
+        latency (float, optional): time in seconds to wait before answering. Defaults to 0.
+    """
+
+    def __init__(self, pages: Dict[str, Tuple[int, Dict[str, str], str]], latency: float = 0):
+
+        self.pages = pages
+        self.latency = latency
+        self.requests: List[Tuple[str, str]] = []
+        self.connections: Set[Tuple[str, int]] = set()
+        self._lock = Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            protocol_version = "HTTP/1.1"
+
+            def do_HEAD(self): server._answer(self, False)
+            def do_GET(self): server._answer(self, True)
+            def log_message(self, *args): pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "LocalServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _answer(self, handler: BaseHTTPRequestHandler, send_body: bool):
+        with self._lock:
+            self.requests.append((handler.command, handler.path))
+            self.connections.add(handler.client_address)
+        if self.latency: sleep(self.latency)
+
+        status, headers, body = self.pages.get(handler.path, (404, {"Content-Type": "text/html"}, "not found"))
+        body = body.replace("{base}", self.url).encode()
+        # answer conditional requests of pages with an ETag
+        if "ETag" in headers and handler.headers.get("If-None-Match") == headers["ETag"]: status, body = 304, b""
+
+        handler.send_response(status)
+        for key, value in headers.items(): handler.send_header(key, value.replace("{base}", self.url))
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        if send_body: handler.wfile.write(body)
+
+
+def html_page(links: List[str], text: str = "") -> Tuple[int, Dict[str, str], str]:
+    """Build a simple html page with absolute links to the local server
+
+    Args:
+        links (List[str]): paths the page links to
+        text (str, optional): text added in the body. Defaults to "".
+
+    Returns:
+        Tuple[int, Dict[str, str], str]: page for LocalServer
+    """
+
+    anchors = "\n".join([f'<a href="{{base}}{link}">{link}</a>' for link in links])
+    return 200, {"Content-Type": "text/html"}, f"<html><head><title>{text}</title></head><body>{anchors}{text}</body></html>"
@@ -0,0 +1,144 @@
+import asyncio
+import importlib
+import sys
+
+import pytest
+
+import scrapdynamics as sd
+from scrapdynamics.settings import Settings
+from scrapdynamics.sink import JsonLinesSink
+from scrapdynamics.incremental import IncrementalState
+from tests.server import LocalServer, html_page
+from tests.test_crawler import SITE
+
+aiohttp = pytest.importorskip("aiohttp")
+
+class FailOnce(dict):
+    """pages where a path answers an error status code to its first request"""
+
+    def __init__(self, pages, path, status):
+        super(FailOnce, self).__init__(pages)
+        self.path = path
+        self.status = status
+        self.failed = False
+
+    def get(self, path, default=None):
+        if path == self.path and not self.failed:
+            self.failed = True
+            return self.status, {"Content-Type": "text/html", "Retry-After": "0"}, ""
+        return super(FailOnce, self).get(path, default)
+
+def paths(url_objects, server):
+    return [url_object.url.replace(server.url, "") for url_object in url_objects]
+
+class TestAsyncCrawler():
+
+    def test_astart_same_pages(self):
+        for max_concurrency in [1, 4]:
+            s = Settings(progress_bar=False, depth=2, max_concurrency=max_concurrency, max_concurrency_per_domain=2)
+            with LocalServer(SITE, latency=0.01) as server:
+                expected = sd.Crawler(server.url + "/", s)
+                expected.start()
+                c = sd.Crawler(server.url + "/", s)
+                asyncio.run(c.astart())
+            if max_concurrency == 1: assert paths(c._url_book, server) == paths(expected._url_book, server)
+            assert sorted(paths(c._url_book, server)) == sorted(["/", "/a", "/b", "/a1", "/a2", "/r", "/b1"])
+
+    def test_iter_results(self):
+        async def crawl(c):
+            return [url_object async for url_object in c.iter_results()]
+
+        s = Settings(progress_bar=False, depth=2, max_concurrency=4)
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            results = asyncio.run(crawl(c))
+        assert paths(results, server) == paths(c._url_book, server)
+        assert results[0].url == server.url + "/"
+
+    def test_iter_results_stop_early(self, tmp_path):
+        async def crawl(c):
+            results = []
+            async for url_object in c.iter_results():
+                results.append(url_object)
+                if len(results) == 2: break
+            return results
+
+        s = Settings(progress_bar=False, depth=2, max_concurrency=4, checkpoint_path=str(tmp_path / "checkpoint.sqlite"),
+                     incremental_path=str(tmp_path / "state.sqlite"), extraction_processes=2)
+        with LocalServer(SITE, latency=0.05) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.add_sink(JsonLinesSink(tmp_path / "results.jsonl"))
+            results = asyncio.run(crawl(c))
+        assert len(results) == 2
+        # the crawl is closed but not saved for the next incremental crawl
+        assert c._sinks == [] and c._checkpoint is None and c._incremental is None
+        assert c._extraction_pool._executor is None
+        assert len((tmp_path / "results.jsonl").read_text().splitlines()) == 2
+        assert list(IncrementalState(s.incremental_path).removed()) == []
+
+    def test_crawls_share_loop(self):
+        ticks = []
+        async def ticker(done):
+            while not done.is_set():
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        async def crawl(crawlers):
+            done = asyncio.Event()
+            tick = asyncio.ensure_future(ticker(done))
+            await asyncio.gather(*[c.astart() for c in crawlers])
+            done.set()
+            await tick
+
+        s = Settings(progress_bar=False, depth=2, max_concurrency=2)
+        with LocalServer(SITE, latency=0.05) as server:
+            crawlers = [sd.Crawler(server.url + "/", s) for _ in range(3)]
+            asyncio.run(crawl(crawlers))
+        assert all([len(c._url_book) == 7 for c in crawlers])
+        # the loop kept running while pages were fetched
+        assert len(ticks) >= 5
+
+    def test_single_request_and_budget(self):
+        s = Settings(progress_bar=False, depth=2, single_request=True, max_pages=4)
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            asyncio.run(c.astart())
+        # the pdf /c is not downloaded and doesn't count in max_pages
+        assert paths(c._url_book, server) == ["/", "/a", "/b", "/a1"]
+        assert not [command for command, path in server.requests if command == "HEAD"]
+        assert server.url + "/c" not in c._redirects
+
+    def test_best_first(self):
+        site = {
+            "/": html_page(["/about", "/jobs"], "root"),
+            "/jobs": html_page(["/job/1", "/job/2"], "jobs"),
+            "/about": html_page([], "about"),
+            "/job/1": html_page([], "job 1"),
+            "/job/2": html_page([], "job 2"),
+        }
+        s = Settings(progress_bar=False, depth=3, crawl_order="best_first", priority_url_rules={"/job": 10}, max_pages=4)
+        with LocalServer(site) as server:
+            c = sd.Crawler(server.url + "/", s)
+            asyncio.run(c.astart())
+        assert paths(c._url_book, server) == ["/", "/jobs", "/job/1", "/job/2"]
+
+    def test_polite_retry_throttled(self):
+        s = Settings(progress_bar=False, depth=2, polite=True, polite_rate=0, respect_robots=False, max_concurrency=1)
+        with LocalServer(FailOnce(SITE, "/a", 429)) as server:
+            c = sd.Crawler(server.url + "/", s)
+            asyncio.run(c.astart())
+        assert sorted(paths(c._url_book, server)) == sorted(["/", "/a", "/b", "/a1", "/a2", "/r", "/b1"])
+        assert server.requests.count(("HEAD", "/a")) == 2
+
+    def test_retry_policy(self):
+        for retries, expected in [(0, ["/", "/b", "/b1"]), (1, ["/", "/a", "/b", "/a1", "/a2", "/r", "/b1"])]:
+            s = Settings(progress_bar=False, depth=2, retries=retries, max_concurrency=1)
+            with LocalServer(FailOnce(SITE, "/a", 500)) as server:
+                c = sd.Crawler(server.url + "/", s)
+                asyncio.run(c.astart())
+            assert sorted(paths(c._url_book, server)) == sorted(expected)
+
+    def test_missing_aiohttp(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "aiohttp", None)
+        monkeypatch.delitem(sys.modules, "scrapdynamics.aio", raising=False)
+        with pytest.raises(ImportError, match="pip install scrapdynamics\\[async\\]"): importlib.import_module("scrapdynamics.aio")
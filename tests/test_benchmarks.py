@@ -0,0 +1,35 @@
+import requests
+
+from benchmarks.run import compare, percentile, run_mode
+from benchmarks.site import SyntheticSite
+
+class TestSyntheticSite():
+    
+    def test_pages(self):
+        with SyntheticSite(pages=50, fan_out=3, page_size=1000, redirect_ratio=0.2, non_html_ratio=0.2) as site:
+            kinds = [site.page_kind(page) for page in range(50)]
+            assert {"html", "redirect", "binary"} == set(kinds)
+            
+            root = requests.get(site.url + "/")
+            assert root.text.count("<a href") == 3 and len(root.content) == 1000
+            redirect = kinds.index("redirect")
+            assert requests.get(f"{site.url}/page/{redirect}").history[0].status_code == 301
+            assert requests.get(f"{site.url}/page/{kinds.index('binary')}").headers["Content-Type"] == "application/octet-stream"
+            assert requests.get(site.url + "/page/50").status_code == 404
+        
+class TestHarness():
+    
+    def test_run_mode(self):
+        with SyntheticSite(pages=30, fan_out=3, page_size=1000) as site: measures = run_mode(site.url, 1, {})
+        assert measures["pages"] == 4 and measures["fetches"] == 3
+        assert measures["fetch_p99"] >= measures["fetch_p50"] > 0
+        
+    def test_compare(self):
+        baseline = {"requests": {"pages_per_sec": 100, "peak_rss": 1000}}
+        assert compare({"requests": {"pages_per_sec": 90, "peak_rss": 1100}}, baseline, 0.2) == []
+        regressions = compare({"requests": {"pages_per_sec": 70, "peak_rss": 1300}}, baseline, 0.2)
+        assert [regression.split(":")[0] for regression in regressions] == ["requests pages_per_sec", "requests peak_rss"]
+        
+    def test_percentile(self):
+        assert percentile([3, 1, 2, 4], 50) == 3
+        assert percentile([], 99) == 0
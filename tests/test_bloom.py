@@ -0,0 +1,62 @@
+import pytest
+
+from scrapdynamics.bloom import BloomFilter, ScalableBloomFilter
+
+URLS = [f"https://example.com/page/{i}" for i in range(5000)]
+OTHERS = [f"https://example.org/other/{i}" for i in range(5000)]
+
+class TestBloomFilter():
+    
+    def test_no_false_negative(self):
+        bloom = BloomFilter(len(URLS), 0.01)
+        assert sum([bloom.add(url) for url in URLS]) >= len(URLS) * 0.99
+        assert all([url in bloom for url in URLS])
+        assert not bloom.add(URLS[0])
+        
+    def test_error_rate(self):
+        bloom = BloomFilter(len(URLS), 0.01)
+        for url in URLS: bloom.add(url)
+        assert sum([url in bloom for url in OTHERS]) / len(OTHERS) < 0.03
+        assert 0.005 < bloom.false_positive_rate() < 0.02
+        
+    def test_error_rate_small_filter(self):
+        # a few bits and many hashes per item
+        errors = 0
+        for i in range(1000):
+            bloom = BloomFilter(2, 1e-6)
+            bloom.add(f"https://example.com/{i}/a")
+            bloom.add(f"https://example.com/{i}/b")
+            errors += f"https://example.com/{i}/c" in bloom
+        assert errors == 0
+        
+    def test_memory_mapped(self, tmp_path):
+        bloom = BloomFilter(1000, 0.001, path=str(tmp_path / "seen.bloom"))
+        bloom.add("https://example.com/")
+        assert "https://example.com/" in bloom
+        assert (tmp_path / "seen.bloom").stat().st_size == bloom.nbytes
+        bloom.close()
+
+class TestScalableBloomFilter():
+    
+    def test_grow(self):
+        bloom = ScalableBloomFilter(1000, 0.01)
+        for url in URLS: bloom.add(url)
+        assert len(bloom._filters) == 3
+        assert all([url in bloom for url in URLS])
+        assert sum([url in bloom for url in OTHERS]) / len(OTHERS) < 0.02
+        assert bloom.false_positive_rate() < 0.01
+        
+    def test_add_once(self):
+        bloom = ScalableBloomFilter(10)
+        assert bloom.add("link1")
+        assert not bloom.add("link1")
+        assert len(bloom) == 1
+        
+    def test_memory_mapped(self, tmp_path):
+        bloom = ScalableBloomFilter(10, path=str(tmp_path / "seen"))
+        for i in range(40): bloom.add(f"link{i}")
+        assert sorted([path.name for path in tmp_path.iterdir()]) == ["seen.0", "seen.1", "seen.2"]
+        with pytest.raises(ValueError): ScalableBloomFilter(10, path=str(tmp_path / "seen"))
+        bloom.close()
+        # the files are free once the filter is closed
+        ScalableBloomFilter(10, path=str(tmp_path / "seen")).close()
@@ -0,0 +1,27 @@
+from scrapdynamics.checkpoint import Checkpoint
+from scrapdynamics.url import Url
+
+class TestCheckpoint():
+    
+    def test_save_load(self, tmp_path):
+        c = Checkpoint(tmp_path / "crawl.sqlite")
+        c.clear("https://example.com")
+        c.add_page("https://example.com", 0, Url("https://example.com", "example.com", ["link1"], {"emails": ["email1"]}))
+        c.add_page("https://example.com/pdf", 1)
+        c.save([("link1", 1), ("link2", 2)])
+        c.close()
+        
+        base_url, pages, pending = Checkpoint(tmp_path / "crawl.sqlite").load()
+        assert base_url == "https://example.com"
+        assert pages == [
+            ("https://example.com", 0, Url("https://example.com", "example.com", ["link1"], {"emails": ["email1"]})),
+            ("https://example.com/pdf", 1, None),
+        ]
+        assert pending == [("link1", 1), ("link2", 2)]
+        
+    def test_save_replace_frontier(self, tmp_path):
+        c = Checkpoint(tmp_path / "crawl.sqlite")
+        c.clear("https://example.com")
+        c.save([("link1", 1)])
+        c.save([("link2", 1)])
+        assert c.load()[2] == [("link2", 1)]
@@ -1,7 +1,26 @@
-from json import load
+from json import load, loads
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
 
 import scrapdynamics as sd
 from scrapdynamics.settings import Settings
+from scrapdynamics.url import UrlManager
+from scrapdynamics.sink import JsonLinesSink
+from scrapdynamics.checkpoint import Checkpoint
+from tests.server import LocalServer, html_page
+
+SITE = {
+    "/": html_page(["/a", "/b", "/c"], "root"),
+    "/a": html_page(["/a1", "/a2", "/b", "/r"], "a"),
+    "/r": (301, {"Location": "{base}/b2"}, ""),
+    "/b2": html_page([], "b2"),
+    "/b": html_page(["/b1"], "b"),
+    "/c": (200, {"Content-Type": "application/pdf"}, "pdf"),
+    "/a1": html_page([], "a1"),
+    "/a2": html_page([], "a2"),
+    "/b1": html_page(["/"], "b1"),
+}
 
 class TestCrawler():
         
@@ -54,4 +73,375 @@ class TestCrawler():
             xpath_restrict_link_crawl="/html/body/div"
         )
         c = sd.Crawler("https://example.org", s)
-        assert c._children_element_xpath(self.test_site1) == self.test_site1_results["div_children_elements"]
\ No newline at end of file
+        assert c._children_element_xpath(self.test_site1) == self.test_site1_results["div_children_elements"]
+        
+    def test_start_concurrent_same_order(self):
+        results = []
+        for max_concurrency in [1, 4]:
+            s = Settings(progress_bar=False, depth=2, max_concurrency=max_concurrency, max_concurrency_per_domain=2)
+            with LocalServer(SITE, latency=0.01) as server:
+                c = sd.Crawler(server.url + "/", s)
+                c.start()
+            results.append([url_object.url.replace(server.url, "") for url_object in c._url_book])
+        assert results[0] == results[1]
+        assert results[0] == ["/", "/a", "/b", "/a1", "/a2", "/r", "/b1"]
+
+    def test_session_keep_alive(self):
+        s = Settings(progress_bar=False, depth=2, pool_maxsize=1, retries=2)
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert len(server.requests) > 1
+        assert len(server.connections) == 1
+        assert c.session.get_adapter(server.url).max_retries.total == 2
+
+    def test_start_fetch_new_links_only(self):
+        s = Settings(progress_bar=False, depth=3)
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        gets = [path for command, path in server.requests if command == "GET"]
+        assert sorted(gets) == sorted(set(gets))
+
+    def test_resume(self, tmp_path):
+        s = Settings(progress_bar=False, depth=2, checkpoint_path=str(tmp_path / "crawl.sqlite"), checkpoint_interval=1)
+        with LocalServer(SITE) as server:
+            expected = sd.Crawler(server.url + "/", Settings(progress_bar=False, depth=2))
+            expected.start()
+            
+            # stop the crawl in the middle of depth 2
+            c = sd.Crawler(server.url + "/", s)
+            get_page_request = c._get_page_request
+            def crash(url, *args):
+                if url.endswith("/a2"): raise KeyboardInterrupt
+                return get_page_request(url, *args)
+            c._get_page_request = crash
+            with pytest.raises(KeyboardInterrupt): c.start()
+            
+            server.requests.clear()
+            c = sd.Crawler(server.url + "/", s)
+            c.resume(s.checkpoint_path)
+        assert [url_object.url for url_object in c._url_book] == [url_object.url for url_object in expected._url_book]
+        assert [path for command, path in server.requests if command == "GET"] == ["/a2", "/b2", "/b1"]
+
+    def test_hybrid_fetch(self):
+        drivers = []
+        class FakeDriver():
+            def __init__(self): drivers.append(self)
+            def get(self, url): self.page_source = html_page([], "rendered")[2]
+            def quit(self): self.closed = True
+        s = Settings(
+            progress_bar=False,
+            depth=2,
+            simulate_human=True,
+            hybrid_fetch=True,
+            scroll_first_page=False,
+            render_if_empty=["title"],
+            render_if_match="<title>a1</title>",
+            render_predicate=lambda url, page_text: url.endswith("/b"),
+            search_expressions={"title": r"<title>(\w+)</title>"},
+        )
+        with LocalServer({**SITE, "/a2": html_page([], "")}) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.driver_pool.factory = FakeDriver
+            c.start()
+        # the browsers are quit at the end of the crawl
+        assert drivers and all([getattr(driver, "closed", False) for driver in drivers])
+        assert len(c.driver_pool) == 0 and c.driver_pool.factory is FakeDriver
+        assert {url_object.url.replace(server.url, ""): url_object.search["title"][0] for url_object in c._url_book} == {
+            "/": "root",
+            "/a": "a",
+            "/b": "rendered",
+            "/a1": "rendered",
+            "/a2": "rendered",
+            "/r": "b2",
+        }
+
+    def test_selenium_scroll_page(self):
+        class FakeDriver():
+            def set_script_timeout(self, timeout): self.timeout = timeout
+            def execute_async_script(self, script, *args):
+                self.args = args
+                return {"reason": "end", "scrolls": 3, "height": 3000}
+        s = Settings(progress_bar=False, scroll_max_scrolls=5, scroll_max_items=50, scroll_item_selector="li", scroll_time_budget=10, scroll_idle_time=0.2)
+        c = sd.Crawler("https://example.org", s)
+        driver = FakeDriver()
+        assert c._selenium_scroll_page(driver)["reason"] == "end"
+        assert driver.args == (5, 50, "li", 10000, 200)
+        assert driver.timeout > 10
+
+    def test_single_request(self):
+        s = Settings(progress_bar=False, depth=2, single_request=True)
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert [command for command, path in server.requests if command == "HEAD"] == []
+        assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/a", "/b", "/a1", "/a2", "/r", "/b1"]
+        assert c._url_book.get(server.url + "/r").search["title"] == ["b2"]
+        assert c._redirects == {server.url + "/r": server.url + "/b2"}
+        
+    def test_redirect_resolved_once(self):
+        s = Settings(progress_bar=False, depth=2)
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert server.requests.count(("HEAD", "/r")) == 1
+        assert ("GET", "/r") not in server.requests
+        assert ("GET", "/b2") in server.requests
+
+    def test_start_parse_html(self):
+        s = Settings(progress_bar=False, depth=2, parse_html=True, xpath_restrict_link_crawl="//a[position() < 3]")
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/a", "/b", "/a1", "/a2", "/r", "/b1"]
+        assert c._url_book[0].search["title"] == ["root"]
+
+    def test_polite_robots(self):
+        s = Settings(progress_bar=False, depth=2, polite=True, polite_rate=1000, polite_burst=10)
+        with LocalServer({**SITE, "/robots.txt": (200, {"Content-Type": "text/plain"}, "User-agent: *\nDisallow: /a2")}) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/a", "/b", "/a1", "/r", "/b1"]
+        assert server.requests.count(("GET", "/robots.txt")) == 1
+        assert ("HEAD", "/a2") not in server.requests
+
+    def test_http_cache(self, tmp_path):
+        site = {path: (status, {**headers, "ETag": f'"{path}"'}, body) for path, (status, headers, body) in SITE.items()}
+        for single_request in [False, True]:
+            s = Settings(progress_bar=False, depth=2, single_request=single_request, http_cache_path=str(tmp_path / f"cache{single_request}.sqlite"))
+            with LocalServer(site) as server:
+                first = sd.Crawler(server.url + "/", s)
+                first.start()
+                server.requests.clear()
+                second = sd.Crawler(server.url + "/", s)
+                second.start()
+            assert [url_object.search for url_object in first._url_book] == [url_object.search for url_object in second._url_book]
+            assert len(second._url_book) == 7
+            assert second._http_cache.get(server.url + "/a").body == site["/a"][2].replace("{base}", server.url)
+
+    def test_start_incremental(self, tmp_path, monkeypatch):
+        s = Settings(progress_bar=False, depth=2, incremental_path=str(tmp_path / "state.sqlite"))
+        site = dict(SITE)
+        with LocalServer(site) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start(incremental=True)
+            assert {url_object.status for url_object in c._url_book} == {"new"}
+            
+            site["/a"] = html_page(["/a1", "/b", "/r"], "a changed")
+            extracted = []
+            extract_url = UrlManager._extract_url
+            monkeypatch.setattr(UrlManager, "_extract_url", lambda self, url, *args: extracted.append(url) or extract_url(self, url, *args))
+            c = sd.Crawler(server.url + "/", s)
+            c.start(incremental=True)
+        assert {url_object.url.replace(server.url, ""): url_object.status for url_object in c._url_book} == {
+            "/": "unchanged",
+            "/a": "changed",
+            "/b": "unchanged",
+            "/a1": "unchanged",
+            "/r": "unchanged",
+            "/b1": "unchanged",
+            "/a2": "removed",
+        }
+        assert extracted == [server.url + "/a"]
+        assert c._url_book.get(server.url + "/a").search["title"] == ["a changed"]
+        assert c._url_to_row(c._url_book[0])["status"] == "unchanged"
+        
+    def test_start_incremental_extraction_processes(self, tmp_path, monkeypatch):
+        submitted = []
+        class Executor(ProcessPoolExecutor):
+            def submit(self, fn, url, *args):
+                submitted.append(url)
+                return super(Executor, self).submit(fn, url, *args)
+        monkeypatch.setattr("scrapdynamics.extraction.ProcessPoolExecutor", Executor)
+        
+        s = Settings(progress_bar=False, depth=2, incremental_path=str(tmp_path / "state.sqlite"), extraction_processes=2)
+        site = dict(SITE)
+        with LocalServer(site) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start(incremental=True)
+            assert len(submitted) == 6
+            
+            site["/a"] = html_page(["/a1", "/b", "/r"], "a changed")
+            submitted.clear()
+            c = sd.Crawler(server.url + "/", s)
+            c.start(incremental=True)
+        # only the changed page is sent to the processes
+        assert submitted == [server.url + "/a"]
+        assert c._url_book.get(server.url + "/a").search["title"] == ["a changed"]
+        assert {url_object.status for url_object in c._url_book} == {"unchanged", "changed", "removed"}
+        
+    def test_start_incremental_needs_path(self):
+        with pytest.raises(ValueError): sd.Crawler("https://example.org", Settings(progress_bar=False)).start(incremental=True)
+
+    def test_normalize_urls(self):
+        site = {
+            "/": html_page(["/p?utm_source=x", "/p#top", "/p/", "/q"], "root"),
+            "/p": html_page([], "p"),
+            "/q": (200, {"Content-Type": "text/html"}, '<html><head><link rel="canonical" href="/p"></head><body>q</body></html>'),
+        }
+        s = Settings(progress_bar=False, depth=1, normalize_urls=True)
+        with LocalServer(site) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/p"]
+        assert [path for command, path in server.requests if command == "GET"] == ["/", "/p", "/q"]
+        assert c.normalization_stats()["rewritten"] == 3
+
+    def test_compact_storage(self):
+        s = Settings(progress_bar=False, depth=2, compact_storage=True)
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/a", "/b", "/a1", "/a2", "/r", "/b1"]
+        assert c._url_to_dict()["links"][0] == ", ".join([server.url + link for link in ["/a", "/b", "/c"]])
+
+    def test_extraction_processes(self):
+        s = Settings(progress_bar=False, depth=2, extraction_processes=2)
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/a", "/b", "/a1", "/a2", "/r", "/b1"]
+        assert c._url_book[1].search["title"] == ["a"]
+        assert c._extraction_pool._executor is None
+        
+        stats = []
+        for extraction_processes in [0, 2]:
+            s = Settings(progress_bar=False, depth=2, extraction_processes=extraction_processes, normalize_urls=True)
+            with LocalServer(SITE) as server:
+                c = sd.Crawler(server.url + "/", s)
+                c.start()
+            stats.append(c.normalization_stats())
+        assert stats[0] == stats[1] and stats[0]["calls"] == 10
+
+    def test_stats(self, tmp_path):
+        s = Settings(progress_bar=False, depth=2, metrics=True, metrics_path=str(tmp_path / "metrics.json"))
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+            assert "_fetch_url" in c.profile_page(server.url + "/a")
+        stats = c.stats()
+        assert stats["pages"] == 7
+        assert stats["stages"]["extract"]["count"] == 7
+        assert stats["stages"]["head"]["count"] == stats["counters"]["requests"] - stats["stages"]["get"]["count"]
+        assert stats["hosts"][server.url.split("//")[1]]["bytes"] == stats["counters"]["bytes"] > 0
+        assert (tmp_path / "metrics.json").exists()
+        assert "stages" not in sd.Crawler(server.url + "/", Settings(progress_bar=False)).stats()
+
+    def test_resume_before_first_save(self, tmp_path):
+        for crawl_order in ["breadth_first", "best_first"]:
+            path = str(tmp_path / f"{crawl_order}.sqlite")
+            s = Settings(progress_bar=False, depth=2, crawl_order=crawl_order, checkpoint_path=path)
+            with LocalServer(SITE) as server:
+                expected = sd.Crawler(server.url + "/", Settings(progress_bar=False, depth=2, crawl_order=crawl_order))
+                expected.start()
+                
+                # crash on the second page of depth 1, long before checkpoint_interval pages
+                c = sd.Crawler(server.url + "/", s)
+                get_page_request = c._get_page_request
+                def crash(url, *args):
+                    if url.endswith("/b"): raise KeyboardInterrupt
+                    return get_page_request(url, *args)
+                c._get_page_request = crash
+                with pytest.raises(KeyboardInterrupt): c.start()
+                
+                c = sd.Crawler(server.url + "/", s)
+                c.resume(path)
+            assert sorted([url_object.url for url_object in c._url_book]) == sorted([url_object.url for url_object in expected._url_book])
+            assert len(c._url_book) == 7
+        
+    def test_resume_empty_checkpoint(self, tmp_path):
+        path = str(tmp_path / "crawl.sqlite")
+        checkpoint = Checkpoint(path)
+        checkpoint.clear("http://127.0.0.1:9/")
+        checkpoint.close()
+        with pytest.raises(ValueError, match="no page"): sd.Crawler("http://127.0.0.1:9/", Settings(progress_bar=False)).resume(path)
+        
+    def test_best_first_budget(self):
+        site = {
+            "/": (200, {"Content-Type": "text/html"}, '<a href="{base}/about">About</a><a href="{base}/contact">Apply here</a><a href="{base}/jobs">Careers</a>'),
+            "/jobs": html_page(["/job/1", "/job/2", "/job/3"], "jobs"),
+            "/about": html_page([], "about"),
+            "/contact": html_page([], "contact"),
+            "/job/1": html_page([], "job 1"),
+            "/job/2": html_page([], "job 2"),
+            "/job/3": html_page([], "job 3"),
+        }
+        s = Settings(progress_bar=False, depth=3, crawl_order="best_first", priority_url_rules={"/job": 10}, priority_anchor_rules={"apply": 5}, max_pages=5)
+        with LocalServer(site) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/jobs", "/job/1", "/job/2", "/job/3"]
+        assert ("HEAD", "/about") not in server.requests
+        
+        s = Settings(progress_bar=False, depth=3, crawl_order="best_first", priority_anchor_rules={"(?i)apply": 5}, max_pages=2)
+        with LocalServer(site) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/contact"]
+        
+        # links skipped by restrict_to_domain or rejected by the HEAD request don't use up the budget
+        other_site = {
+            "/": (200, {"Content-Type": "text/html"}, '<a href="https://twitter.com/x">x</a><a href="https://facebook.com/x">f</a>'
+                '<a href="{base}/doc">doc</a><a href="{base}/a">a</a><a href="{base}/b">b</a>'),
+            "/doc": (200, {"Content-Type": "application/pdf"}, "pdf"),
+            "/a": html_page([], "a"),
+            "/b": html_page([], "b"),
+        }
+        for crawl_order in ["breadth_first", "best_first"]:
+            s = Settings(progress_bar=False, depth=2, crawl_order=crawl_order, max_pages=3)
+            with LocalServer(other_site) as server:
+                c = sd.Crawler(server.url + "/", s)
+                c.start()
+            assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/a", "/b"]
+
+    def test_max_pages_per_host_and_time(self):
+        s = Settings(progress_bar=False, depth=2, max_pages_per_host=3)
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/a", "/b"]
+        
+        s = Settings(progress_bar=False, depth=2, max_time=0.3)
+        with LocalServer(SITE, latency=0.1) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert 1 <= len(c._url_book) < 7
+        
+    def test_bloom_filter_without_results(self, tmp_path):
+        s = Settings(progress_bar=False, depth=2, bloom_filter=True, bloom_capacity=2, bloom_error_rate=1e-12, bloom_path=str(tmp_path / "seen"), keep_results=False)
+        with LocalServer(SITE) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.add_sink(JsonLinesSink(tmp_path / "results.jsonl"))
+            c.start()
+        with open(tmp_path / "results.jsonl") as f: urls = [loads(line)["url"].replace(server.url, "") for line in f]
+        assert urls == ["/", "/a", "/b", "/a1", "/a2", "/r", "/b1"]
+        assert list(c._url_book) == [] and c.stats()["pages"] == 7
+        assert (tmp_path / "seen.links.1").exists()
+        # the filters are closed at the end of the crawl, another crawler can use the same files
+        assert all([seen._filters[0]._file is None for seen in c._seen_sets])
+        sd.Crawler("https://example.org", s)
+        
+    def test_polite_retry_throttled(self):
+        class ThrottleOnce(dict):
+            """pages where a path answers 429 to its first request"""
+            throttled = False
+            def get(self, path, default=None):
+                if path == "/a" and not self.throttled:
+                    self.throttled = True
+                    return 429, {"Content-Type": "text/html", "Retry-After": "0"}, ""
+                return super().get(path, default)
+        
+        s = Settings(progress_bar=False, depth=2, polite=True, polite_rate=0, respect_robots=False)
+        with LocalServer(ThrottleOnce(SITE)) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/a", "/b", "/a1", "/a2", "/r", "/b1"]
+        assert server.requests.count(("HEAD", "/a")) == 2
+        
+        # the session doesn't retry the 429 itself, even with a Retry-After header
+        s = Settings(progress_bar=False, depth=2, polite=True, polite_rate=0, respect_robots=False, polite_max_retries=0, retries=2)
+        with LocalServer(ThrottleOnce(SITE)) as server:
+            c = sd.Crawler(server.url + "/", s)
+            c.start()
+        assert [url_object.url.replace(server.url, "") for url_object in c._url_book] == ["/", "/b", "/b1"]
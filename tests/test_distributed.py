@@ -0,0 +1,116 @@
+from threading import Thread
+
+import pytest
+
+import scrapdynamics as sd
+from scrapdynamics.distributed import SQLiteBackend, RedisBackend
+from scrapdynamics.settings import Settings
+from scrapdynamics.url import Url
+from tests.clock import FakeClock
+from tests.localredis import LocalRedis
+from tests.server import LocalServer
+from tests.test_crawler import SITE
+
+@pytest.fixture(params=["sqlite", "redis"])
+def backend(request, tmp_path):
+    clock = FakeClock()
+    if request.param == "sqlite": backend = SQLiteBackend(str(tmp_path / "frontier.sqlite"), clock)
+    else: backend = RedisBackend(LocalRedis(), clock=clock)
+    backend.test_clock = clock
+    return backend
+
+class TestFrontierBackend():
+    
+    def test_push_deduplicate(self, backend):
+        assert backend.push([("link1", 1), ("link2", 1), ("link1", 1)]) == 2
+        assert backend.push([("link2", 2)]) == 0
+        
+    def test_lease_lowest_depth_first(self, backend):
+        backend.push([("link1", 2), ("link2", 1), ("link3", 1)])
+        assert backend.lease("w1", 2, 10) == [("link2", 1), ("link3", 1)]
+        assert backend.lease("w2", 2, 10) == [("link1", 2)]
+        assert backend.lease("w2", 2, 10) == []
+        
+    def test_ack(self, backend):
+        backend.push([("link1", 0), ("link2", 1)])
+        for url, depth in backend.lease("w1", 2, 10): backend.ack(url, Url(url, "domain") if url == "link1" else None)
+        assert backend.done()
+        assert [url_object.url for url_object in backend.records()] == ["link1"]
+        
+    def test_requeue_expired(self, backend):
+        backend.push([("link1", 0)])
+        backend.lease("crashed", 1, 10)
+        assert backend.requeue_expired() == 0
+        assert not backend.done()
+        backend.test_clock.now = 11
+        assert backend.requeue_expired() == 1
+        assert backend.lease("w1", 1, 10) == [("link1", 0)]
+        # the url is done whichever worker acknowledges it
+        backend.ack("link1", Url("link1"))
+        backend.ack("link1", Url("link1"))
+        assert backend.done()
+        assert len(list(backend.records())) == 1
+
+class CrashAfter():
+    """redis client of a worker that dies after a number of commands"""
+    
+    def __init__(self, client: LocalRedis, commands: int):
+        self.client = client
+        self.commands = commands
+        
+    def __getattr__(self, name: str):
+        method = getattr(self.client, name)
+        def command(*args, **kwargs):
+            if self.commands == 0: raise ConnectionError("worker died")
+            self.commands -= 1
+            return method(*args, **kwargs)
+        return command
+
+class TestRedisBackend():
+    
+    def test_worker_dies_while_leasing(self):
+        for commands in range(4):
+            clock, client = FakeClock(), LocalRedis()
+            worker = RedisBackend(client, clock=clock)
+            worker.push([("link1", 0)])
+            dying = RedisBackend(CrashAfter(client, commands), clock=clock)
+            try: dying.lease("dying", 1, 10)
+            except ConnectionError: pass
+            # the url is still queued or leased, the other worker doesn't stop
+            assert not worker.done()
+            clock.now = 11
+            worker.requeue_expired()
+            assert worker.lease("w1", 1, 10) == [("link1", 0)]
+        
+    def test_worker_dies_while_pushing(self):
+        for commands in range(4):
+            clock, client = FakeClock(), LocalRedis()
+            worker = RedisBackend(client, clock=clock)
+            dying = RedisBackend(CrashAfter(client, commands), clock=clock)
+            try: dying.push([("link1", 0), ("link2", 1)])
+            except ConnectionError: pass
+            worker.push([("link1", 0), ("link2", 1)])
+            assert worker.lease("w1", 2, 10) == [("link1", 0), ("link2", 1)]
+
+class TestWork():
+    
+    def test_budgets_not_shared(self, tmp_path):
+        for budget in [{"max_pages": 2}, {"max_pages_per_host": 2}, {"max_time": 1}]:
+            c = sd.Crawler("https://example.org", Settings(progress_bar=False, **budget))
+            with pytest.raises(ValueError): c.work(SQLiteBackend(str(tmp_path / "frontier.sqlite")))
+    
+    def test_workers_share_frontier(self, tmp_path):
+        s = Settings(progress_bar=False, depth=2)
+        path = str(tmp_path / "frontier.sqlite")
+        with LocalServer(SITE) as server:
+            workers = [sd.Crawler(server.url + "/", s) for _ in range(2)]
+            threads = [Thread(target=c.work, args=(SQLiteBackend(path), f"w{i}", 60, 0.01)) for i, c in enumerate(workers)]
+            for thread in threads: thread.start()
+            for thread in threads: thread.join()
+            
+            results = sd.Crawler(server.url + "/", s)
+            results.load_results(SQLiteBackend(path))
+        gets = [path for command, path in server.requests if command == "GET"]
+        assert sorted(gets) == sorted(set(gets))
+        assert sorted([url_object.url.replace(server.url, "") for url_object in results._url_book]) == sorted(["/", "/a", "/b", "/a1", "/a2", "/r", "/b1"])
+        assert [url_object.url.replace(server.url, "") for url_object in results._url_book][:3] == ["/", "/a", "/b"]
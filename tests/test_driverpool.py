@@ -0,0 +1,81 @@
+from threading import Thread
+from time import sleep
+
+import pytest
+
+from scrapdynamics.driverpool import DriverPool
+
+class FakeDriver():
+    
+    def __init__(self):
+        self.closed = False
+        
+    def quit(self):
+        self.closed = True
+
+class TestDriverPool():
+    
+    def setup_method(self):
+        self.drivers = []
+        
+    def factory(self):
+        self.drivers.append(FakeDriver())
+        return self.drivers[-1]
+    
+    def test_lazy_creation(self):
+        pool = DriverPool(self.factory, 3)
+        assert len(self.drivers) == 0
+        with pool.acquire() as driver: pass
+        with pool.acquire() as driver2: assert driver2 is driver
+        assert len(self.drivers) == 1
+        
+    def test_max_size(self):
+        pool = DriverPool(self.factory, 2)
+        def load_page():
+            with pool.acquire(): sleep(0.02)
+        threads = [Thread(target=load_page) for _ in range(6)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        assert len(self.drivers) == 2
+        
+    def test_recycle(self):
+        pool = DriverPool(self.factory, 1, recycle_after=2)
+        for _ in range(5):
+            with pool.acquire(): pass
+        assert [driver.closed for driver in self.drivers] == [True, True, False]
+        assert len(pool) == 1
+        
+    def test_close(self):
+        pool = DriverPool(self.factory, 2)
+        with pool.acquire():
+            with pool.acquire() as driver: pass
+            pool.close()
+            assert driver.closed
+        assert all([driver.closed for driver in self.drivers])
+        assert len(pool) == 0
+        with pytest.raises(RuntimeError):
+            with pool.acquire(): pass
+        assert len(self.drivers) == 2
+        
+    def test_close_wakes_waiting_threads(self):
+        pool = DriverPool(self.factory, 1)
+        errors = []
+        def load_page():
+            try:
+                with pool.acquire(): pass
+            except RuntimeError as e: errors.append(e)
+        with pool.acquire():
+            thread = Thread(target=load_page)
+            thread.start()
+            sleep(0.02)
+            pool.close()
+            thread.join(1)
+        assert not thread.is_alive() and len(errors) == 1
+        
+    def test_broken_driver(self):
+        pool = DriverPool(self.factory, 1)
+        with pytest.raises(ValueError):
+            with pool.acquire() as driver: raise ValueError("browser crashed")
+        assert driver.closed and len(pool) == 0
+        with pool.acquire() as driver2: assert driver2 is not driver
+        assert len(pool) == 1
@@ -0,0 +1,24 @@
+from scrapdynamics.extraction import ExtractionPool
+from scrapdynamics.settings import Settings
+from scrapdynamics.url import UrlManager
+
+class TestExtractionPool():
+    
+    def setup_method(self):
+        # functions of the settings are not sent to the processes
+        self.s = Settings(render_predicate=lambda url, page: False)
+        self.pool = ExtractionPool(self.s, 2, max_pending=2)
+        
+    def teardown_method(self):
+        self.pool.close()
+        self.pool = None
+    
+    def test_extract_same_order(self):
+        pages = [(f"https://a.com/{i}", f'<title>{i}</title><a href="https://a.com/{i + 1}">') for i in range(10)]
+        results = list(self.pool.extract(pages))
+        assert [url for url, page_text, url_object in results] == [url for url, page_text in pages]
+        assert [url_object for url, page_text, url_object in results] == [UrlManager(self.s)._extract_url(*page) for page in pages]
+        
+    def test_extract_skipped_page(self):
+        assert list(self.pool.extract([("https://a.com", None)])) == [("https://a.com", None, None)]
+        assert self.pool._executor is not None
@@ -0,0 +1,69 @@
+from scrapdynamics.frontier import Frontier, PriorityFrontier
+from scrapdynamics.bloom import ScalableBloomFilter
+
+class TestFrontier():
+    
+    def setup_method(self):
+        self.f = Frontier()
+        
+    def teardown_method(self):
+        self.f = None
+    
+    def test_push_deduplicate(self):
+        assert self.f.push_many(["link1", "link2", "link1"], 1) == 2
+        assert not self.f.push("link2", 2)
+        assert len(self.f) == 2
+        
+    def test_mark_seen(self):
+        self.f.mark_seen("link1")
+        assert "link1" in self.f
+        assert not self.f.push("link1", 1)
+        assert len(self.f) == 0
+        
+    def test_pop_layer(self):
+        self.f.push_many(["link1", "link2"], 1)
+        self.f.push_many(["link3"], 2)
+        assert self.f.pop_layer(1) == ["link1", "link2"]
+        assert self.f.pop_layer(1) == []
+        assert self.f.pop_layer(2) == ["link3"]
+        
+    def test_never_requeue_popped(self):
+        self.f.push("link1", 1)
+        self.f.pop_layer(1)
+        assert not self.f.push("link1", 2)
+        
+    def test_bloom_seen(self):
+        f = Frontier(ScalableBloomFilter(10))
+        assert f.push_many([f"https://example.com/{i}" for i in range(50)] + ["https://example.com/1"], 1) == 50
+        f.mark_seen("base")
+        assert "base" in f and not f.push("base", 1)
+        assert len(f.pop_layer(1)) == 50
+
+class TestPriorityFrontier():
+    
+    def setup_method(self):
+        self.f = PriorityFrontier(lambda url, depth, anchor: ("job" in url) * 10 + ("apply" in (anchor or "")) * 5 - depth, max_depth=2)
+        
+    def teardown_method(self):
+        self.f = None
+    
+    def test_pop_best(self):
+        self.f.push_many(["home", "job1", "about", "job2"], 1)
+        self.f.push_many(["job3"], 2, {"job3": "apply now"})
+        assert self.f.pop_best(2) == [("job3", 2), ("job1", 1)]
+        # same score in the order they were queued
+        assert self.f.pop_best(10) == [("job2", 1), ("home", 1), ("about", 1)]
+        assert self.f.pop_best(1) == []
+        
+    def test_max_depth_and_seen(self):
+        assert not self.f.push("job1", 3)
+        assert self.f.push("job1", 2)
+        assert not self.f.push("job1", 1)
+        assert len(self.f) == 1
+        
+    def test_pop_layer_pending(self):
+        self.f.push_many(["home", "job1"], 1)
+        self.f.push_many(["job2"], 2)
+        assert self.f.pending() == [("job1", 1), ("job2", 2), ("home", 1)]
+        assert self.f.pop_layer(1) == ["job1", "home"]
+        assert self.f.pending() == [("job2", 2)]
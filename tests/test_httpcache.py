@@ -0,0 +1,45 @@
+from scrapdynamics.httpcache import HttpCache, CacheEntry, cache_key
+from tests.clock import FakeClock
+
+class TestHttpCache():
+    
+    def setup_method(self):
+        self.clock = FakeClock()
+    
+    def test_put_get(self, tmp_path):
+        cache = HttpCache(tmp_path / "cache.sqlite", clock=self.clock)
+        cache.put("https://Example.com/page#top", '"v1"', None, "page")
+        cache.put("https://example.com/no-validator", None, None, "page")
+        assert cache.get("https://example.com/page") == CacheEntry('"v1"', None, "page")
+        assert cache.get("https://example.com/no-validator") is None
+        assert cache.get("https://example.com/page").conditional_headers() == {"If-None-Match": '"v1"'}
+        
+    def test_persistent(self, tmp_path):
+        HttpCache(tmp_path / "cache.sqlite").put("https://example.com/", None, "Wed, 21 Oct 2015 07:28:00 GMT", "page")
+        assert HttpCache(tmp_path / "cache.sqlite").get("https://example.com/").body == "page"
+        
+    def test_ttl(self, tmp_path):
+        cache = HttpCache(tmp_path / "cache.sqlite", ttl=10, clock=self.clock)
+        cache.put("https://example.com/a", '"a"', None, "page")
+        cache.put("https://example.com/b", '"b"', None, "page")
+        self.clock.now = 8
+        cache.revalidate("https://example.com/a")
+        self.clock.now = 15
+        assert cache.get("https://example.com/a").body == "page"
+        assert cache.get("https://example.com/b") is None
+        
+    def test_lru_eviction(self, tmp_path):
+        cache = HttpCache(tmp_path / "cache.sqlite", max_size=10, clock=self.clock)
+        for i, url in enumerate(["https://example.com/a", "https://example.com/b"]):
+            self.clock.now = i
+            cache.put(url, '"v"', None, "x" * 4)
+        self.clock.now = 2
+        cache.get("https://example.com/a")
+        self.clock.now = 3
+        cache.put("https://example.com/c", '"v"', None, "x" * 4)
+        assert cache.get("https://example.com/b") is None
+        assert cache.get("https://example.com/a") and cache.get("https://example.com/c")
+        assert len(cache) == 2
+        
+    def test_cache_key(self):
+        assert cache_key("HTTPS://Example.COM#top") == "https://example.com/"
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ["selenium", "pandas", "rich"]
+
+def imported_modules(code: str) -> list:
+    """Run code in a new interpreter and get the heavy modules it has imported"""
+    check = f"import sys\n{code}\nprint(' '.join([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    return subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True).stdout.split()
+
+class TestImports():
+    
+    def test_import_package(self):
+        assert imported_modules("import scrapdynamics") == []
+        assert "scrapdynamics.crawler" not in subprocess.run(
+            [sys.executable, "-c", "import sys, scrapdynamics; print(list(sys.modules))"], capture_output=True, text=True, check=True,
+        ).stdout
+        
+    def test_http_crawler(self):
+        assert imported_modules("import scrapdynamics as sd\nsd.Crawler('http://127.0.0.1:9/', sd.Settings(progress_bar=False))") == []
+        
+    def test_pandas_on_export(self):
+        code = """
+import scrapdynamics as sd
+from scrapdynamics.url import Url
+c = sd.Crawler('http://127.0.0.1:9/', sd.Settings(progress_bar=False))
+c._url_book.append(Url('http://127.0.0.1:9/'))
+c.show()
+"""
+        assert imported_modules(code) == ["pandas"]
@@ -0,0 +1,28 @@
+from threading import Thread, Lock
+from time import sleep
+
+from scrapdynamics.limiter import DomainLimiter
+
+class TestDomainLimiter():
+    
+    def run_threads(self, limiter: DomainLimiter, urls):
+        lock, running, max_running = Lock(), {}, {}
+        def request(url):
+            with limiter.limit(url):
+                with lock:
+                    running[url] = running.get(url, 0) + 1
+                    max_running[url] = max(max_running.get(url, 0), running[url])
+                sleep(0.02)
+                with lock: running[url] -= 1
+        threads = [Thread(target=request, args=(url,)) for url in urls]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        return max_running
+    
+    def test_limit_per_domain(self):
+        max_running = self.run_threads(DomainLimiter(2), ["https://a.com/"] * 6 + ["https://b.com/"] * 3)
+        assert max_running == {"https://a.com/": 2, "https://b.com/": 2}
+        
+    def test_no_limit(self):
+        max_running = self.run_threads(DomainLimiter(0), ["https://a.com/"] * 4)
+        assert max_running == {"https://a.com/": 4}
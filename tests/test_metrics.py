@@ -0,0 +1,52 @@
+from json import load
+
+from scrapdynamics.metrics import Histogram, Metrics, NullMetrics
+from tests.clock import FakeClock
+
+class TestHistogram():
+    
+    def test_percentile(self):
+        h = Histogram()
+        for value in [0.001] * 90 + [0.1] * 9 + [2]: h.observe(value)
+        assert h.count == 100
+        assert h.percentile(50) <= 0.001 * 2
+        assert 0.1 <= h.percentile(99) <= 0.2
+        assert h.percentile(100) == 2
+        assert h.to_dict()["max"] == 2
+        
+    def test_empty(self):
+        assert Histogram().to_dict()["p99"] == 0
+
+class TestMetrics():
+    
+    def setup_method(self):
+        self.clock = FakeClock()
+        
+    def test_time(self):
+        m = Metrics(clock=self.clock)
+        with m.time("get"): self.clock.now += 0.5
+        assert m.stats()["stages"]["get"]["total"] == 0.5
+        
+    def test_count_hosts(self):
+        m = Metrics(clock=self.clock)
+        m.count("bytes", 100, "a.com")
+        m.count("bytes", 50, "b.com")
+        m.count("errors")
+        stats = m.stats()
+        assert stats["counters"] == {"bytes": 150, "errors": 1}
+        assert stats["hosts"] == {"a.com": {"bytes": 100}, "b.com": {"bytes": 50}}
+        
+    def test_maybe_dump(self, tmp_path):
+        path = tmp_path / "metrics.json"
+        m = Metrics(str(path), interval=10, clock=self.clock)
+        m.count("pages")
+        m.maybe_dump()
+        assert not path.exists()
+        self.clock.now = 10
+        m.maybe_dump()
+        with open(path) as f: assert load(f)["counters"] == {"pages": 1}
+        
+    def test_null_metrics(self):
+        m = NullMetrics()
+        with m.time("get"): m.count("pages")
+        assert m.stats() == {}
@@ -0,0 +1,41 @@
+from scrapdynamics.normalize import UrlNormalizer, remove_dot_segments
+
+class TestUrlNormalizer():
+    
+    def setup_method(self):
+        self.n = UrlNormalizer(strip_query_params=[r"utm_\w+", "fbclid"], strip_www=True)
+        
+    def teardown_method(self):
+        self.n = None
+    
+    def test_normalize_host_port_fragment(self):
+        assert self.n.normalize("HTTPS://WWW.Example.COM:443/Path#top") == "https://example.com/Path"
+        assert self.n.normalize("http://example.com:8080") == "http://example.com:8080/"
+        
+    def test_normalize_path(self):
+        assert self.n.normalize("https://example.com/a/./b/../c/") == "https://example.com/a/c"
+        assert self.n.normalize("https://example.com/") == "https://example.com/"
+        
+    def test_normalize_query(self):
+        url = "https://example.com/p?b=2&utm_source=x&a=1&fbclid=y&a=0"
+        assert self.n.normalize(url) == "https://example.com/p?a=1&a=0&b=2"
+        assert UrlNormalizer(sort_query_params=False).normalize("https://example.com/p?b=2&a=1") == "https://example.com/p?b=2&a=1"
+        
+    def test_stats(self):
+        for url in ["https://example.com/a", "https://example.com/a/", "https://example.com/a#x", "https://example.com/a/"]: self.n.normalize(url)
+        stats = self.n.hit_rate()
+        assert stats["calls"] == 4
+        assert stats["cache_hits"] == 1
+        assert stats["rewritten"] == 2
+        assert stats["collapsed"] == 2
+        assert stats["cache_hit_rate"] == 0.25
+        
+    def test_cache_size(self):
+        n = UrlNormalizer(cache_size=2)
+        for i in range(5): n.normalize(f"https://example.com/{i}")
+        assert len(n._cache) <= 2
+        
+    def test_remove_dot_segments(self):
+        assert remove_dot_segments("/a/b/c/./../../g") == "/a/g"
+        assert remove_dot_segments("/../a") == "/a"
+        assert remove_dot_segments("/a/b/..") == "/a/"
@@ -0,0 +1,69 @@
+from scrapdynamics.politeness import TokenBucket, HostScheduler, parse_retry_after
+from tests.clock import FakeClock
+
+class TestTokenBucket():
+    
+    def test_reserve(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, 2, clock)
+        assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1]
+        clock.now = 2
+        assert bucket.reserve() == 0
+
+class TestHostScheduler():
+    
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.robots_fetched = []
+        
+    def fetch_robots(self, url):
+        self.robots_fetched.append(url)
+        return 200, "User-agent: *\nDisallow: /private\nCrawl-delay: 2"
+    
+    def test_rate_per_host(self):
+        scheduler = HostScheduler(10, clock=self.clock, sleep=self.clock.sleep)
+        for _ in range(5): scheduler.wait("https://a.com/page")
+        scheduler.wait("https://b.com/page")
+        assert round(self.clock.now, 6) == 0.4
+        
+    def test_reserve_without_waiting(self):
+        scheduler = HostScheduler(10, clock=self.clock, sleep=self.clock.sleep)
+        assert [round(scheduler.reserve("https://a.com/page"), 6) for _ in range(3)] == [0, 0.1, 0.2]
+        assert self.clock.now == 0
+        
+    def test_no_limit(self):
+        scheduler = HostScheduler(0, clock=self.clock, sleep=self.clock.sleep)
+        for _ in range(5): scheduler.wait("https://a.com/page")
+        assert self.clock.now == 0
+        
+    def test_backoff(self):
+        scheduler = HostScheduler(0, max_backoff=5, clock=self.clock, sleep=self.clock.sleep)
+        scheduler.feedback("https://a.com/page", 429)
+        scheduler.wait("https://a.com/page")
+        assert self.clock.now == 1
+        scheduler.feedback("https://a.com/page", 503, "3")
+        scheduler.wait("https://a.com/page")
+        assert self.clock.now == 4
+        for _ in range(3): scheduler.feedback("https://a.com/page", 429)
+        assert scheduler._backoffs["a.com"] == 5
+        scheduler.feedback("https://a.com/page", 200)
+        assert scheduler._backoffs["a.com"] == 2.5
+        
+    def test_robots(self):
+        scheduler = HostScheduler(0, fetch_robots=self.fetch_robots, clock=self.clock, sleep=self.clock.sleep)
+        assert scheduler.allowed("https://a.com/page")
+        assert not scheduler.allowed("https://a.com/private/page")
+        assert self.robots_fetched == ["https://a.com/robots.txt"]
+        # crawl-delay of robots.txt
+        for _ in range(3): scheduler.wait("https://a.com/page")
+        assert self.clock.now == 4
+        
+    def test_robots_error(self):
+        scheduler = HostScheduler(0, fetch_robots=lambda url: (403, ""))
+        assert not scheduler.allowed("https://a.com/page")
+        
+    def test_parse_retry_after(self):
+        assert parse_retry_after("12") == 12
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+        assert parse_retry_after("invalid") == 0
+        assert parse_retry_after(None) == 0
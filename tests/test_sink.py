@@ -0,0 +1,36 @@
+from json import loads
+from csv import DictReader
+
+import pytest
+
+from scrapdynamics.sink import JsonLinesSink, CsvSink, ParquetSink
+
+ROWS = [
+    {"url": "https://example.com", "domain": "example.com", "links": ["link1", "link2"], "emails": []},
+    {"url": "https://example.com/a", "domain": "example.com", "links": [], "emails": ["email1"]},
+]
+
+class TestSink():
+    
+    def test_jsonl(self, tmp_path):
+        with JsonLinesSink(tmp_path / "results.jsonl") as sink:
+            sink.write(ROWS[0])
+            # each line is on disk as soon as it is written
+            assert loads((tmp_path / "results.jsonl").read_text()) == ROWS[0]
+            sink.write(ROWS[1])
+        assert [loads(line) for line in (tmp_path / "results.jsonl").read_text().splitlines()] == ROWS
+        
+    def test_csv_append(self, tmp_path):
+        with CsvSink(tmp_path / "results.csv") as sink: sink.write(ROWS[0])
+        with CsvSink(tmp_path / "results.csv", append=True) as sink: sink.write(ROWS[1])
+        with open(tmp_path / "results.csv") as f: rows = list(DictReader(f))
+        assert rows == [
+            {"url": "https://example.com", "domain": "example.com", "links": "link1, link2", "emails": ""},
+            {"url": "https://example.com/a", "domain": "example.com", "links": "", "emails": "email1"},
+        ]
+        
+    def test_parquet(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        with ParquetSink(tmp_path / "results.parquet", batch_size=1) as sink:
+            for row in ROWS: sink.write(row)
+        assert pq.read_table(tmp_path / "results.parquet").to_pylist() == ROWS
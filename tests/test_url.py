@@ -1,12 +1,55 @@
+import tracemalloc
 from json import load
 
-from scrapdynamics.url import Url, UrlManager
+from scrapdynamics.url import Url, UrlBook, UrlManager, CompactUrl
+from scrapdynamics.bloom import ScalableBloomFilter
+from scrapdynamics.settings import Settings
 
 class TestUrl():
     
     def test_call(self):
         Url("https://example.com")
         
+class TestUrlBook():
+    
+    def test_order_and_index(self):
+        book = UrlBook()
+        for url in ["https://c.com", "https://a.com", "https://b.com"]: book.append(Url(url))
+        assert [url_object.url for url_object in book] == ["https://c.com", "https://a.com", "https://b.com"]
+        assert book[1].url == "https://a.com"
+        assert "https://b.com" in book and "https://d.com" not in book
+        assert book.get("https://b.com") is book[2]
+        assert len(book) == 3
+        
+    def test_compact(self):
+        book = UrlBook(compact=True)
+        url_object = Url("https://a.com", "a.com", ["https://b.com", "https://a.com", "https://b.com"], {"title": ["a"]})
+        stored = book.append(url_object)
+        assert isinstance(stored, CompactUrl)
+        assert stored.links == url_object.links
+        assert stored.to_url() == url_object
+        assert book.get("https://a.com") is stored
+        # each distinct url is stored once
+        assert len(book._table) == 2
+        
+    def test_compact_uses_less_memory(self):
+        sizes = []
+        for compact in [False, True]:
+            tracemalloc.start()
+            book = UrlBook(compact)
+            for page in range(500): book.append(Url(f"https://a.com/{page}", "a.com", [f"https://a.com/{link}" for link in range(100)]))
+            sizes.append(tracemalloc.get_traced_memory()[0])
+            tracemalloc.stop()
+        assert sizes[1] * 5 < sizes[0]
+        
+    def test_not_kept(self):
+        book = UrlBook(keep=False, seen=ScalableBloomFilter(10))
+        url_object = Url("https://a.com", "a.com", ["https://b.com"])
+        assert book.append(url_object) is url_object
+        assert "https://a.com" in book and "https://b.com" not in book
+        assert list(book) == [] and book.get("https://a.com") is None
+        assert len(book) == 1
+        
 class TestUrlManager():
     
     def setup_class(self):
@@ -78,4 +121,73 @@ class TestUrlManager():
         
     def test_search_expression_phones(self):
         self.um._add_url("https://example.org", self.test_site1)
-        assert self.um._url_book[0].search["phones"] == self.test_site1_results["phones"]
\ No newline at end of file
+        assert self.um._url_book[0].search["phones"] == self.test_site1_results["phones"]
+        
+    def test_add_url_queue_links(self):
+        self.um._add_url("https://example.com/path/path", self.test_site1)
+        self.um._add_url("https://example.com/path/other", self.test_site1)
+        assert self.um._frontier.pop_layer(1) == self.test_site1_results["links"]
+        
+    def test_add_url_duplicate(self):
+        self.um._add_url("https://example.org", self.test_site1)
+        self.um._add_url("https://example.org", "")
+        assert len(self.um._url_book) == 1
+        
+    def test_search_expression_combined(self):
+        um = UrlManager(Settings(combine_search_expressions=True))
+        assert um._search_text(self.test_site1) == self.um._search_text(self.test_site1)
+        
+    def test_search_expression_combined_groups(self):
+        um = UrlManager(Settings(combine_search_expressions=True, search_expressions={
+            "no_group": r"ab",
+            "group": r" (c)d?",
+        }))
+        assert um._search_text("ab cd c ab") == {"no_group": ["ab", "ab"], "group": ["c", "c"]}
+        
+    def test_search_expression_several_groups(self):
+        search_expressions = {"kv": r"(\w+ ?)=( ?\w+)", "end": r"end"}
+        for combine in [False, True]:
+            um = UrlManager(Settings(combine_search_expressions=combine, search_expressions=search_expressions))
+            assert um._search_text("a=b key = value end") == {"kv": [("a", "b"), ("key", "value")], "end": ["end"]}
+        
+    def test_search_expression_combined_overlap(self):
+        page = "<html><head><title>Contact contact@example.com</title></head></html>"
+        assert self.um._search_text(page)["emails"] == ["contact@example.com"]
+        # the email is inside the title matched first, it is not found again
+        um = UrlManager(Settings(combine_search_expressions=True))
+        assert um._search_text(page) == {"emails": [], "phones": [], "title": ["Contact contact@example.com"]}
+        
+    def test_search_expression_combined_backreference(self):
+        um = UrlManager(Settings(combine_search_expressions=True, search_expressions={"a": r"a", "backref": r"(e)\1"}))
+        assert um._re_search_combined is None
+        assert um._search_text("a ee") == {"a": ["a"], "backref": ["e"]}
+        
+    def test_add_url_write_sinks(self):
+        class ListSink():
+            rows = []
+            def write(self, row): self.rows.append(row)
+            def close(self): pass
+        sink = ListSink()
+        self.um.add_sink(sink)
+        self.um._add_url("https://example.org", self.test_site1)
+        assert sink.rows == [self.um._url_to_row(self.um._url_book[0])]
+        
+    def test_get_links_from_tree(self):
+        um = UrlManager(Settings(parse_html=True))
+        url_object = um._extract_url("https://example.com/path/path", self.test_site1)
+        assert url_object.links == self.test_site1_results["links"] + ["https://example.com/path/javascript"]
+        
+    def test_get_links_from_tree_xpath(self):
+        um = UrlManager(Settings(parse_html=True))
+        tree = um._parse_html(self.test_site1)
+        assert um._get_links_from_tree("https://example.org", tree, "/html/body/div") == ["https://schema.relative.com/path"]
+        assert um._get_links_from_tree("https://example.org/a/b", tree, "(//a)[1]/@href") == ["https://example.org/relative/path"]
+        assert um._get_links_from_tree("https://example.org/a/b", um._parse_html('<a href="c/d">relative to page</a>')) == ["https://example.org/a/c/d"]
+        
+    def test_search_xpaths(self):
+        um = UrlManager(Settings(search_xpaths={"h1": "//h1", "emails": "//span[@class='email']/text()", "nb_links": "count(//a)"}))
+        search = um._extract_url("https://example.org", self.test_site1).search
+        assert search["h1"] == ["Test Site 1"]
+        assert search["emails"] == self.test_site1_results["emails"]
+        assert search["nb_links"] == ["10.0"]
+        assert search["title"] == self.test_site1_results["title"]